@@ -0,0 +1 @@
+from .censor_words_model import *
@@ -0,0 +1,20 @@
+from django.db import models
+
+from Auth.models import User
+
+
+# Custom words censored on top of the default profanity word list
+class CensorWord(models.Model):
+    word = models.CharField(max_length=255, unique=True)
+    added_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="censor_word_author",
+    )
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("word",)
+        db_table = "Censor_Words"
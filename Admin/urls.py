@@ -32,6 +32,7 @@ from .views.admin_users_views import (
     SearchAllUsers,
     VerifyUsers,
 )
+from .views.censor_words import AddCensorWords
 
 urlpatterns = [
     # System Statistics
@@ -169,4 +170,10 @@ urlpatterns = [
         AdminGetAllDocumentsInVault.as_view(),
         name="Admin Get All Documents In Vault",
     ),
+    # Moderation
+    path(
+        "add-censor-words/",
+        AddCensorWords.as_view(),
+        name="Add Censor Words",
+    ),
 ]
@@ -9,9 +9,7 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from Auth.models import User
 from Blog.blog_helper import send_blog_declination_mail
 from Blog.models.blog_model import BlogComment, BlogPost
-from helpers.functions import (aware_datetime,
-                               convert_quill_text_to_normal_text,
-                               paginate_data, truncate_text)
+from helpers.functions import aware_datetime, paginate_request_data
 from helpers.status_codes import (action_authorization_exception,
                                   non_existing_data_exception)
 from helpers.validations import check_required_fields, check_super_admin
@@ -74,12 +72,12 @@ class GetAllBlogPostsAsAdmin(APIView):
             .values(
                 "id",
                 "title",
-                "content",
                 "description",
+                "preview_text",
                 "total_likes",
                 "total_shares",
                 "cover_image",
-                "censored_content",
+                "cover_image_variants",
                 "is_abusive",
                 "links",
                 "is_approved",
@@ -96,9 +94,8 @@ class GetAllBlogPostsAsAdmin(APIView):
             .order_by("-created_on")
         )
 
-        for blog_post in blog_posts:
-            converted_text = convert_quill_text_to_normal_text(blog_post["content"])
-            blog_post["preview_text"] = truncate_text(converted_text, 200)
+        data = paginate_request_data(request, blog_posts, page_number, 10)
+        for blog_post in data["data"]:
             total_comments = (
                 BlogComment.objects.filter(blog_id=blog_post["id"])
                 .values(
@@ -113,7 +110,6 @@ class GetAllBlogPostsAsAdmin(APIView):
             blog_post["total_comments"] = total_comments.count()
             blog_post["comments"] = list(total_comments)
 
-        data = paginate_data(blog_posts, page_number, 10)
         return JsonResponse(
             data,
             safe=False,
@@ -6,7 +6,7 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from Events.models.events_model import Events
-from helpers.functions import aware_datetime, paginate_data
+from helpers.functions import aware_datetime, paginate_request_data
 from helpers.status_codes import (action_authorization_exception,
                                   cannot_perform_action,
                                   non_existing_data_exception)
@@ -45,14 +45,14 @@ class GetAllEventsAsAdmin(APIView):
             )
             .order_by("-created_on")
         )
-        for event in events:
+        data = paginate_request_data(request, events, page_number, 10)
+        for event in data["data"]:
             event["documents"] = list(
                 EventDocuments.objects.filter(event_id=event["id"]).values(
                     "id", "document_location"
                 )
             )
 
-        data = paginate_data(events, page_number, 10)
         return JsonResponse(
             data,
             safe=False,
@@ -6,9 +6,12 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
-from Forum.forum_helper import send_forum_declination_mail
-from Forum.models import Forum, ForumFile, VirtualMeeting, ChatRoom, ForumDiscussion
-from helpers.functions import paginate_data, aware_datetime
+from Forum.forum_helper import (
+    attach_forum_listing_details,
+    send_forum_declination_mail,
+)
+from Forum.models import Forum
+from helpers.functions import paginate_request_data, aware_datetime
 from helpers.status_codes import (
     action_authorization_exception,
     cannot_perform_action,
@@ -123,48 +126,12 @@ class AdminGetAllForums(APIView):
                 "is_declined",
                 "created_on",
             )
-            for forum in forums:
+            data = paginate_request_data(request, forums, page_number, 10)
+            attach_forum_listing_details(data["data"], with_discussions=True)
+            for forum in data["data"]:
                 forum["is_owner"] = True if forum["author"] == user.user_key else False
                 forum.pop("author", None)
-                forum["virtual_meetings"] = list(
-                    VirtualMeeting.objects.filter(forum_id=forum["id"]).values(
-                        "id",
-                        "meeting_agenda",
-                        "meeting_url",
-                        "scheduled_start_time",
-                        "scheduled_end_time",
-                        "organizer__first_name",
-                        "organizer__last_name",
-                        "total_attendees",
-                    )
-                )
-                forum["files"] = list(
-                    ForumFile.objects.filter(forum_id=forum["id"]).values(
-                        "id", "description", "file_type", "file_url", "created_on"
-                    )
-                )
-                forum["chat_rooms"] = list(
-                    ChatRoom.objects.filter(forum_id=forum["id"]).values(
-                        "id",
-                        "room_name",
-                        "total_members",
-                        "total_messages",
-                    )
-                )
-                forum["discussions"] = list(
-                    ForumDiscussion.objects.filter(forum_id=forum["id"]).values(
-                        "id",
-                        "comment",
-                        "commentor__first_name",
-                        "commentor__last_name",
-                        "commentor__profile_image",
-                        "is_forum_admin",
-                        "total_likes",
-                        "created_on",
-                    )
-                )
 
-            data = paginate_data(forums, page_number, 10)
             return JsonResponse(
                 data,
                 safe=False,
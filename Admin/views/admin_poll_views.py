@@ -1,14 +1,19 @@
 import datetime
 
-from django.db.models import Q, Sum
+from django.db.models import Q
 from django.http import JsonResponse
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from Polls.models.poll_models import Poll, PollVote, PollChoices
-from Polls.poll_helper import retrieve_poll_with_choices, send_poll_declination_mail
-from helpers.functions import aware_datetime, paginate_data
+from Polls.poll_helper import (
+    has_poll_ended,
+    read_total_votes,
+    retrieve_poll_with_choices,
+    send_poll_declination_mail,
+)
+from helpers.functions import aware_datetime, paginate_request_data
 from helpers.status_codes import (
     action_authorization_exception,
     non_existing_data_exception,
@@ -145,9 +150,6 @@ class AdminGetAllPolls(APIView):
         if not check_permission(user, "Polls", [1, 2]):
             raise action_authorization_exception("Unauthorized to view poll results")
 
-        Poll.objects.filter(
-            end_date__lt=aware_datetime(datetime.datetime.now())
-        ).update(is_ended=True)
         query = Q()
         if data_type == 1:
             query &= Q(is_approved=True)
@@ -160,6 +162,7 @@ class AdminGetAllPolls(APIView):
             "id",
             "question",
             "snapshot_location",
+            "snapshot_variants",
             "file_location",
             "start_date",
             "end_date",
@@ -175,18 +178,18 @@ class AdminGetAllPolls(APIView):
             "approved_by__last_name",
             "approved_on",
             "created_on",
+            "results",
         )
 
-        for poll in polls:
+        data = paginate_request_data(request, polls, page_number, 10)
+        for poll in data["data"]:
+            poll["is_ended"] = has_poll_ended(poll)
             poll["choices"] = list(
                 PollChoices.objects.filter(poll_id=poll["id"]).values("id", "choice")
             )
-            poll["total_votes"] = PollChoices.objects.filter(
-                poll_id=poll["id"]
-            ).aggregate(total_votes=Sum("votes"))["total_votes"]
+            poll["total_votes"] = read_total_votes(poll)
             poll["is_owner"] = True if poll["author_id"] == user.user_key else False
 
-        data = paginate_data(polls, page_number, 10)
         return JsonResponse(
             data,
             safe=False,
@@ -13,8 +13,13 @@ from DocumentVault.models import Document
 from Events.models.events_model import Events
 from Forum.models import Forum
 from Polls.models import Poll
+from helpers.azure_file_handling import provision_user_container
 from helpers.email_sender import send_email
-from helpers.functions import aware_datetime, generate_random_string, paginate_data
+from helpers.functions import (
+    aware_datetime,
+    generate_random_string,
+    paginate_request_data,
+)
 from helpers.status_codes import (
     action_authorization_exception,
     cannot_perform_action,
@@ -92,6 +97,7 @@ class GetAllUsers(APIView):
                     "organization",
                     "country__name",
                     "is_verified",
+                    "created_on",
                 )
                 .order_by("-created_on")
             )
@@ -109,11 +115,12 @@ class GetAllUsers(APIView):
                     "organization",
                     "country__name",
                     "is_verified",
+                    "created_on",
                 )
                 .order_by("-created_on")
             )
 
-        data = paginate_data(users, page_number, 10)
+        data = paginate_request_data(request, users, page_number, 10)
 
         return JsonResponse(data, safe=False)
 
@@ -154,6 +161,7 @@ class AddSuperAdmins(APIView):
                 data["is_admin"] = True
 
             new_user = User.objects.create(**data)
+            provision_user_container(new_user)
             account_type = data["account_type"]
             new_line = "\n"
             double_new_line = "\n\n"
@@ -225,6 +233,7 @@ class GetSingleUser(APIView):
                 "first_name",
                 "last_name",
                 "profile_image",
+                "profile_image_variants",
                 "bio",
                 "links",
                 "organization",
@@ -312,10 +321,11 @@ class SearchAllUsers(APIView):
                 "organization",
                 "country__name",
                 "is_verified",
+                "created_on",
             )
             .order_by("-created_on")
         )
 
-        data = paginate_data(users, page_number, 10)
+        data = paginate_request_data(request, users, page_number, 10)
 
         return JsonResponse(data, safe=False)
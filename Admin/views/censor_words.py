@@ -1,12 +1,16 @@
 import os
 
-from better_profanity import profanity
+from django.db import transaction
 from django.http import JsonResponse
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from Admin.models import CensorWord
 from helpers.functions import local_file_upload
+from helpers.profanity_filter import bump_censor_words_version
+from helpers.status_codes import action_authorization_exception
+from helpers.validations import check_super_admin
 
 LOCAL_FILE_PATH = os.environ.get("LOCAL_FILE_PATH")
 
@@ -17,20 +21,32 @@ class AddCensorWords(APIView):
     authentication_classes = (JWTAuthentication,)
 
     def post(self, request, *args, **kwargs):
+        user = self.request.user
         file = request.FILES["file"]
 
+        if not check_super_admin(user):
+            raise action_authorization_exception("Unauthorized to add censor words")
+
         full_directory = f"{LOCAL_FILE_PATH}AbusiveWords"
         file_path = local_file_upload(full_directory, file)
-        custom_bad_words = []
+        custom_bad_words = set()
         with open(file_path, "r") as file:
             line = file.readline()
             while line:
                 # Process the line text
-                custom_bad_words.append(line.strip())
+                word = line.strip().lower()
+                if word:
+                    custom_bad_words.add(word)
                 # Read the next line
                 line = file.readline()
 
-        profanity.add_censor_words(custom_bad_words)
+        # Save the words and have every worker reload them
+        with transaction.atomic():
+            CensorWord.objects.bulk_create(
+                [CensorWord(word=word, added_by=user) for word in custom_bad_words],
+                ignore_conflicts=True,
+            )
+            transaction.on_commit(bump_censor_words_version)
 
         if os.path.exists(file_path):
             os.remove(file_path)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.1 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Auth", "0003_user_mobile_login_field"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="profile_image_variants",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
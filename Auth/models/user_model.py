@@ -125,6 +125,8 @@ class User(AbstractBaseUser):
 
     profile_image_key = models.CharField(max_length=255, blank=True, null=True)
 
+    profile_image_variants = models.JSONField(null=True, blank=True)
+
     account_type = models.CharField(max_length=255, null=False)
 
     is_deleted = models.BooleanField(default=False)
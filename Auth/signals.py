@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from Auth.models.permissions_model import Module, Permission
+from Auth.models.user_model import UserRole
+from helpers.permission_cache import bump_permission_version
+
+
+# Invalidate the cached permission matrix once role changes are committed
+@receiver([post_save, post_delete], sender=Permission)
+@receiver([post_save, post_delete], sender=Module)
+@receiver([post_save, post_delete], sender=UserRole)
+def invalidate_permission_matrix(sender, **kwargs):
+    transaction.on_commit(bump_permission_version)
@@ -11,6 +11,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from Auth.models import User
 from Auth.models.permissions_model import Permission
 from Auth.models.user_model import UserRole, Country
+from helpers.azure_file_handling import provision_user_container
 from helpers.email_sender import (
     send_email,
     english_welcome_message,
@@ -78,6 +79,7 @@ class RegisterView(APIView):
 
             data["role_id"] = user_role.id
             user = User.objects.create(**data)
+            provision_user_container(user)
 
             # Send welcome mail to user
             if data.get("language") == "en":
@@ -1,6 +1,17 @@
 import datetime
 
 from helpers.email_sender import send_email
+from helpers.functions import convert_quill_text_to_normal_text, truncate_text
+from helpers.profanity_filter import censor_text
+
+
+def add_blog_text_fields(data):
+    # Derive the stored text fields from the Quill content once per write
+    plain_text = convert_quill_text_to_normal_text(data["content"])
+    data["censored_content"], data["is_abusive"] = censor_text(plain_text)
+    data["plain_text"] = plain_text
+    data["preview_text"] = truncate_text(plain_text, 200)
+    return data
 
 
 def send_blog_declination_mail(blog, comments):
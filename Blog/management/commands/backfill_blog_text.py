@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from Blog.models.blog_model import BlogPost
+from helpers.functions import convert_quill_text_to_normal_text, truncate_text
+
+
+class Command(BaseCommand):
+    help = "Store the plain text and preview of blog posts saved without them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        total_posts = 0
+
+        while True:
+            blog_posts = list(
+                BlogPost.objects.filter(plain_text__isnull=True)
+                .only("id", "content")
+                .order_by("id")[:batch_size]
+            )
+            if not blog_posts:
+                break
+
+            for blog_post in blog_posts:
+                plain_text = convert_quill_text_to_normal_text(blog_post.content or "")
+                blog_post.plain_text = plain_text
+                blog_post.preview_text = truncate_text(plain_text, 200)
+
+            BlogPost.objects.bulk_update(blog_posts, ["plain_text", "preview_text"])
+            total_posts += len(blog_posts)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Stored the text of {total_posts} blog posts")
+        )
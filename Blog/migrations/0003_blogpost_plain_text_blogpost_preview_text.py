@@ -0,0 +1,22 @@
+# Generated by Django 4.2.1 on 2026-10-18 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Blog", "0002_blogpost_declined_by_blogpost_is_declined"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blogpost",
+            name="plain_text",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="blogpost",
+            name="preview_text",
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
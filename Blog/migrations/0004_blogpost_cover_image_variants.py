@@ -0,0 +1,17 @@
+# Generated by Django 4.2.1 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Blog", "0003_blogpost_plain_text_blogpost_preview_text"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blogpost",
+            name="cover_image_variants",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
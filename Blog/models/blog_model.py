@@ -7,6 +7,8 @@ class BlogPost(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField(null=True, blank=True)
     censored_content = models.TextField(null=True, blank=True)
+    plain_text = models.TextField(null=True, blank=True)
+    preview_text = models.CharField(max_length=255, null=True, blank=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -18,6 +20,7 @@ class BlogPost(models.Model):
     links = models.JSONField(null=True, blank=True)
     cover_image = models.CharField(max_length=255, null=True, blank=True)
     image_key = models.CharField(max_length=255, null=True, blank=True)
+    cover_image_variants = models.JSONField(null=True, blank=True)
     reference = models.JSONField(null=True, blank=True)
     is_approved = models.BooleanField(default=False)
     is_published = models.BooleanField(default=False)
@@ -12,15 +12,9 @@ from .views.blog_view import (
     ShareABlogPost,
     UpdateBlogPost,
     UploadBlogDocument,
-    UploadThumbnailsToAzure,
 )
 
 urlpatterns = [
-    path(
-        "upload-thumbnail/",
-        UploadThumbnailsToAzure.as_view(),
-        name="Upload Thumbnails To Azure",
-    ),
     # Blog
     path("create-blog/", CreateBlogPost.as_view(), name="Create Blog"),
     path(
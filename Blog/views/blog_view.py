@@ -1,29 +1,24 @@
 import json
-import os
-import shutil
-from os import path
 
+from django.db import transaction
 from django.db.models import Q
 from django.http import JsonResponse
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from Blog.blog_helper import add_blog_text_fields
 from Blog.models.blog_model import BlogComment, BlogPost
 from Utilities.models.documents_model import BlogDocuments
 from helpers.azure_file_handling import (
     create_other_blog_documents,
     delete_blob,
-    upload_cover_image,
+    delete_image_blob,
+    schedule_blob_deletions,
     upload_image_cover_or_pdf_to_azure,
-    upload_thumbnail,
-)
-from helpers.functions import (
-    check_abusive_words,
-    convert_quill_text_to_normal_text,
-    paginate_data,
-    truncate_text,
+    with_image_variants,
 )
+from helpers.functions import paginate_request_data
 from helpers.status_codes import (
     action_authorization_exception,
     duplicate_data_exception,
@@ -35,8 +30,6 @@ from helpers.validations import (
     check_super_admin,
 )
 
-LOCAL_FILE_PATH = os.environ.get("LOCAL_FILE_PATH")
-
 
 # Create a new blog post
 class CreateBlogPost(APIView):
@@ -69,9 +62,7 @@ class CreateBlogPost(APIView):
             data["links"] = dict(request.data).get("links[]")
 
         check_required_fields(data, ["title", "content"])
-        abusive_words_check = check_abusive_words(content=data["content"])
-        data["censored_content"] = abusive_words_check[0]
-        data["is_abusive"] = abusive_words_check[1]
+        add_blog_text_fields(data)
 
         try:
             BlogPost.objects.get(title=data["title"])
@@ -82,11 +73,8 @@ class CreateBlogPost(APIView):
             blog = BlogPost.objects.create(**data)
 
             if cover_image:
-                res_data = None
                 for item in cover_image:
-                    res_data = upload_image_cover_or_pdf_to_azure(item, blog, user)
-                if type(res_data) is tuple:
-                    upload_cover_image(request, res_data, blog=blog)
+                    upload_image_cover_or_pdf_to_azure(item, blog, user)
             if files:
                 create_other_blog_documents(files, blog, user)
 
@@ -106,27 +94,6 @@ class CreateBlogPost(APIView):
             )
 
 
-class UploadThumbnailsToAzure(APIView):
-    def post(self, request, *args, **kwargs):
-        data = request.data
-        resp_data = upload_thumbnail(
-            data["file_path"], data["blob_name"], data["container_name"]
-        )
-
-        user_name = data["container_name"]
-        if path.exists(f"media/{user_name}"):
-            shutil.rmtree(f"media/{user_name}")
-
-        return JsonResponse(
-            {
-                "status": "success",
-                "detail": "Blog created and submitted for review",
-                "resp_data": resp_data,
-            },
-            safe=False,
-        )
-
-
 # Comment on Post
 class CommentOnBlogPost(APIView):
     permission_classes = (IsAuthenticated,)
@@ -168,6 +135,7 @@ class GetSingleBlogPost(APIView):
                     "total_likes",
                     "total_shares",
                     "cover_image",
+                    "cover_image_variants",
                     "links",
                     "censored_content",
                     "is_abusive",
@@ -231,16 +199,16 @@ class GetAllBlogPostsAsAdmin(APIView):
             .values(
                 "id",
                 "title",
-                "content",
                 "description",
+                "preview_text",
                 "total_likes",
                 "total_shares",
-                "censored_content",
                 "is_abusive",
                 "links",
                 "is_approved",
                 "is_published",
                 "cover_image",
+                "cover_image_variants",
                 "approved_and_published_by__first_name",
                 "approved_and_published_by__last_name",
                 "reference",
@@ -254,16 +222,14 @@ class GetAllBlogPostsAsAdmin(APIView):
             .order_by("-created_on")
         )
 
-        for blog_post in blog_posts:
-            converted_text = convert_quill_text_to_normal_text(blog_post["content"])
-            blog_post["preview_text"] = truncate_text(converted_text, 200)
+        data = paginate_request_data(request, blog_posts, page_number, 10)
+        for blog_post in data["data"]:
             total_comments = BlogComment.objects.filter(blog_id=blog_post["id"]).count()
             blog_post["total_comments"] = total_comments
             blog_post["documents"] = list(
                 BlogDocuments.objects.filter(blog_id=blog_post["id"]).values()
             )
 
-        data = paginate_data(blog_posts, page_number, 10)
         return JsonResponse(
             data,
             safe=False,
@@ -280,8 +246,8 @@ class GetAllPublishedBlogPost(APIView):
             .values(
                 "id",
                 "title",
-                "content",
                 "description",
+                "preview_text",
                 "is_approved",
                 "total_likes",
                 "total_shares",
@@ -289,8 +255,8 @@ class GetAllPublishedBlogPost(APIView):
                 "approved_and_published_by__first_name",
                 "approved_and_published_by__last_name",
                 "cover_image",
+                "cover_image_variants",
                 "links",
-                "censored_content",
                 "is_abusive",
                 "reference",
                 "author_id",
@@ -304,9 +270,8 @@ class GetAllPublishedBlogPost(APIView):
             .order_by("-created_on")
         )
 
-        for blog_post in blog_posts:
-            converted_text = convert_quill_text_to_normal_text(blog_post["content"])
-            blog_post["preview_text"] = truncate_text(converted_text, 200)
+        data = paginate_request_data(request, blog_posts, page_number, 10)
+        for blog_post in data["data"]:
             comments = (
                 BlogComment.objects.filter(blog_id=blog_post["id"])
                 .values(
@@ -327,7 +292,6 @@ class GetAllPublishedBlogPost(APIView):
                 .order_by("-created_on")
             )
 
-        data = paginate_data(blog_posts, page_number, 10)
         return JsonResponse(
             data,
             safe=False,
@@ -385,7 +349,7 @@ class DeleteBlogDocuments(APIView):
                     document = BlogDocuments.objects.get(
                         blog=blog, document_location=url
                     )
-                    delete_blob(container.lower(), document.document_location)
+                    delete_blob(container.lower(), document.document_key)
                     document.delete()
                 except BlogDocuments.DoesNotExist:
                     pass
@@ -432,18 +396,13 @@ class UpdateBlogPost(APIView):
             blog_id = data.pop("blog_post_id", None)
 
             if "content" in data:
-                abusive_words_check = check_abusive_words(content=data["content"])
-                data["censored_content"] = abusive_words_check[0]
-                data["is_abusive"] = abusive_words_check[1]
+                add_blog_text_fields(data)
             BlogPost.objects.filter(id=blog_id).update(**data)
 
             if cover_image:
-                delete_blob(user_name, blog.image_key)
+                delete_image_blob(user_name, blog.image_key)
                 for item in cover_image:
-                    res_data = upload_image_cover_or_pdf_to_azure(item, blog, user)
-
-                    if type(res_data) is tuple:
-                        upload_cover_image(request, res_data, blog=blog)
+                    upload_image_cover_or_pdf_to_azure(item, blog, user)
 
             if files:
                 create_other_blog_documents(files, blog, user)
@@ -483,14 +442,18 @@ class DeleteBlogPost(APIView):
         try:
             blog = BlogPost.objects.get(id=blog_post_id)
 
-            docs = BlogDocuments.objects.filter(blog_id=blog.id).values("document_key")
-            container = f"{blog.author.first_name}-{blog.author.last_name}"
-            for doc in docs:
-                delete_blob(container, doc["document_key"])
-
-            BlogDocuments.objects.filter(blog_id=blog.id).delete()
-
-            blog.delete()
+            documents = BlogDocuments.objects.filter(blog_id=blog.id)
+            container = f"{blog.author.first_name}-{blog.author.last_name}".lower()
+            with transaction.atomic():
+                schedule_blob_deletions(
+                    container,
+                    [
+                        *documents.values_list("document_key", flat=True),
+                        *with_image_variants([blog.image_key]),
+                    ],
+                )
+                documents.delete()
+                blog.delete()
 
             return JsonResponse(
                 {"status": "success", "detail": "Blog deleted successfully"},
@@ -581,8 +544,8 @@ class SearchBlogPosts(APIView):
             .values(
                 "id",
                 "title",
-                "content",
                 "description",
+                "preview_text",
                 "is_approved",
                 "total_likes",
                 "total_shares",
@@ -590,8 +553,8 @@ class SearchBlogPosts(APIView):
                 "approved_and_published_by__first_name",
                 "approved_and_published_by__last_name",
                 "cover_image",
+                "cover_image_variants",
                 "links",
-                "censored_content",
                 "is_abusive",
                 "reference",
                 "author_id",
@@ -604,7 +567,8 @@ class SearchBlogPosts(APIView):
             .order_by("-created_on")
         )
 
-        for blog_post in blog_posts:
+        data = paginate_request_data(request, blog_posts, page_number, 10)
+        for blog_post in data["data"]:
             comments = (
                 BlogComment.objects.filter(blog_id=blog_post["id"])
                 .values(
@@ -625,7 +589,6 @@ class SearchBlogPosts(APIView):
                 .order_by("-created_on")
             )
 
-        data = paginate_data(blog_posts, page_number, 10)
         return JsonResponse(
             data,
             safe=False,
@@ -6,7 +6,7 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from DocumentVault.models import Document
 from helpers.azure_file_handling import create_vault_document, delete_blob
-from helpers.functions import paginate_data
+from helpers.functions import paginate_request_data
 from helpers.status_codes import (
     action_authorization_exception,
     non_existing_data_exception,
@@ -101,7 +101,7 @@ class GetAllDocumentsInVault(APIView):
             .order_by("-created_on")
         )
 
-        data = paginate_data(list(documents), page_number, 20)
+        data = paginate_request_data(request, documents, page_number, 20)
         return JsonResponse(
             data,
             safe=False,
@@ -129,7 +129,7 @@ class GetMyDocumentsInVault(APIView):
             .order_by("-created_on")
         )
 
-        data = paginate_data(list(documents), page_number, 20)
+        data = paginate_request_data(request, documents, page_number, 20)
         return JsonResponse(
             data,
             safe=False,
@@ -156,7 +156,7 @@ class AdminGetAllDocumentsInVault(APIView):
             .order_by("-created_on")
         )
 
-        data = paginate_data(list(documents), page_number, 20)
+        data = paginate_request_data(request, documents, page_number, 20)
         return JsonResponse(
             data,
             safe=False,
@@ -7,7 +7,7 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from Events.models.events_model import Events
 from helpers.functions import (delete_file, delete_local_file,
-                               local_file_upload, paginate_data)
+                               local_file_upload, paginate_request_data)
 from helpers.status_codes import (action_authorization_exception,
                                   duplicate_data_exception,
                                   non_existing_data_exception)
@@ -224,14 +224,14 @@ class GetEventsByAuthor(APIView):
             .order_by("-created_on")
         )
 
-        for event in events:
+        data = paginate_request_data(request, events, page_number, 10)
+        for event in data["data"]:
             event["documents"] = list(
                 EventDocuments.objects.filter(event_id=event["id"]).values(
                     "id", "document_location"
                 )
             )
 
-        data = paginate_data(events, page_number, 10)
         return JsonResponse(
             data,
             safe=False,
@@ -0,0 +1,162 @@
+import gzip
+import os
+import re
+from datetime import date, datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from Forum.models import ChatMessageArchive
+
+CHAT_MESSAGES_TABLE = "Chat_Room_Messages"
+
+CHAT_ARCHIVE_DIR = os.getenv(
+    "CHAT_ARCHIVE_DIR", os.path.join(settings.BASE_DIR, "archives", "chat_messages")
+)
+ARCHIVE_FETCH_SIZE = 2000
+
+PARTITION_BOUND_PATTERN = re.compile(r"FROM \((.+)\) TO \((.+)\)")
+MISSING_PARTITION_MESSAGE = "no partition of relation"
+
+
+def add_months(month, count):
+    month_index = month.year * 12 + month.month - 1 + count
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def get_current_month():
+    today = timezone.now().date()
+    return date(today.year, today.month, 1)
+
+
+def parse_partition_bound(bound):
+    # Bounds read like '2026-11-01 00:00:00+00' or MINVALUE
+    if bound == "MINVALUE":
+        return None
+    return datetime.fromisoformat(bound.strip("'")[:10]).date()
+
+
+def get_partitions(cursor):
+    # Returns (table name, lower bound, upper bound) of every month partition
+    cursor.execute(
+        """
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = %s::regclass
+        """,
+        [connection.ops.quote_name(CHAT_MESSAGES_TABLE)],
+    )
+    partitions = []
+    for table_name, bound in cursor.fetchall():
+        match = PARTITION_BOUND_PATTERN.search(bound)
+        if match:
+            partitions.append(
+                (
+                    table_name,
+                    parse_partition_bound(match.group(1)),
+                    parse_partition_bound(match.group(2)),
+                )
+            )
+
+    return sorted(partitions, key=lambda partition: partition[2])
+
+
+def is_missing_partition_error(error):
+    # Postgres rejects a row that no partition covers with this message
+    diag = getattr(error.__cause__, "diag", None)
+    message = getattr(diag, "message_primary", None) or ""
+    return message.startswith(MISSING_PARTITION_MESSAGE)
+
+
+def create_future_partitions(months_ahead):
+    # One partition per month after the newest one, up to months_ahead
+    quote_name = connection.ops.quote_name
+    last_month = add_months(get_current_month(), months_ahead)
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        # The command and the writers of a month without a partition both
+        # create partitions, one at a time
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(hashtext(%s))", [CHAT_MESSAGES_TABLE]
+        )
+        partitions = get_partitions(cursor)
+        month = partitions[-1][2] if partitions else get_current_month()
+        while month <= last_month:
+            next_month = add_months(month, 1)
+            table_name = f"{CHAT_MESSAGES_TABLE}_{month:%Y_%m}"
+            cursor.execute(
+                f"CREATE TABLE {quote_name(table_name)} "
+                f"PARTITION OF {quote_name(CHAT_MESSAGES_TABLE)} "
+                "FOR VALUES FROM (%s) TO (%s)",
+                [month, next_month],
+            )
+            created.append(table_name)
+            month = next_month
+
+    return created
+
+
+def detach_old_partitions(retain_months):
+    # Detach the partitions that only hold months older than the retention.
+    # Each one is recorded so that only these tables are archived and dropped.
+    quote_name = connection.ops.quote_name
+    cutoff = add_months(get_current_month(), -retain_months)
+    detached = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table_name, _, upper_bound in get_partitions(cursor):
+            if upper_bound > cutoff:
+                break
+            cursor.execute(
+                f"ALTER TABLE {quote_name(CHAT_MESSAGES_TABLE)} "
+                f"DETACH PARTITION {quote_name(table_name)}"
+            )
+            ChatMessageArchive.objects.create(table_name=table_name)
+            detached.append(table_name)
+
+    return detached
+
+
+def get_pending_archives():
+    # Detached partitions not archived yet, including ones whose run failed
+    return ChatMessageArchive.objects.filter(archived_on__isnull=True)
+
+
+def archive_partition(chat_message_archive, archive_dir=CHAT_ARCHIVE_DIR):
+    # Write a detached partition to gzip JSONL, then drop it
+    quote_name = connection.ops.quote_name
+    table_name = chat_message_archive.table_name
+    os.makedirs(archive_dir, exist_ok=True)
+    archive_path = os.path.join(archive_dir, f"{table_name}.jsonl.gz")
+    partial_path = f"{archive_path}.partial"
+
+    row_count = 0
+    with transaction.atomic():
+        # Server side cursor, so the partition is streamed rather than loaded
+        with connection.chunked_cursor() as cursor, gzip.open(
+            partial_path, "wt", encoding="utf-8"
+        ) as archive:
+            cursor.execute(
+                f"SELECT row_to_json(message)::text FROM {quote_name(table_name)} "
+                "AS message ORDER BY created_on, id"
+            )
+            while True:
+                rows = cursor.fetchmany(ARCHIVE_FETCH_SIZE)
+                if not rows:
+                    break
+                archive.writelines(f"{row}\n" for (row,) in rows)
+                row_count += len(rows)
+
+    os.replace(partial_path, archive_path)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE {quote_name(table_name)}")
+        chat_message_archive.archive_path = archive_path
+        chat_message_archive.row_count = row_count
+        chat_message_archive.archived_on = timezone.now()
+        chat_message_archive.save(
+            update_fields=["archive_path", "row_count", "archived_on"]
+        )
+
+    return archive_path, row_count
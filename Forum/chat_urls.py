@@ -3,6 +3,7 @@ from django.urls import path
 from .views.chat_room_views import (
     CreateChatRooms,
     DeleteChatRoom,
+    GetChatMessages,
     GetChatRoom,
     UpdateChatRoom,
     LeaveChatRoom,
@@ -26,6 +27,11 @@ urlpatterns = [
         GetChatRoom.as_view(),
         name="Get Chat Room",
     ),
+    path(
+        "get-chat-messages/<int:room_id>/",
+        GetChatMessages.as_view(),
+        name="Get Chat Messages",
+    ),
     path(
         "update-chat-room/<int:room_id>/",
         UpdateChatRoom.as_view(),
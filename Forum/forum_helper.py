@@ -1,7 +1,65 @@
+from collections import Counter
 from datetime import datetime
 
-from Forum.models import ChatRoomMessages, Forum
+from django.db import IntegrityError, transaction
+from django.db.models import BooleanField, Case, F, Value, When
+from django.utils import timezone
+
+from Forum.chat_partitions import create_future_partitions, is_missing_partition_error
+from Forum.models import (
+    ChatRoom,
+    ChatRoomMessages,
+    Forum,
+    ForumDiscussion,
+    ForumFile,
+    VirtualMeeting,
+)
 from helpers.email_sender import send_email
+from helpers.functions import paginate_data_by_cursor
+
+FORUM_MEETING_FIELDS = (
+    "id",
+    "meeting_agenda",
+    "meeting_url",
+    "scheduled_start_time",
+    "scheduled_end_time",
+    "organizer__first_name",
+    "organizer__last_name",
+    "total_attendees",
+)
+
+FORUM_FILE_FIELDS = ("id", "description", "file_type", "file_url", "created_on")
+
+FORUM_CHAT_ROOM_FIELDS = ("id", "room_name", "total_members", "total_messages")
+
+CHAT_MESSAGE_FIELDS = (
+    "id",
+    "sender_id",
+    "sender__first_name",
+    "sender__last_name",
+    "message",
+    "is_media",
+    "media_files",
+    "file_type",
+    "created_on",
+    "is_sender",
+)
+
+# Largest page of chat history returned at once
+CHAT_HISTORY_PAGE_SIZE = 50
+CHAT_HISTORY_MAX_PAGE_SIZE = 200
+
+FORUM_DISCUSSION_FIELDS = (
+    "id",
+    "comment",
+    "commentor__user_key",
+    "commentor__first_name",
+    "commentor__last_name",
+    "commentor__profile_image",
+    "is_forum_admin",
+    "total_likes",
+    "created_on",
+)
 
 
 def send_forum_declination_mail(forum, comments):
@@ -136,8 +194,8 @@ def send_forum_join_request_approval_to_user(forum, user):
     send_email(recipient_email, subject, message)
 
 
-def create_chat_room_message(data, file_type=None):
-    ChatRoomMessages.objects.create(
+def build_chat_room_message(data, file_type=None):
+    return ChatRoomMessages(
         chat_room_id=data["chat_room_id"],
         sender_id=data["sender_id"],
         message=data["message"],
@@ -147,6 +205,117 @@ def create_chat_room_message(data, file_type=None):
     )
 
 
+def insert_chat_room_messages(messages):
+    # Insert the messages at once and bump each room's counter in one update
+    room_counts = Counter(message.chat_room_id for message in messages)
+    with transaction.atomic():
+        ChatRoomMessages.objects.bulk_create(messages)
+        for chat_room_id, count in room_counts.items():
+            ChatRoom.objects.filter(id=chat_room_id).update(
+                total_messages=F("total_messages") + count
+            )
+
+
+def create_chat_room_messages(messages):
+    try:
+        insert_chat_room_messages(messages)
+    except IntegrityError as e:
+        # manage_chat_partitions has not created the month yet, so the
+        # messages would be refused until it runs
+        if not is_missing_partition_error(e):
+            raise
+        create_future_partitions(0)
+        insert_chat_room_messages(messages)
+
+
+def create_chat_room_message(data, file_type=None):
+    create_chat_room_messages([build_chat_room_message(data, file_type)])
+
+
+def get_chat_history_page_size(request):
+    try:
+        page_size = int(request.GET.get("limit", CHAT_HISTORY_PAGE_SIZE))
+    except ValueError:
+        page_size = CHAT_HISTORY_PAGE_SIZE
+
+    return min(max(page_size, 1), CHAT_HISTORY_MAX_PAGE_SIZE)
+
+
+def get_chat_history(chat_room_id, user, before, page_size):
+    # Page backwards from the cursor over the history index, newest first.
+    # The upper bound prunes the empty future month partitions, so the
+    # latest page is read from the current month.
+    messages = (
+        ChatRoomMessages.objects.filter(
+            chat_room_id=chat_room_id, created_on__lte=timezone.now()
+        )
+        .annotate(
+            is_sender=Case(
+                When(sender_id=user.user_key, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+        )
+        .values(*CHAT_MESSAGE_FIELDS)
+    )
+    data = paginate_data_by_cursor(messages, before, page_size)
+
+    # Clients render the page oldest first
+    data["data"].reverse()
+    return data
+
+
+def group_by_forum(model, forum_ids, fields):
+    # Retrieve the related rows of all the given forums in a single query
+    grouped_data = {forum_id: [] for forum_id in forum_ids}
+    for item in model.objects.filter(forum_id__in=forum_ids).values(
+        "forum_id", *fields
+    ):
+        grouped_data[item.pop("forum_id")].append(item)
+
+    return grouped_data
+
+
+def attach_forum_listing_details(forums, user=None, with_discussions=False):
+    # Load the child collections of a page of forums with one query per relation
+    forum_ids = [forum["id"] for forum in forums]
+    meetings = group_by_forum(VirtualMeeting, forum_ids, FORUM_MEETING_FIELDS)
+    files = group_by_forum(ForumFile, forum_ids, FORUM_FILE_FIELDS)
+    chat_rooms = group_by_forum(ChatRoom, forum_ids, FORUM_CHAT_ROOM_FIELDS)
+    if with_discussions:
+        discussions = group_by_forum(
+            ForumDiscussion, forum_ids, FORUM_DISCUSSION_FIELDS
+        )
+
+    # Retrieve the forums on the page the viewer has liked or joined
+    liked_forum_ids = set()
+    member_forum_ids = set()
+    if user is not None and user.is_authenticated:
+        liked_forum_ids = set(
+            Forum.forum_likers.through.objects.filter(
+                forum_id__in=forum_ids, user_id=user.user_key
+            ).values_list("forum_id", flat=True)
+        )
+        member_forum_ids = set(
+            Forum.forum_members.through.objects.filter(
+                forum_id__in=forum_ids, user_id=user.user_key
+            ).values_list("forum_id", flat=True)
+        )
+
+    for forum in forums:
+        forum["virtual_meetings"] = meetings[forum["id"]]
+        forum["files"] = files[forum["id"]]
+        forum["chat_rooms"] = chat_rooms[forum["id"]]
+        if with_discussions:
+            forum["discussions"] = discussions[forum["id"]]
+        if user is not None:
+            forum["is_authenticated"] = user.is_authenticated
+            forum["has_liked"] = forum["id"] in liked_forum_ids
+            forum["is_member"] = forum["id"] in member_forum_ids
+
+    return forums
+
+
 def get_randomized_forums_suggestions(forum_id):
     from random import sample
 
@@ -73,6 +73,11 @@ urlpatterns = [
         SearchForum.as_view(),
         name="Search Forums",
     ),
+    path(
+        "search-forums/<int:page_number>/",
+        SearchForum.as_view(),
+        name="Search Forums Page",
+    ),
     path(
         "upload-forum-files/<int:forum_id>/",
         UploadForumFiles.as_view(),
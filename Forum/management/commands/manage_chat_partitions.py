@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from Forum.chat_partitions import (
+    CHAT_ARCHIVE_DIR,
+    archive_partition,
+    create_future_partitions,
+    detach_old_partitions,
+    get_pending_archives,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the coming monthly partitions of Chat_Room_Messages and move "
+        "old ones to gzip JSONL archives"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep running and check the partitions every given number of seconds",
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Number of months after the current one to create partitions for",
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=12,
+            help="Number of months before the current one kept in the database",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            default=CHAT_ARCHIVE_DIR,
+            help="Directory the archived partitions are written to",
+        )
+        parser.add_argument(
+            "--detach-only",
+            action="store_true",
+            help="Detach old partitions without archiving and dropping them",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Chat message partitions need a Postgres database")
+
+        interval = options["interval"]
+
+        while True:
+            for table_name in create_future_partitions(options["months_ahead"]):
+                self.stdout.write(f"Created partition {table_name}")
+
+            for table_name in detach_old_partitions(options["retain_months"]):
+                self.stdout.write(f"Detached partition {table_name}")
+
+            if not options["detach_only"]:
+                for chat_message_archive in get_pending_archives():
+                    archive_path, row_count = archive_partition(
+                        chat_message_archive, options["archive_dir"]
+                    )
+                    self.stdout.write(
+                        f"Archived {row_count} messages from "
+                        f"{chat_message_archive.table_name} to {archive_path}"
+                    )
+
+            if not interval:
+                break
+            time.sleep(interval)
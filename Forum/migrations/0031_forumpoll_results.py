@@ -0,0 +1,17 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Forum", "0030_remove_sharedfile_description"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="forumpoll",
+            name="results",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
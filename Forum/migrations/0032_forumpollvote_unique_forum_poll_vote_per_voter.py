@@ -0,0 +1,48 @@
+# Generated by Django 4.2.1 on 2026-10-18 10:05
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_votes(apps, schema_editor):
+    ForumPollVote = apps.get_model("Forum", "ForumPollVote")
+    ForumPollChoices = apps.get_model("Forum", "ForumPollChoices")
+    ForumPoll = apps.get_model("Forum", "ForumPoll")
+
+    duplicates = (
+        ForumPollVote.objects.order_by()
+        .values("forum_poll_id", "voter_id")
+        .annotate(first_id=Min("id"), total=Count("id"))
+        .filter(total__gt=1)
+    )
+
+    poll_ids = set()
+    for duplicate in duplicates:
+        # Keep the first vote cast by the voter
+        ForumPollVote.objects.filter(
+            forum_poll_id=duplicate["forum_poll_id"], voter_id=duplicate["voter_id"]
+        ).exclude(id=duplicate["first_id"]).delete()
+        poll_ids.add(duplicate["forum_poll_id"])
+
+    # Recount the choices of the affected polls from the remaining votes
+    for choice in ForumPollChoices.objects.filter(forum_poll_id__in=poll_ids):
+        choice.votes = ForumPollVote.objects.filter(poll_choice_id=choice.id).count()
+        choice.save(update_fields=["votes"])
+    ForumPoll.objects.filter(id__in=poll_ids).update(results=None)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Forum", "0031_forumpoll_results"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_votes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="forumpollvote",
+            constraint=models.UniqueConstraint(
+                fields=("forum_poll", "voter"),
+                name="unique_forum_poll_vote_per_voter",
+            ),
+        ),
+    ]
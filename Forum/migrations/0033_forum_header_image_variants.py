@@ -0,0 +1,17 @@
+# Generated by Django 4.2.1 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Forum", "0032_forumpollvote_unique_forum_poll_vote_per_voter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="forum",
+            name="header_image_variants",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
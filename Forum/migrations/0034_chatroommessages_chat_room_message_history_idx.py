@@ -0,0 +1,19 @@
+# Generated by Django 4.2.1 on 2026-10-18 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Forum", "0033_forum_header_image_variants"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chatroommessages",
+            index=models.Index(
+                fields=["chat_room", "created_on", "id"],
+                name="chat_room_message_history_idx",
+            ),
+        ),
+    ]
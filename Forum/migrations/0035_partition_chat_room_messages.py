@@ -0,0 +1,108 @@
+# Generated by Django 4.2.1 on 2026-10-18 16:40
+
+from django.db import migrations
+
+# The existing table becomes the first partition, holding every row up to the
+# end of the current month, so no rows are copied. The next months are created
+# here and later ones by the manage_chat_partitions command, or by the first
+# write of a month that has none. There is no
+# default partition, it would stop Postgres from scanning the month partitions
+# in order for the newest messages.
+PARTITION_CHAT_ROOM_MESSAGES = """
+ALTER TABLE "Chat_Room_Messages" RENAME TO "Chat_Room_Messages_legacy";
+-- Replaced by the (id, created_on) key of the parent when attached
+ALTER TABLE "Chat_Room_Messages_legacy" DROP CONSTRAINT "Chat_Room_Messages_pkey";
+ALTER INDEX "chat_room_message_history_idx"
+    RENAME TO "Chat_Room_Messages_legacy_history_idx";
+
+DO $$
+DECLARE
+    next_id bigint;
+    foreign_key record;
+BEGIN
+    SELECT COALESCE(MAX(id), 0) + 1 INTO next_id FROM "Chat_Room_Messages_legacy";
+    CREATE SEQUENCE "Chat_Room_Messages_partitioned_id_seq";
+    PERFORM setval('"Chat_Room_Messages_partitioned_id_seq"', next_id, false);
+
+    -- Ids now come from the parent table's sequence
+    ALTER TABLE "Chat_Room_Messages_legacy" ALTER COLUMN id DROP IDENTITY IF EXISTS;
+    ALTER TABLE "Chat_Room_Messages_legacy" ALTER COLUMN id DROP DEFAULT;
+
+    -- The parent's foreign keys are cloned onto the partition when attached
+    FOR foreign_key IN
+        SELECT conname FROM pg_constraint
+        WHERE conrelid = '"Chat_Room_Messages_legacy"'::regclass AND contype = 'f'
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE "Chat_Room_Messages_legacy" DROP CONSTRAINT %I',
+            foreign_key.conname
+        );
+    END LOOP;
+END $$;
+
+CREATE TABLE "Chat_Room_Messages" (
+    LIKE "Chat_Room_Messages_legacy" INCLUDING DEFAULTS
+) PARTITION BY RANGE (created_on);
+
+ALTER TABLE "Chat_Room_Messages"
+    ALTER COLUMN id SET DEFAULT nextval('"Chat_Room_Messages_partitioned_id_seq"');
+ALTER SEQUENCE "Chat_Room_Messages_partitioned_id_seq"
+    OWNED BY "Chat_Room_Messages".id;
+
+-- Unique constraints on a partitioned table must include the partition key
+ALTER TABLE "Chat_Room_Messages"
+    ADD CONSTRAINT "Chat_Room_Messages_pkey" PRIMARY KEY (id, created_on);
+ALTER TABLE "Chat_Room_Messages"
+    ADD CONSTRAINT "Chat_Room_Messages_chat_room_id_fk"
+    FOREIGN KEY (chat_room_id) REFERENCES "Chat_Rooms" (id)
+    DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE "Chat_Room_Messages"
+    ADD CONSTRAINT "Chat_Room_Messages_sender_id_fk"
+    FOREIGN KEY (sender_id) REFERENCES "Users" (user_key)
+    DEFERRABLE INITIALLY DEFERRED;
+
+CREATE INDEX "chat_room_message_history_idx"
+    ON "Chat_Room_Messages" (chat_room_id, created_on, id);
+CREATE INDEX "Chat_Room_Messages_sender_id_idx"
+    ON "Chat_Room_Messages" (sender_id);
+
+DO $$
+DECLARE
+    month_start timestamp;
+BEGIN
+    month_start := date_trunc('month', now() AT TIME ZONE 'UTC') + interval '1 month';
+    EXECUTE format(
+        'ALTER TABLE "Chat_Room_Messages" ATTACH PARTITION "Chat_Room_Messages_legacy" '
+        'FOR VALUES FROM (MINVALUE) TO (%L)',
+        month_start
+    );
+    FOR month IN 1..3 LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF "Chat_Room_Messages" '
+            'FOR VALUES FROM (%L) TO (%L)',
+            'Chat_Room_Messages_' || to_char(month_start, 'YYYY_MM'),
+            month_start,
+            month_start + interval '1 month'
+        );
+        month_start := month_start + interval '1 month';
+    END LOOP;
+END $$;
+"""
+
+
+def partition_chat_room_messages(apps, schema_editor):
+    # Native partitioning is Postgres only, other databases keep the plain table
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    # No params, so the % of format() is not taken as a placeholder
+    schema_editor.execute(PARTITION_CHAT_ROOM_MESSAGES, params=None)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Forum", "0034_chatroommessages_chat_room_message_history_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_chat_room_messages),
+    ]
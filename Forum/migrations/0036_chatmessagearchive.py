@@ -0,0 +1,38 @@
+# Generated by Django 4.2.1 on 2026-10-18 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Forum", "0035_partition_chat_room_messages"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChatMessageArchive",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("table_name", models.CharField(max_length=255, unique=True)),
+                (
+                    "archive_path",
+                    models.CharField(blank=True, max_length=1024, null=True),
+                ),
+                ("row_count", models.PositiveIntegerField(blank=True, null=True)),
+                ("detached_on", models.DateTimeField(auto_now_add=True)),
+                ("archived_on", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "Chat_Message_Archives",
+                "ordering": ("detached_on",),
+            },
+        ),
+    ]
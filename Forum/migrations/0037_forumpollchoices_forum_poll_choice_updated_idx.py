@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Forum", "0036_chatmessagearchive"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="forumpollchoices",
+            index=models.Index(
+                fields=["updated_on"], name="forum_poll_choice_updated_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+import Polls.models.poll_models
+
+
+def fill_forum_poll_results(apps, schema_editor):
+    # Forum polls created before their results were stored are counted once
+    # here, so that reading a poll never has to write them
+    ForumPoll = apps.get_model("Forum", "ForumPoll")
+    ForumPollChoices = apps.get_model("Forum", "ForumPollChoices")
+    polls = list(ForumPoll.objects.filter(results__isnull=True).only("id"))
+    for poll in polls:
+        choices = [
+            {"id": choice["id"], "choice": choice["choice"], "votes": choice["votes"]}
+            for choice in ForumPollChoices.objects.filter(forum_poll_id=poll.id)
+            .values("id", "choice", "votes")
+            .order_by("created_on")
+        ]
+        poll.results = {
+            "total_votes": sum(choice["votes"] for choice in choices),
+            "choices": choices,
+        }
+    ForumPoll.objects.bulk_update(polls, ["results"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Forum", "0037_forumpollchoices_forum_poll_choice_updated_idx"),
+        ("Polls", "0015_fill_poll_results"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="forumpollchoices",
+            name="forum_poll_choice_updated_idx",
+        ),
+        migrations.RunPython(fill_forum_poll_results, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="forumpoll",
+            name="results",
+            field=models.JSONField(
+                blank=True, default=Polls.models.poll_models.empty_poll_results
+            ),
+        ),
+    ]
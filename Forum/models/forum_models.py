@@ -1,6 +1,7 @@
 from django.db import models
 
 from Auth.models import User, Country
+from Polls.models.poll_models import empty_poll_results, poll_has_ended
 
 
 class Forum(models.Model):
@@ -31,6 +32,7 @@ class Forum(models.Model):
     )
     header_key = models.CharField(max_length=255, blank=True)
     header_image = models.CharField(max_length=255, blank=True)
+    header_image_variants = models.JSONField(null=True, blank=True)
     total_likes = models.IntegerField(default=0)
     total_comments = models.IntegerField(default=0)
     total_members = models.IntegerField(default=0)
@@ -260,6 +262,25 @@ class ChatRoomMessages(models.Model):
     class Meta:
         ordering = ("-created_on",)
         db_table = "Chat_Room_Messages"
+        indexes = [
+            models.Index(
+                fields=["chat_room", "created_on", "id"],
+                name="chat_room_message_history_idx",
+            ),
+        ]
+
+
+class ChatMessageArchive(models.Model):
+    # Month partitions of Chat_Room_Messages detached by manage_chat_partitions
+    table_name = models.CharField(max_length=255, unique=True)
+    archive_path = models.CharField(max_length=1024, null=True, blank=True)
+    row_count = models.PositiveIntegerField(null=True, blank=True)
+    detached_on = models.DateTimeField(auto_now_add=True)
+    archived_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("detached_on",)
+        db_table = "Chat_Message_Archives"
 
 
 class ForumPoll(models.Model):
@@ -281,6 +302,7 @@ class ForumPoll(models.Model):
     start_date = models.DateField(auto_now_add=False, null=True, blank=True)
     end_date = models.DateField(auto_now_add=False, null=True, blank=True)
     is_ended = models.BooleanField(default=False)
+    results = models.JSONField(default=empty_poll_results, blank=True)
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now_add=False, null=True, blank=True)
 
@@ -288,6 +310,10 @@ class ForumPoll(models.Model):
         ordering = ("-created_on",)
         db_table = "Forum_Polls"
 
+    @property
+    def has_ended(self):
+        return poll_has_ended(self.is_ended, self.end_date)
+
 
 class ForumPollChoices(models.Model):
     forum_poll = models.ForeignKey(
@@ -335,6 +361,12 @@ class ForumPollVote(models.Model):
     class Meta:
         ordering = ("created_on",)
         db_table = "Forum_Poll_Votes"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["forum_poll", "voter"],
+                name="unique_forum_poll_vote_per_voter",
+            ),
+        ]
 
 
 class ForumDiscussion(models.Model):
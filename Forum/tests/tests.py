@@ -1,3 +1,250 @@
+import uuid
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.db import OperationalError, connection
 from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from Auth.models import User
+from Forum.chat_partitions import (
+    CHAT_MESSAGES_TABLE,
+    get_current_month,
+    get_partitions,
+)
+from Forum.models import ChatRoom, ChatRoomMessages, Forum, UserChatRoom
+from chat_channels.membership import (
+    cache_membership,
+    get_cached_membership,
+    remove_chat_room_members,
+)
+from chat_channels.message_buffer import ChatMessageBuffer, get_redis_client
+from chat_channels.routing import websocket_urlpatterns
+
+
+class ChatMessageBufferTests(TestCase):
+    def setUp(self):
+        self.sender = User.objects.create_user("sender@example.com", "password")
+        self.chat_room = ChatRoom.objects.create(room_name="Room", description="")
+        self.journal_key = f"test_chat_message_journal:{uuid.uuid4().hex}"
+        self.buffer = ChatMessageBuffer(self.journal_key)
+
+    def tearDown(self):
+        client = get_redis_client()
+        for key in client.scan_iter(f"{self.journal_key}*"):
+            client.delete(key)
+
+    def get_written_messages(self):
+        return list(
+            ChatRoomMessages.objects.order_by("id").values_list("message", flat=True)
+        )
+
+    def make_message(self, message, sender_id=None, chat_room_id=None):
+        return {
+            "chat_room_id": chat_room_id or self.chat_room.id,
+            "sender_id": str(sender_id or self.sender.user_key),
+            "message": message,
+            "media_files": [],
+        }
+
+    def test_invalid_rows_are_dropped_and_the_rest_written(self):
+        for data in (
+            self.make_message("first"),
+            self.make_message("unknown sender", sender_id=uuid.uuid4()),
+            self.make_message("deleted room", chat_room_id=self.chat_room.id + 1),
+            # Postgres refuses NUL characters in text
+            self.make_message("bad\x00row"),
+            self.make_message("last"),
+        ):
+            self.buffer.append(data)
+
+        self.buffer.write_messages(self.buffer.take_messages())
+
+        self.assertEqual(self.get_written_messages(), ["first", "last"])
+        self.chat_room.refresh_from_db()
+        self.assertEqual(self.chat_room.total_messages, 2)
+        # Nothing is kept around to fail the next flush again
+        self.assertEqual(self.buffer.messages, [])
+
+    def test_failed_flushes_keep_the_messages_until_they_are_written(self):
+        self.buffer.append(self.make_message("first"))
+
+        with mock.patch(
+            "chat_channels.message_buffer.persist_chat_messages",
+            side_effect=OperationalError,
+        ):
+            for _ in range(100):
+                self.buffer.write_messages(self.buffer.take_messages())
+        self.assertEqual(len(self.buffer.messages), 1)
+
+        self.buffer.write_messages(self.buffer.take_messages())
+
+        self.assertEqual(self.get_written_messages(), ["first"])
+        # Written messages are removed from the journal
+        self.assertEqual(
+            get_redis_client().xlen(
+                self.buffer.get_journal_name(self.buffer.worker_id)
+            ),
+            0,
+        )
+
+    def test_journal_of_a_stopped_worker_is_written_by_another(self):
+        self.buffer.append(self.make_message("first"))
+        self.buffer.append(self.make_message("second"))
+        # The worker is killed before flushing, so its heartbeat runs out
+        get_redis_client().delete(self.buffer.get_heartbeat_key(self.buffer.worker_id))
+
+        other_buffer = ChatMessageBuffer(self.journal_key)
+        other_buffer.keep_journal_alive()
+        other_buffer.write_messages(other_buffer.take_messages())
+
+        self.assertEqual(self.get_written_messages(), ["first", "second"])
+        self.assertFalse(
+            get_redis_client().exists(
+                self.buffer.get_journal_name(self.buffer.worker_id)
+            )
+        )
+
+    def test_messages_of_a_month_without_a_partition_are_written(self):
+        # manage_chat_partitions last ran before this month
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            for table_name, _, _ in get_partitions(cursor):
+                cursor.execute(
+                    f"ALTER TABLE {quote_name(CHAT_MESSAGES_TABLE)} "
+                    f"DETACH PARTITION {quote_name(table_name)}"
+                )
+            cursor.execute(
+                f"CREATE TABLE {quote_name('Chat_Room_Messages_old')} "
+                f"PARTITION OF {quote_name(CHAT_MESSAGES_TABLE)} "
+                "FOR VALUES FROM (MINVALUE) TO (%s)",
+                [get_current_month()],
+            )
+
+        self.buffer.append(self.make_message("first"))
+        self.buffer.write_messages(self.buffer.take_messages())
+
+        self.assertEqual(self.get_written_messages(), ["first"])
+        with connection.cursor() as cursor:
+            self.assertEqual(
+                [table_name for table_name, _, _ in get_partitions(cursor)],
+                [
+                    "Chat_Room_Messages_old",
+                    f"{CHAT_MESSAGES_TABLE}_{get_current_month():%Y_%m}",
+                ],
+            )
+
+
+class ChatRoomMembershipTests(TestCase):
+    def setUp(self):
+        self.member = User.objects.create_user("member@example.com", "password")
+        self.chat_room = ChatRoom.objects.create(
+            room_name="Room", description="", total_members=1
+        )
+        UserChatRoom.objects.create(chat_room=self.chat_room, member=self.member)
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def test_leaving_a_room_clears_the_cached_membership(self):
+        async_to_sync(cache_membership)(
+            str(self.chat_room.id), str(self.member.user_key), {"member": True}
+        )
+
+        response = self.client.post(f"/chats/leave-chat-room/{self.chat_room.id}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(
+            async_to_sync(get_cached_membership)(
+                str(self.chat_room.id), str(self.member.user_key)
+            )
+        )
+
+    async def test_removed_member_socket_is_closed(self):
+        communicator = WebsocketCommunicator(
+            websocket_urlpatterns,
+            f"/ws/chat-messages/{self.chat_room.id}/"
+            f"?token={AccessToken.for_user(self.member)}",
+        )
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        await sync_to_async(remove_chat_room_members)(
+            [(self.chat_room.id, self.member.user_key)]
+        )
+
+        output = await communicator.receive_output()
+        self.assertEqual(output["type"], "websocket.close")
+        await communicator.wait()
+
+
+class ForumListingTests(TestCase):
+    # Each listing loads the details of a page with one query per relation,
+    # so a query per forum shows up as a higher count
+    def setUp(self):
+        self.author = User.objects.create_user("author@example.com", "password")
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        for index in range(25):
+            forum = Forum.objects.create(
+                topic=f"Housing {index}",
+                description="",
+                tags=[],
+                author=self.author,
+                is_approved=True,
+            )
+            ChatRoom.objects.create(room_name="Room", description="", forum=forum)
+
+    def assert_page_of_forums(self, response):
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["total_data"], 25)
+        self.assertEqual(data["current_page"], 2)
+        self.assertEqual(len(data["data"]), 10)
+        for forum in data["data"]:
+            self.assertEqual(len(forum["chat_rooms"]), 1)
+
+    def test_all_forums_load_the_details_of_one_page_only(self):
+        # Two counts, the page, four relations, the viewer's likes and joins
+        with self.assertNumQueries(9):
+            response = self.client.get("/forum/get-all-forums/1/2/")
+
+        self.assert_page_of_forums(response)
+
+    def test_admin_forums_load_the_details_of_one_page_only(self):
+        # Two counts, the page and four relations
+        with self.assertNumQueries(7):
+            response = self.client.get("/super-admin/get-all-forums/1/2/")
+
+        self.assert_page_of_forums(response)
+
+    def test_my_forums_load_the_details_of_one_page_only(self):
+        # Two counts, the page and three relations
+        with self.assertNumQueries(6):
+            response = self.client.get("/users/my-forums/1/2/")
+
+        self.assert_page_of_forums(response)
+
+    def test_search_loads_the_details_of_one_page_only(self):
+        # Two counts, the page and three relations
+        with self.assertNumQueries(6):
+            response = self.client.post(
+                "/forum/search-forums/2/", {"search_query": "Housing"}
+            )
+
+        self.assert_page_of_forums(response)
+
+    def test_search_without_a_page_returns_every_match(self):
+        # The matches and three relations
+        with self.assertNumQueries(4):
+            response = self.client.post(
+                "/forum/search-forums/", {"search_query": "Housing"}
+            )
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["status"], "success")
+        self.assertEqual(len(data["data"]), 25)
+        for forum in data["data"]:
+            self.assertEqual(len(forum["chat_rooms"]), 1)
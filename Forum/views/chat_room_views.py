@@ -1,16 +1,28 @@
 import json
 from datetime import datetime
 
+from django.db import transaction
 from django.db.models import Q
 from django.http import JsonResponse
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
-from Forum.forum_helper import create_chat_room_message
-from Forum.models import ChatRoom, UserChatRoom, Forum, ChatRoomMessages
-from chat_channels.sender_functions import send_group_message
-from helpers.azure_file_handling import create_chat_shared_file
+from Forum.forum_helper import (
+    create_chat_room_message,
+    get_chat_history,
+    get_chat_history_page_size,
+)
+from Forum.models import ChatRoom, SharedFile, UserChatRoom, Forum
+from chat_channels.membership import remove_chat_room_members
+from chat_channels.sender_functions import (
+    get_chat_room_group_name,
+    send_group_message,
+)
+from helpers.azure_file_handling import (
+    create_chat_shared_file,
+    schedule_shared_file_deletions,
+)
 from helpers.status_codes import (
     action_authorization_exception,
     duplicate_data_exception,
@@ -20,6 +32,13 @@ from helpers.status_codes import (
 from helpers.validations import check_permission, check_required_fields
 
 
+def check_chat_room_membership(room_id, user):
+    if not UserChatRoom.objects.filter(chat_room_id=room_id, member=user).exists():
+        if not ChatRoom.objects.filter(id=room_id).exists():
+            raise non_existing_data_exception("Chat Room")
+        raise cannot_perform_action("User not a member of chat room")
+
+
 class CreateChatRooms(APIView):
     permission_classes = (IsAuthenticated,)
     authentication_classes = (JWTAuthentication,)
@@ -85,7 +104,17 @@ class DeleteChatRoom(APIView):
                 user.user_key == meeting_room.creator_id
                 or user.role.name == "Super Admin"
             ):
-                meeting_room.delete()
+                members = list(
+                    UserChatRoom.objects.filter(chat_room_id=room_id).values_list(
+                        "chat_room_id", "member_id"
+                    )
+                )
+                with transaction.atomic():
+                    schedule_shared_file_deletions(
+                        SharedFile.objects.filter(chat_room_id=room_id)
+                    )
+                    meeting_room.delete()
+                remove_chat_room_members(members)
                 return JsonResponse(
                     {
                         "status": "success",
@@ -108,14 +137,7 @@ class GetChatRoom(APIView):
         user = self.request.user
         room_id = self.kwargs["room_id"]
 
-        try:
-            chat = ChatRoom.objects.get(id=room_id)
-            try:
-                UserChatRoom.objects.get(member=user, chat_room_id=chat.id)
-            except UserChatRoom.DoesNotExist:
-                raise cannot_perform_action("User not a member of chat room")
-        except ChatRoom.DoesNotExist:
-            raise non_existing_data_exception("Chat Room")
+        check_chat_room_membership(room_id, user)
 
         chat_room = (
             ChatRoom.objects.filter(id=room_id)
@@ -135,25 +157,12 @@ class GetChatRoom(APIView):
             .first()
         )
 
-        messages = (
-            ChatRoomMessages.objects.filter(chat_room_id=chat_room["id"])
-            .values(
-                "sender_id",
-                "sender__first_name",
-                "sender__last_name",
-                "message",
-                "is_media",
-                "media_files",
-                "file_type",
-                "created_on",
-            )
-            .order_by("created_on")
+        # Only the latest messages, older ones are paged in from GetChatMessages
+        history = get_chat_history(
+            room_id, user, None, get_chat_history_page_size(request)
         )
-        for message in messages:
-            message["is_sender"] = (
-                True if message["sender_id"] == user.user_key else False
-            )
-        chat_room["messages"] = list(messages)
+        chat_room["messages"] = history["data"]
+        chat_room["messages_cursor"] = history["next_cursor"]
 
         return JsonResponse(
             {
@@ -165,6 +174,26 @@ class GetChatRoom(APIView):
         )
 
 
+class GetChatMessages(APIView):
+    permission_classes = (IsAuthenticated,)
+    authentication_classes = (JWTAuthentication,)
+
+    def get(self, request, *args, **kwargs):
+        user = self.request.user
+        room_id = self.kwargs["room_id"]
+
+        check_chat_room_membership(room_id, user)
+
+        # The before cursor is the messages_cursor or next_cursor of the last page
+        data = get_chat_history(
+            room_id,
+            user,
+            request.GET.get("before"),
+            get_chat_history_page_size(request),
+        )
+        return JsonResponse(data, safe=False)
+
+
 class UpdateChatRoom(APIView):
     permission_classes = (IsAuthenticated,)
     authentication_classes = (JWTAuthentication,)
@@ -239,6 +268,7 @@ class LeaveChatRoom(APIView):
                     chat_room_id=chat_room.id, member=user
                 )
                 user_chat_room.delete()
+                remove_chat_room_members([(chat_room.id, user.user_key)])
 
                 chat_room.total_members -= 1
                 chat_room.save()
@@ -278,7 +308,7 @@ class SendMessageToChatRoom(APIView):
                     "sender__last_name": user.last_name,
                 }
 
-                room_name = str(chat_room.room_name).lower().replace(" ", "_")
+                room_name = get_chat_room_group_name(chat_room.id)
 
                 if files:
                     urls = create_chat_shared_file(files, chat_room, user)
@@ -291,8 +321,6 @@ class SendMessageToChatRoom(APIView):
                         data["sender_id"] = str(user.user_key)
 
                         send_group_message(room_name, data)
-                        chat_room.total_messages += 1
-                        chat_room.save()
                         file_type = url["file_type"]
                         create_chat_room_message(data, file_type)
                     data["media_files"] = urls
@@ -305,8 +333,6 @@ class SendMessageToChatRoom(APIView):
                     data["sender_id"] = str(user.user_key)
 
                     send_group_message(room_name, data)
-                    chat_room.total_messages += 1
-                    chat_room.save()
 
                     create_chat_room_message(data)
 
@@ -2,13 +2,15 @@ import json
 import os
 from datetime import datetime, timezone
 
-from django.db.models import Q, Sum
+from django.db import transaction
+from django.db.models import Q
 from django.http import JsonResponse
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from Forum.forum_helper import (
+    attach_forum_listing_details,
     send_forum_join_request_to_admin,
     send_forum_request_response_to_user,
     get_randomized_forums_suggestions,
@@ -24,19 +26,26 @@ from Forum.models import (
     ForumPollChoices,
     ForumPollVote,
     ForumDiscussion,
+    SharedFile,
     UserChatRoom,
 )
 from Polls.poll_helper import (
     send_meeting_registration_mail,
     retrieve_forum_poll_with_choices,
     get_forum_polls_by_logged_in_user,
+    cast_forum_poll_vote,
+    refresh_forum_poll_results,
 )
+from chat_channels.membership import remove_chat_room_members
 from helpers.azure_file_handling import (
-    delete_blob,
+    delete_image_blob,
     create_forum_header,
     create_forum_files,
+    schedule_blob_deletions,
+    schedule_shared_file_deletions,
+    with_image_variants,
 )
-from helpers.functions import paginate_data, aware_datetime
+from helpers.functions import paginate_data, paginate_request_data
 from helpers.status_codes import (
     action_authorization_exception,
     duplicate_data_exception,
@@ -114,16 +123,27 @@ class DeleteForum(APIView):
         try:
             forum = Forum.objects.get(id=forum_id)
             if user.role.name == "Super Admin" or forum.author == user:
-                forum_files = ForumFile.objects.filter(forum_id=forum.id).values(
-                    "file_key"
+                file_keys = ForumFile.objects.filter(forum_id=forum.id).values_list(
+                    "file_key", flat=True
                 )
                 container = (
                     f"{forum.author.first_name}-{forum.author.last_name}".lower()
                 )
-                for file in forum_files:
-                    delete_blob(container, file["file_key"])
-                delete_blob(container, forum.header_key)
-                forum.delete()
+                chat_room_members = list(
+                    UserChatRoom.objects.filter(chat_room__forum=forum).values_list(
+                        "chat_room_id", "member_id"
+                    )
+                )
+                with transaction.atomic():
+                    schedule_blob_deletions(
+                        container,
+                        [*file_keys, *with_image_variants([forum.header_key])],
+                    )
+                    schedule_shared_file_deletions(
+                        SharedFile.objects.filter(chat_room__forum=forum)
+                    )
+                    forum.delete()
+                remove_chat_room_members(chat_room_members)
                 return JsonResponse(
                     {"status": "success", "detail": "Forum deleted successfully"},
                     safe=False,
@@ -158,6 +178,7 @@ class GetSingleForum(APIView):
                     "approved_by__last_name",
                     "approved_on",
                     "header_image",
+                    "header_image_variants",
                     "total_likes",
                     "total_comments",
                     "total_members",
@@ -316,66 +337,13 @@ class GetAllForums(APIView):
                 "is_declined",
                 "created_on",
             )
-            for forum in forums:
-                forum["virtual_meetings"] = list(
-                    VirtualMeeting.objects.filter(forum_id=forum["id"]).values(
-                        "id",
-                        "meeting_agenda",
-                        "meeting_url",
-                        "scheduled_start_time",
-                        "scheduled_end_time",
-                        "organizer__first_name",
-                        "organizer__last_name",
-                        "total_attendees",
-                    )
-                )
-                forum["files"] = list(
-                    ForumFile.objects.filter(forum_id=forum["id"]).values(
-                        "id", "description", "file_type", "file_url", "created_on"
-                    )
-                )
-                forum["chat_rooms"] = list(
-                    ChatRoom.objects.filter(forum_id=forum["id"]).values(
-                        "id",
-                        "room_name",
-                        "total_members",
-                        "total_messages",
-                    )
-                )
-                forum["discussions"] = list(
-                    ForumDiscussion.objects.filter(forum_id=forum["id"]).values(
-                        "id",
-                        "comment",
-                        "commentor__user_key",
-                        "commentor__first_name",
-                        "commentor__last_name",
-                        "commentor__profile_image",
-                        "is_forum_admin",
-                        "total_likes",
-                        "created_on",
-                    )
+            data = paginate_request_data(request, forums, page_number, 10)
+            attach_forum_listing_details(data["data"], user, with_discussions=True)
+            for forum in data["data"]:
+                forum["is_owner"] = (
+                    user.is_authenticated and forum["author_id"] == user.user_key
                 )
-
-                if user.is_authenticated:
-                    forum["is_owner"] = (
-                        True if forum["author_id"] == user.user_key else False
-                    )
-                    liked = Forum.forum_likers.through.objects.filter(
-                        Q(forum_id=forum["id"]) & Q(user_id=user.user_key)
-                    )
-                    member = Forum.forum_members.through.objects.filter(
-                        Q(forum_id=forum["id"]) & Q(user_id=user.user_key)
-                    )
-                    forum["has_liked"] = True if liked else False
-                    forum["is_member"] = True if member else False
-                    forum["is_authenticated"] = True
-                else:
-                    forum["is_owner"] = False
-                    forum["is_authenticated"] = False
-                    forum["is_member"] = False
-                    forum["has_liked"] = False
                 forum.pop("author_id", None)
-            data = paginate_data(forums, page_number, 10)
             return JsonResponse(
                 data,
                 safe=False,
@@ -514,7 +482,7 @@ class UpdateForum(APIView):
 
             if file:
                 file = data.pop("file", None)
-                delete_blob(container_name, forum.header_key)
+                delete_image_blob(container_name, forum.header_key)
                 header_image = create_forum_header(file, forum, user)
                 forum.header_key = header_image["file_key"]
                 forum.header_image = header_image["file_url"]
@@ -539,73 +507,55 @@ class UpdateForum(APIView):
 
 class SearchForum(APIView):
     def post(self, request, *args, **kwargs):
-        user = self.request.user
-        # page_number = self.kwargs["page_number"]
+        page_number = self.kwargs.get("page_number")
         search_query = request.data.get("search_query")
-        forums = Forum.objects.filter(
-            Q(tags__icontains=search_query)
-            | Q(topic__icontains=search_query)
-            | Q(description__icontains=search_query)
-        ).values(
-            "id",
-            "topic",
-            "description",
-            "tags",
-            "author",
-            "author__first_name",
-            "author__last_name",
-            "author__profile_image",
-            "author__is_verified",
-            "author__organization",
-            "approved_by__first_name",
-            "approved_by__last_name",
-            "approved_on",
-            "total_likes",
-            "total_comments",
-            "total_shares",
-            "is_public",
-            "is_approved",
-            "is_declined",
-            "created_on",
-        )
-
-        for forum in forums:
-            forum["virtual_meetings"] = list(
-                VirtualMeeting.objects.filter(forum_id=forum["id"]).values(
-                    "id",
-                    "meeting_agenda",
-                    "meeting_url",
-                    "scheduled_start_time",
-                    "scheduled_end_time",
-                    "organizer__first_name",
-                    "organizer__last_name",
-                    "total_attendees",
-                )
+        forums = (
+            Forum.objects.filter(
+                Q(tags__icontains=search_query)
+                | Q(topic__icontains=search_query)
+                | Q(description__icontains=search_query)
             )
-            forum["files"] = list(
-                ForumFile.objects.filter(forum_id=forum["id"]).values(
-                    "id", "description", "file_type", "file_url", "created_on"
-                )
+            .values(
+                "id",
+                "topic",
+                "description",
+                "tags",
+                "author",
+                "author__first_name",
+                "author__last_name",
+                "author__profile_image",
+                "author__is_verified",
+                "author__organization",
+                "approved_by__first_name",
+                "approved_by__last_name",
+                "approved_on",
+                "total_likes",
+                "total_comments",
+                "total_shares",
+                "is_public",
+                "is_approved",
+                "is_declined",
+                "created_on",
             )
-            forum["chat_rooms"] = list(
-                ChatRoom.objects.filter(forum_id=forum["id"]).values(
-                    "id",
-                    "room_name",
-                    "total_members",
-                    "total_messages",
-                )
+            .order_by("-created_on")
+        )
+
+        if page_number is None:
+            # search-forums/ returns every match, as it always has
+            return JsonResponse(
+                {
+                    "status": "success",
+                    "detail": "Forums retrieved successfully",
+                    "data": attach_forum_listing_details(list(forums)),
+                },
+                safe=False,
             )
 
-        # data = paginate_data(forums, page_number, 10)
+        # Only the forums on the requested page get their details attached
+        data = paginate_request_data(request, forums, page_number, 10)
+        attach_forum_listing_details(data["data"])
 
-        return JsonResponse(
-            {
-                "status": "success",
-                "detail": "Forums retrieved successfully",
-                "data": list(forums),
-            },
-            safe=False,
-        )
+        return JsonResponse(data, safe=False)
 
 
 class UploadForumFiles(APIView):
@@ -901,6 +851,7 @@ class CreateForumPoll(APIView):
                         ForumPollChoices.objects.create(
                             forum_poll_id=forum_poll.id, choice=choice
                         )
+                    refresh_forum_poll_results(forum_poll.id)
 
                     poll_data = (
                         ForumPoll.objects.filter(id=forum_poll.id)
@@ -979,40 +930,29 @@ class VoteOnAForumPoll(APIView):
             if not is_forum_member:
                 raise cannot_perform_action("You are not a member of the forum")
 
-            if forum_poll.is_ended:
+            if forum_poll.has_ended:
                 raise cannot_perform_action("Cannot vote. Poll has ended")
 
             try:
-                ForumPollVote.objects.get(forum_poll=forum_poll, voter=user)
-                raise cannot_perform_action("User already voted for this poll")
-            except ForumPollVote.DoesNotExist:
-                try:
-                    poll_choice = ForumPollChoices.objects.get(
-                        forum_poll=forum_poll, id=data["choice_id"]
-                    )
-                    poll_choice.votes += 1
-                    poll_choice.updated_on = aware_datetime(datetime.now())
-                    poll_choice.save()
-
-                    ForumPollVote.objects.create(
-                        forum_poll=forum_poll,
-                        voter=user,
-                        poll_choice=poll_choice,
-                    )
-                except ForumPollChoices.DoesNotExist:
-                    raise non_existing_data_exception("Poll Choice")
+                poll_choice = ForumPollChoices.objects.get(
+                    forum_poll=forum_poll, id=data["choice_id"]
+                )
+            except ForumPollChoices.DoesNotExist:
+                raise non_existing_data_exception("Poll Choice")
 
-                # poll_choice = get_polls_by_logged_in_user(user)
-                poll_stats = retrieve_forum_poll_with_choices(forum_poll.id)
+            cast_forum_poll_vote(forum_poll, poll_choice, user)
 
-                return JsonResponse(
-                    {
-                        "status": "success",
-                        "detail": "Vote has been cast",
-                        "data": poll_stats,
-                    },
-                    safe=False,
-                )
+            # poll_choice = get_polls_by_logged_in_user(user)
+            poll_stats = retrieve_forum_poll_with_choices(forum_poll.id)
+
+            return JsonResponse(
+                {
+                    "status": "success",
+                    "detail": "Vote has been cast",
+                    "data": poll_stats,
+                },
+                safe=False,
+            )
         except ForumPoll.DoesNotExist:
             raise non_existing_data_exception("Forum Poll")
 
@@ -1027,9 +967,6 @@ class GetAllForumPollsByUser(APIView):
         page_number = self.kwargs.get("page_number")
 
         data = []
-        ForumPoll.objects.filter(
-            forum_id=forum_id, end_date__lt=aware_datetime(datetime.now())
-        ).update(is_ended=True)
 
         poll_data = get_forum_polls_by_logged_in_user(user, forum_id)
         for item in poll_data:
@@ -1040,9 +977,6 @@ class GetAllForumPollsByUser(APIView):
                 ).exists()
             ):
                 item = retrieve_forum_poll_with_choices(item["id"])
-            item["total_votes"] = ForumPollChoices.objects.filter(
-                forum_poll_id=item["id"]
-            ).aggregate(total_votes=Sum("votes"))["total_votes"]
             data.append(item)
 
         data = paginate_data(data, page_number, 10)
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from Forum.models import ForumPoll
+from Polls.models.poll_models import Poll
+
+
+class Command(BaseCommand):
+    help = "Close polls and forum polls whose end date has passed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep running and close polls every given number of seconds",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+
+        while True:
+            today = timezone.localdate()
+            now = timezone.now()
+            total_polls = Poll.objects.filter(
+                end_date__lt=today, is_ended=False
+            ).update(is_ended=True, updated_on=now)
+            total_forum_polls = ForumPoll.objects.filter(
+                end_date__lt=today, is_ended=False
+            ).update(is_ended=True, updated_on=now)
+
+            if total_polls or total_forum_polls:
+                self.stdout.write(
+                    f"Closed {total_polls} polls and {total_forum_polls} forum polls"
+                )
+
+            if not interval:
+                break
+            time.sleep(interval)
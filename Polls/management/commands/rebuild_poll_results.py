@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from Forum.models import ForumPoll, ForumPollChoices, ForumPollVote
+from Polls.models.poll_models import Poll, PollChoices, PollVote
+from Polls.poll_helper import refresh_forum_poll_results, refresh_poll_results
+
+
+class Command(BaseCommand):
+    help = "Recount poll choice votes from the cast votes and rebuild stored results"
+
+    def handle(self, *args, **options):
+        for poll_id in Poll.objects.values_list("id", flat=True).iterator():
+            with transaction.atomic():
+                # Lock the choices first, in the same order votes are counted
+                choices = list(
+                    PollChoices.objects.select_for_update().filter(poll_id=poll_id)
+                )
+                votes = dict(
+                    PollVote.objects.filter(poll_id=poll_id)
+                    .order_by()
+                    .values("poll_choice_id")
+                    .annotate(total=Count("id"))
+                    .values_list("poll_choice_id", "total")
+                )
+                for choice in choices:
+                    if choice.votes != votes.get(choice.id, 0):
+                        choice.votes = votes.get(choice.id, 0)
+                        choice.save(update_fields=["votes"])
+                refresh_poll_results(poll_id)
+
+        for poll_id in ForumPoll.objects.values_list("id", flat=True).iterator():
+            with transaction.atomic():
+                choices = list(
+                    ForumPollChoices.objects.select_for_update().filter(
+                        forum_poll_id=poll_id
+                    )
+                )
+                votes = dict(
+                    ForumPollVote.objects.filter(forum_poll_id=poll_id)
+                    .order_by()
+                    .values("poll_choice_id")
+                    .annotate(total=Count("id"))
+                    .values_list("poll_choice_id", "total")
+                )
+                for choice in choices:
+                    if choice.votes != votes.get(choice.id, 0):
+                        choice.votes = votes.get(choice.id, 0)
+                        choice.save(update_fields=["votes"])
+                refresh_forum_poll_results(poll_id)
+
+        self.stdout.write(self.style.SUCCESS("Poll results rebuilt successfully"))
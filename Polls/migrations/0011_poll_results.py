@@ -0,0 +1,17 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Polls", "0010_remove_poll_title"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="poll",
+            name="results",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
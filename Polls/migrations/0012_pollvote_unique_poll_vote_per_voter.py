@@ -0,0 +1,47 @@
+# Generated by Django 4.2.1 on 2026-10-18 10:05
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_votes(apps, schema_editor):
+    PollVote = apps.get_model("Polls", "PollVote")
+    PollChoices = apps.get_model("Polls", "PollChoices")
+    Poll = apps.get_model("Polls", "Poll")
+
+    duplicates = (
+        PollVote.objects.order_by()
+        .values("poll_id", "voter_id")
+        .annotate(first_id=Min("id"), total=Count("id"))
+        .filter(total__gt=1)
+    )
+
+    poll_ids = set()
+    for duplicate in duplicates:
+        # Keep the first vote cast by the voter
+        PollVote.objects.filter(
+            poll_id=duplicate["poll_id"], voter_id=duplicate["voter_id"]
+        ).exclude(id=duplicate["first_id"]).delete()
+        poll_ids.add(duplicate["poll_id"])
+
+    # Recount the choices of the affected polls from the remaining votes
+    for choice in PollChoices.objects.filter(poll_id__in=poll_ids):
+        choice.votes = PollVote.objects.filter(poll_choice_id=choice.id).count()
+        choice.save(update_fields=["votes"])
+    Poll.objects.filter(id__in=poll_ids).update(results=None)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Polls", "0011_poll_results"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_votes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="pollvote",
+            constraint=models.UniqueConstraint(
+                fields=("poll", "voter"), name="unique_poll_vote_per_voter"
+            ),
+        ),
+    ]
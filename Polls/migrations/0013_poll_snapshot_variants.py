@@ -0,0 +1,17 @@
+# Generated by Django 4.2.1 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Polls", "0012_pollvote_unique_poll_vote_per_voter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="poll",
+            name="snapshot_variants",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
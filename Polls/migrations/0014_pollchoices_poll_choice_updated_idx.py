@@ -0,0 +1,16 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Polls", "0013_poll_snapshot_variants"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="pollchoices",
+            index=models.Index(fields=["updated_on"], name="poll_choice_updated_idx"),
+        ),
+    ]
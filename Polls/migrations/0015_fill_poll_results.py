@@ -0,0 +1,46 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+import Polls.models.poll_models
+
+
+def fill_poll_results(apps, schema_editor):
+    # Polls created before their results were stored are counted once here,
+    # so that reading a poll never has to write them
+    Poll = apps.get_model("Polls", "Poll")
+    PollChoices = apps.get_model("Polls", "PollChoices")
+    polls = list(Poll.objects.filter(results__isnull=True).only("id"))
+    for poll in polls:
+        choices = [
+            {"id": choice["id"], "choice": choice["choice"], "votes": choice["votes"]}
+            for choice in PollChoices.objects.filter(poll_id=poll.id)
+            .values("id", "choice", "votes")
+            .order_by("created_on")
+        ]
+        poll.results = {
+            "total_votes": sum(choice["votes"] for choice in choices),
+            "choices": choices,
+        }
+    Poll.objects.bulk_update(polls, ["results"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Polls", "0014_pollchoices_poll_choice_updated_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="pollchoices",
+            name="poll_choice_updated_idx",
+        ),
+        migrations.RunPython(fill_poll_results, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="poll",
+            name="results",
+            field=models.JSONField(
+                blank=True, default=Polls.models.poll_models.empty_poll_results
+            ),
+        ),
+    ]
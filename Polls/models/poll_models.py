@@ -1,8 +1,19 @@
 from django.db import models
+from django.utils import timezone
 
 from Auth.models import User
 
 
+def poll_has_ended(is_ended, end_date):
+    # Polls are closed by the close_ended_polls worker, which may lag behind
+    return is_ended or (end_date is not None and end_date < timezone.localdate())
+
+
+def empty_poll_results():
+    # Stored results of a poll before its choices are added
+    return {"total_votes": 0, "choices": []}
+
+
 # Polls model
 class Poll(models.Model):
     author = models.ForeignKey(
@@ -16,6 +27,7 @@ class Poll(models.Model):
     file_key = models.CharField(max_length=255, null=True, blank=True)
     snapshot_location = models.CharField(max_length=255, null=True, blank=True)
     snapshot_key = models.CharField(max_length=255, null=True, blank=True)
+    snapshot_variants = models.JSONField(null=True, blank=True)
     question = models.TextField(blank=True, null=True)
     start_date = models.DateField(auto_now_add=False, null=True, blank=True)
     end_date = models.DateField(auto_now_add=False, null=True, blank=True)
@@ -37,6 +49,7 @@ class Poll(models.Model):
     )
     approved_on = models.DateTimeField(auto_now_add=False, null=True, blank=True)
     is_ended = models.BooleanField(default=False)
+    results = models.JSONField(default=empty_poll_results, blank=True)
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now_add=False, null=True, blank=True)
 
@@ -44,6 +57,10 @@ class Poll(models.Model):
         ordering = ("-created_on",)
         db_table = "Polls"
 
+    @property
+    def has_ended(self):
+        return poll_has_ended(self.is_ended, self.end_date)
+
 
 # Poll choices
 class PollChoices(models.Model):
@@ -93,3 +110,8 @@ class PollVote(models.Model):
     class Meta:
         ordering = ("created_on",)
         db_table = "Poll_Votes"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["poll", "voter"], name="unique_poll_vote_per_voter"
+            ),
+        ]
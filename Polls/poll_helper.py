@@ -1,65 +1,73 @@
 import datetime
 
-from django.db.models import ExpressionWrapper, F, FloatField, Q, Sum
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.expressions import RawSQL
 
 from Forum.models import ForumPoll, ForumPollChoices, ForumPollVote
-from Polls.models.poll_models import Poll, PollChoices, PollVote
+from Polls.models.poll_models import Poll, PollChoices, PollVote, poll_has_ended
 from helpers.email_sender import send_email
+from helpers.functions import aware_datetime
+from helpers.status_codes import cannot_perform_action
+
+# One more vote for the given choice id and in the total of stored results
+COUNT_VOTE_IN_RESULTS_SQL = """
+    jsonb_build_object(
+        'total_votes', (results->>'total_votes')::int + 1,
+        'choices', (
+            SELECT jsonb_agg(
+                CASE WHEN (choice->>'id')::bigint = %s
+                THEN jsonb_set(choice, '{votes}', to_jsonb((choice->>'votes')::int + 1))
+                ELSE choice END
+                ORDER BY position
+            )
+            FROM jsonb_array_elements(results->'choices')
+                WITH ORDINALITY AS stored_choices(choice, position)
+        )
+    )
+"""
+
+
+def has_poll_ended(poll):
+    # The same check as the has_ended property, for polls read with values()
+    return poll_has_ended(poll["is_ended"], poll["end_date"])
+
+
+def read_total_votes(poll):
+    # Take the total from the stored results of a poll read with values()
+    return poll.pop("results")["total_votes"]
 
 
-def retrieve_poll_with_choices(poll_id, poll_type=None):
+def retrieve_poll_with_choices(poll_id, poll_type=None, results=None):
     # Retrieve the poll
-    poll = Poll.objects.get(id=poll_id)
+    poll = Poll.objects.select_related("author").get(id=poll_id)
 
-    # Calculate the total votes cast for the poll
-    total_votes = (
-        PollChoices.objects.filter(poll=poll).aggregate(total_votes=Sum("votes"))[
-            "total_votes"
-        ]
-        or 0
-    )
+    return serialize_poll_with_choices(poll, poll_type, results)
 
-    if not total_votes:
-        total_votes = 1
 
-    # Retrieve the poll choices with their votes and percentages
-    choices = (
-        PollChoices.objects.filter(poll=poll)
-        .annotate(
-            choice_votes=Sum("votes"),
-            vote_percentage=ExpressionWrapper(
-                (F("votes") * 100.0) / total_votes,
-                output_field=FloatField(),
-            ),
-        )
-        .order_by("created_on")
-    )
+def serialize_poll_with_choices(poll, poll_type=None, results=None):
+    # Read the votes and percentages from the stored results
+    if results is None:
+        results = poll.results
 
     # Create a dictionary representation of the poll
     # with choices and their votes/percentages
     if poll_type:
         poll_data = {
-            "choices": [
-                {
-                    "choice_id": choice.id,
-                    "choice": choice.choice,
-                    "votes": choice.votes or 0,
-                    "vote_percentage": round(choice.vote_percentage, 1)
-                    if choice.vote_percentage
-                    else 0,
-                }
-                for choice in choices
-            ],
+            "choices": calculate_choice_results(
+                results["choices"], choice_key="choice_id"
+            ),
         }
     else:
         poll_data = {
             "id": poll.id,
             "file_location": poll.file_location,
             "snapshot_location": poll.snapshot_location,
+            "snapshot_variants": poll.snapshot_variants,
             "question": poll.question,
             "start_date": poll.start_date,
             "end_date": poll.end_date,
-            "is_ended": poll.is_ended,
+            "is_ended": poll.has_ended,
             "author_id": poll.author_id,
             "author__first_name": poll.author.first_name,
             "author__last_name": poll.author.last_name,
@@ -67,17 +75,8 @@ def retrieve_poll_with_choices(poll_id, poll_type=None):
             "author__profile_image": poll.author.profile_image,
             "approved_on": poll.approved_on,
             "created_on": poll.created_on,
-            "choices": [
-                {
-                    "id": choice.id,
-                    "choice": choice.choice,
-                    "votes": choice.votes or 0,
-                    "vote_percentage": round(choice.vote_percentage, 1)
-                    if choice.vote_percentage
-                    else 0,
-                }
-                for choice in choices
-            ],
+            "total_votes": results["total_votes"],
+            "choices": calculate_choice_results(results["choices"]),
         }
 
     return poll_data
@@ -87,68 +86,31 @@ def author_retrieve_poll_with_choices(poll_id, poll_type=None):
     # Retrieve the poll
     poll = Poll.objects.get(id=poll_id)
 
-    # Calculate the total votes cast for the poll
-    total_votes = (
-        PollChoices.objects.filter(poll=poll).aggregate(total_votes=Sum("votes"))[
-            "total_votes"
-        ]
-        or 0
-    )
-
-    if not total_votes:
-        total_votes = 1
-
-    # Retrieve the poll choices with their votes and percentages
-    choices = (
-        PollChoices.objects.filter(poll=poll)
-        .annotate(
-            choice_votes=Sum("votes"),
-            vote_percentage=ExpressionWrapper(
-                (F("votes") * 100.0) / total_votes,
-                output_field=FloatField(),
-            ),
-        )
-        .order_by("created_on")
-    )
+    # Read the votes and percentages from the stored results
+    results = poll.results
 
     # Create a dictionary representation of the poll
     # with choices and their votes/percentages
     if poll_type:
         poll_data = {
-            "choices": [
-                {
-                    "choice_id": choice.id,
-                    "choice": choice.choice,
-                    "votes": choice.votes or 0,
-                    "vote_percentage": round(choice.vote_percentage, 1)
-                    if choice.vote_percentage
-                    else 0,
-                }
-                for choice in choices
-            ],
+            "choices": calculate_choice_results(
+                results["choices"], choice_key="choice_id"
+            ),
         }
     else:
         poll_data = {
             "id": poll.id,
             "file_location": poll.file_location,
             "snapshot_location": poll.snapshot_location,
+            "snapshot_variants": poll.snapshot_variants,
             "question": poll.question,
             "start_date": poll.start_date,
             "end_date": poll.end_date,
-            "is_ended": poll.is_ended,
+            "is_ended": poll.has_ended,
             "approved_on": poll.approved_on,
             "created_on": poll.created_on,
-            "choices": [
-                {
-                    "id": choice.id,
-                    "choice": choice.choice,
-                    "votes": choice.votes or 0,
-                    "vote_percentage": round(choice.vote_percentage, 1)
-                    if choice.vote_percentage
-                    else 0,
-                }
-                for choice in choices
-            ],
+            "total_votes": results["total_votes"],
+            "choices": calculate_choice_results(results["choices"]),
         }
 
     return poll_data
@@ -172,6 +134,8 @@ def get_polls_by_logged_in_user(user):
             new_poll["voter_comments"] = poll_vote["comments"]
             data.append(new_poll)
         else:
+            poll["is_ended"] = has_poll_ended(poll)
+            poll["total_votes"] = read_total_votes(poll)
             poll["choices"] = list(
                 PollChoices.objects.filter(poll_id=poll["id"]).values("id", "choice")
             )
@@ -180,16 +144,107 @@ def get_polls_by_logged_in_user(user):
     return data
 
 
+def calculate_choice_results(choices, choice_key="id"):
+    # Calculate the total votes cast for the poll
+    total_votes = sum(choice["votes"] or 0 for choice in choices)
+
+    if not total_votes:
+        total_votes = 1
+
+    return [
+        {
+            choice_key: choice["id"],
+            "choice": choice["choice"],
+            "votes": choice["votes"] or 0,
+            "vote_percentage": (
+                round((choice["votes"] * 100.0) / total_votes, 1)
+                if choice["votes"]
+                else 0
+            ),
+        }
+        for choice in choices
+    ]
+
+
+def summarize_poll_choices(choices):
+    # Build the stored results of a poll from its choices
+    choices = [
+        {"id": choice["id"], "choice": choice["choice"], "votes": choice["votes"] or 0}
+        for choice in choices
+    ]
+    return {
+        "total_votes": sum(choice["votes"] for choice in choices),
+        "choices": choices,
+    }
+
+
+def count_vote_in_results(poll_model, poll_id, choice_id, count_results):
+    # Add the vote to the stored results in one statement, as the last write
+    # of the vote's transaction so that the poll row stays locked briefly.
+    # Results that miss the choice are counted again from the choices.
+    counted = poll_model.objects.filter(
+        id=poll_id, results__contains={"choices": [{"id": choice_id}]}
+    ).update(results=RawSQL(COUNT_VOTE_IN_RESULTS_SQL, (choice_id,)))
+    if not counted:
+        # Locked before counting, so that a concurrent recount sees this vote
+        poll_model.objects.select_for_update().values_list("id").get(id=poll_id)
+        poll_model.objects.filter(id=poll_id).update(results=count_results(poll_id))
+
+
+def violates_constraint(error, constraint_name):
+    # Postgres reports the name of the constraint an IntegrityError broke
+    diag = getattr(error.__cause__, "diag", None)
+    return getattr(diag, "constraint_name", None) == constraint_name
+
+
+def count_poll_results(poll_id):
+    # Results counted from the choices, without storing them
+    choices = (
+        PollChoices.objects.filter(poll_id=poll_id)
+        .values("id", "choice", "votes")
+        .order_by("created_on")
+    )
+    return summarize_poll_choices(choices)
+
+
+def refresh_poll_results(poll_id):
+    # Recount the stored results of a poll from its choices
+    results = count_poll_results(poll_id)
+    Poll.objects.filter(id=poll_id).update(results=results)
+
+    return results
+
+
+def cast_poll_vote(poll, poll_choice, voter, comments):
+    # The vote is counted on the choice and in the stored results together
+    try:
+        with transaction.atomic():
+            PollVote.objects.create(
+                poll=poll, voter=voter, poll_choice=poll_choice, comments=comments
+            )
+            PollChoices.objects.filter(id=poll_choice.id).update(
+                votes=F("votes") + 1,
+                updated_on=aware_datetime(datetime.datetime.now()),
+            )
+            count_vote_in_results(Poll, poll.id, poll_choice.id, count_poll_results)
+    except IntegrityError as e:
+        # The unique constraint on the vote rejects a second vote by the same user
+        if violates_constraint(e, "unique_poll_vote_per_voter"):
+            raise cannot_perform_action("User already voted for this poll")
+        raise
+
+
 def get_polls_by_author(query):
     data = []
     # Retrieve the poll
     polls = Poll.objects.filter(query).values()
 
     for poll in polls:
-        if poll["is_ended"]:
+        if has_poll_ended(poll):
             new_poll = author_retrieve_poll_with_choices(poll["id"])
             data.append(new_poll)
         else:
+            poll["total_votes"] = read_total_votes(poll)
             poll["choices"] = list(
                 PollChoices.objects.filter(poll_id=poll["id"]).values("id", "choice")
             )
@@ -253,33 +308,13 @@ def send_meeting_registration_mail(meeting, recipient_email, first_name):
     send_email(recipient_email, subject, message)
 
 
-def retrieve_forum_poll_with_choices(poll_id, poll_type=None):
+def retrieve_forum_poll_with_choices(poll_id, poll_type=None, results=None):
     # Retrieve the poll
-    poll = ForumPoll.objects.get(id=poll_id)
+    poll = ForumPoll.objects.select_related("author").get(id=poll_id)
 
-    # Calculate the total votes cast for the poll
-    total_votes = (
-        ForumPollChoices.objects.filter(forum_poll=poll).aggregate(
-            total_votes=Sum("votes")
-        )["total_votes"]
-        or 0
-    )
-
-    if not total_votes:
-        total_votes = 1
-
-    # Retrieve the poll choices with their votes and percentages
-    choices = (
-        ForumPollChoices.objects.filter(forum_poll=poll)
-        .annotate(
-            choice_votes=Sum("votes"),
-            vote_percentage=ExpressionWrapper(
-                (F("votes") * 100.0) / total_votes,
-                output_field=FloatField(),
-            ),
-        )
-        .order_by("created_on")
-    )
+    # Read the votes from the stored results
+    if results is None:
+        results = poll.results
 
     # Create a dictionary representation of the poll
     # with choices and their votes/percentages
@@ -287,11 +322,11 @@ def retrieve_forum_poll_with_choices(poll_id, poll_type=None):
         poll_data = {
             "choices": [
                 {
-                    "choice_id": choice.id,
-                    "choice": choice.choice,
-                    "votes": choice.votes or 0,
+                    "choice_id": choice["id"],
+                    "choice": choice["choice"],
+                    "votes": choice["votes"],
                 }
-                for choice in choices
+                for choice in results["choices"]
             ],
         }
     else:
@@ -300,26 +335,38 @@ def retrieve_forum_poll_with_choices(poll_id, poll_type=None):
             "question": poll.question,
             "start_date": poll.start_date,
             "end_date": poll.end_date,
-            "is_ended": poll.is_ended,
+            "is_ended": poll.has_ended,
             # "author_id": poll.author_id,
             "author__first_name": poll.author.first_name,
             "author__last_name": poll.author.last_name,
             "author__is_verified": poll.author.is_verified,
             "author__profile_image": poll.author.profile_image,
             "created_on": poll.created_on,
-            "choices": [
-                {
-                    "id": choice.id,
-                    "choice": choice.choice,
-                    "votes": choice.votes or 0,
-                }
-                for choice in choices
-            ],
+            "total_votes": results["total_votes"],
+            "choices": results["choices"],
         }
 
     return poll_data
 
 
+def count_forum_poll_results(poll_id):
+    # Results counted from the choices, without storing them
+    choices = (
+        ForumPollChoices.objects.filter(forum_poll_id=poll_id)
+        .values("id", "choice", "votes")
+        .order_by("created_on")
+    )
+    return summarize_poll_choices(choices)
+
+
+def refresh_forum_poll_results(poll_id):
+    # Recount the stored results of a forum poll from its choices
+    results = count_forum_poll_results(poll_id)
+    ForumPoll.objects.filter(id=poll_id).update(results=results)
+
+    return results
+
+
 def get_forum_polls_by_logged_in_user(user, forum_id):
     data = []
 
@@ -337,6 +384,8 @@ def get_forum_polls_by_logged_in_user(user, forum_id):
             new_poll["voter_choice"] = poll_vote["poll_choice_id"]
             data.append(new_poll)
         else:
+            poll["is_ended"] = has_poll_ended(poll)
+            poll["total_votes"] = read_total_votes(poll)
             poll["choices"] = list(
                 ForumPollChoices.objects.filter(forum_poll_id=poll["id"]).values(
                     "id", "choice"
@@ -347,33 +396,32 @@ def get_forum_polls_by_logged_in_user(user, forum_id):
     return data
 
 
+def cast_forum_poll_vote(forum_poll, poll_choice, voter):
+    # Counted on the choice and in the stored results, see cast_poll_vote
+    try:
+        with transaction.atomic():
+            ForumPollVote.objects.create(
+                forum_poll=forum_poll, voter=voter, poll_choice=poll_choice
+            )
+            ForumPollChoices.objects.filter(id=poll_choice.id).update(
+                votes=F("votes") + 1,
+                updated_on=aware_datetime(datetime.datetime.now()),
+            )
+            count_vote_in_results(
+                ForumPoll, forum_poll.id, poll_choice.id, count_forum_poll_results
+            )
+    except IntegrityError as e:
+        if violates_constraint(e, "unique_forum_poll_vote_per_voter"):
+            raise cannot_perform_action("User already voted for this poll")
+        raise
+
+
 def author_retrieve_forum_poll_with_choices(poll_id, poll_type=None):
     # Retrieve the poll
     poll = ForumPoll.objects.get(id=poll_id)
 
-    # Calculate the total votes cast for the poll
-    total_votes = (
-        ForumPollChoices.objects.filter(forum_poll=poll).aggregate(
-            total_votes=Sum("votes")
-        )["total_votes"]
-        or 0
-    )
-
-    if not total_votes:
-        total_votes = 1
-
-    # Retrieve the poll choices with their votes and percentages
-    choices = (
-        ForumPollChoices.objects.filter(forum_poll=poll)
-        .annotate(
-            choice_votes=Sum("votes"),
-            vote_percentage=ExpressionWrapper(
-                (F("votes") * 100.0) / total_votes,
-                output_field=FloatField(),
-            ),
-        )
-        .order_by("created_on")
-    )
+    # Read the votes from the stored results
+    results = poll.results
 
     # Create a dictionary representation of the poll
     # with choices and their votes/percentages
@@ -381,11 +429,11 @@ def author_retrieve_forum_poll_with_choices(poll_id, poll_type=None):
         poll_data = {
             "choices": [
                 {
-                    "choice_id": choice.id,
-                    "choice": choice.choice,
-                    "votes": choice.votes or 0,
+                    "choice_id": choice["id"],
+                    "choice": choice["choice"],
+                    "votes": choice["votes"],
                 }
-                for choice in choices
+                for choice in results["choices"]
             ],
         }
     else:
@@ -394,16 +442,10 @@ def author_retrieve_forum_poll_with_choices(poll_id, poll_type=None):
             "question": poll.question,
             "start_date": poll.start_date,
             "end_date": poll.end_date,
-            "is_ended": poll.is_ended,
+            "is_ended": poll.has_ended,
             "created_on": poll.created_on,
-            "choices": [
-                {
-                    "id": choice.id,
-                    "choice": choice.choice,
-                    "votes": choice.votes or 0,
-                }
-                for choice in choices
-            ],
+            "total_votes": results["total_votes"],
+            "choices": results["choices"],
         }
 
     return poll_data
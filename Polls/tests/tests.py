@@ -0,0 +1,104 @@
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import TestCase
+from rest_framework.exceptions import APIException
+from rest_framework.test import APIClient
+
+from Auth.models import User
+from Polls.models.poll_models import Poll, PollChoices
+from Polls.poll_helper import cast_poll_vote, refresh_poll_results
+
+
+class PollVoteTests(TestCase):
+    def setUp(self):
+        self.voter = User.objects.create_user("voter@example.com", "password")
+        self.poll = Poll.objects.create(question="Question?")
+        self.choices = [
+            PollChoices.objects.create(poll=self.poll, choice=choice)
+            for choice in ("Yes", "No")
+        ]
+
+    def test_second_vote_by_the_same_voter_is_rejected(self):
+        cast_poll_vote(self.poll, self.choices[0], self.voter, "")
+
+        with self.assertRaises(APIException) as context:
+            cast_poll_vote(self.poll, self.choices[1], self.voter, "")
+
+        self.assertEqual(context.exception.status_code, 315)
+        self.choices[1].refresh_from_db()
+        self.assertEqual(self.choices[1].votes, 0)
+
+    def test_other_integrity_errors_are_not_reported_as_a_second_vote(self):
+        with mock.patch(
+            "Polls.poll_helper.PollVote.objects.create", side_effect=IntegrityError
+        ):
+            with self.assertRaises(IntegrityError):
+                cast_poll_vote(self.poll, self.choices[0], self.voter, "")
+
+    def test_votes_are_counted_in_the_stored_results(self):
+        # The first vote counts the choices added without stored results
+        cast_poll_vote(self.poll, self.choices[0], self.voter, "")
+        other_voter = User.objects.create_user("other@example.com", "password")
+        cast_poll_vote(self.poll, self.choices[1], other_voter, "")
+
+        self.poll.refresh_from_db()
+        self.assertEqual(self.poll.results["total_votes"], 2)
+        self.assertEqual(
+            [choice["votes"] for choice in self.poll.results["choices"]], [1, 1]
+        )
+
+    def test_rejected_vote_is_not_counted_in_the_stored_results(self):
+        refresh_poll_results(self.poll.id)
+        cast_poll_vote(self.poll, self.choices[0], self.voter, "")
+
+        with self.assertRaises(APIException):
+            cast_poll_vote(self.poll, self.choices[1], self.voter, "")
+
+        self.poll.refresh_from_db()
+        self.assertEqual(self.poll.results["total_votes"], 1)
+
+
+class PollResultsTests(TestCase):
+    def setUp(self):
+        self.voter = User.objects.create_user("voter@example.com", "password")
+        self.client = APIClient()
+        self.client.force_authenticate(self.voter)
+        self.polls = [
+            Poll.objects.create(
+                question=f"Question {index}?", author=self.voter, is_approved=True
+            )
+            for index in range(3)
+        ]
+        self.choices = [
+            PollChoices.objects.create(poll=poll, choice="Yes") for poll in self.polls
+        ]
+        for poll, choice in zip(self.polls, self.choices):
+            refresh_poll_results(poll.id)
+            cast_poll_vote(poll, choice, self.voter, "")
+
+    def test_all_poll_results_are_read_from_the_stored_results(self):
+        with mock.patch(
+            "Polls.views.polls_view.check_permission", return_value=True
+        ), self.assertNumQueries(1):
+            response = self.client.get("/polls/all-polls-results/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [poll["stats"]["total_votes"] for poll in response.json()["data"]],
+            [1, 1, 1],
+        )
+
+    def test_approved_polls_read_total_votes_from_the_stored_results(self):
+        late_voter = User.objects.create_user("late@example.com", "password")
+        cast_poll_vote(self.polls[0], self.choices[0], late_voter, "")
+
+        # The paginator's counts, the page and the choices of each open poll,
+        # without writing any results
+        with self.assertNumQueries(6):
+            response = self.client.get("/polls/all-approved-polls/1/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [poll["total_votes"] for poll in response.json()["data"]], [1, 1, 2]
+        )
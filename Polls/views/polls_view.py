@@ -2,7 +2,8 @@ import datetime
 import json
 import os
 
-from django.db.models import Q, Sum
+from django.db import transaction
+from django.db.models import Q
 from django.http import JsonResponse
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
@@ -14,14 +15,18 @@ from Polls.poll_helper import (
     retrieve_poll_with_choices,
     get_polls_by_author,
     author_retrieve_poll_with_choices,
+    cast_poll_vote,
+    has_poll_ended,
+    refresh_poll_results,
+    serialize_poll_with_choices,
 )
 from Utilities.models.documents_model import UserDocuments
 from helpers.azure_file_handling import (
-    delete_blob,
+    get_poll_blob_keys,
+    schedule_blob_deletions,
     upload_poll_file_or_pdf_to_azure,
-    upload_cover_image,
 )
-from helpers.functions import aware_datetime, paginate_data
+from helpers.functions import aware_datetime, paginate_data, paginate_request_data
 from helpers.status_codes import (
     action_authorization_exception,
     cannot_perform_action,
@@ -70,13 +75,12 @@ class CreatePoll(APIView):
 
             if files:
                 for file in files:
-                    res_data = upload_poll_file_or_pdf_to_azure(file, user, poll)
-                    if type(res_data) is tuple:
-                        upload_cover_image(request, res_data, poll=poll)
+                    upload_poll_file_or_pdf_to_azure(file, user, poll)
 
             new_choices = eval(choices)
             for choice in new_choices:
                 PollChoices.objects.create(poll_id=poll.id, choice=choice)
+            refresh_poll_results(poll.id)
             poll_data = (
                 Poll.objects.filter(id=poll.id)
                 .values(
@@ -85,6 +89,7 @@ class CreatePoll(APIView):
                     "start_date",
                     "file_location",
                     "snapshot_location",
+                    "snapshot_variants",
                     "is_approved",
                     "is_ended",
                     "author__first_name",
@@ -119,41 +124,27 @@ class VoteOnAPoll(APIView):
 
         try:
             poll = Poll.objects.get(id=data["poll_id"])
-            if poll.is_ended:
+            if poll.has_ended:
                 raise cannot_perform_action("Cannot vote. Poll has ended")
 
             try:
-                PollVote.objects.get(poll=poll, voter=user)
-                raise cannot_perform_action("User already voted for this poll")
-            except PollVote.DoesNotExist:
-                try:
-                    poll_choice = PollChoices.objects.get(
-                        poll=poll, id=data["choice_id"]
-                    )
-                    poll_choice.votes += 1
-                    poll_choice.updated_on = aware_datetime(datetime.datetime.now())
-                    poll_choice.save()
-
-                    PollVote.objects.create(
-                        poll=poll,
-                        voter=user,
-                        poll_choice=poll_choice,
-                        comments=data["comments"],
-                    )
-                except PollChoices.DoesNotExist:
-                    raise non_existing_data_exception("Poll Choice")
-
-                # poll_choice = get_polls_by_logged_in_user(user)
-                poll_stats = retrieve_poll_with_choices(poll.id)
-
-                return JsonResponse(
-                    {
-                        "status": "success",
-                        "detail": "Vote has been cast",
-                        "data": poll_stats,
-                    },
-                    safe=False,
-                )
+                poll_choice = PollChoices.objects.get(poll=poll, id=data["choice_id"])
+            except PollChoices.DoesNotExist:
+                raise non_existing_data_exception("Poll Choice")
+
+            cast_poll_vote(poll, poll_choice, user, data["comments"])
+
+            # poll_choice = get_polls_by_logged_in_user(user)
+            poll_stats = retrieve_poll_with_choices(poll.id)
+
+            return JsonResponse(
+                {
+                    "status": "success",
+                    "detail": "Vote has been cast",
+                    "data": poll_stats,
+                },
+                safe=False,
+            )
         except Poll.DoesNotExist:
             raise non_existing_data_exception("Poll")
 
@@ -169,18 +160,14 @@ class GetAllPollResults(APIView):
         if not check_permission(user, "Polls", [2]):
             raise action_authorization_exception("Unauthorized to view poll results")
 
-        Poll.objects.filter(
-            end_date__lt=aware_datetime(datetime.datetime.now())
-        ).update(is_ended=True)
-
-        polls = Poll.objects.all().values("id")
-
-        for poll in polls:
-            poll_stats = retrieve_poll_with_choices(poll["id"])
-            poll["stats"] = poll_stats
+        # Served from the stored results, without a query per poll
+        polls = [
+            {"id": poll.id, "stats": serialize_poll_with_choices(poll)}
+            for poll in Poll.objects.select_related("author")
+        ]
 
         return JsonResponse(
-            {"status": "success", "detail": "Vote has been cast", "data": list(polls)},
+            {"status": "success", "detail": "Vote has been cast", "data": polls},
             safe=False,
         )
 
@@ -195,9 +182,6 @@ class GetAllApprovedPollsByUser(APIView):
         page_number = self.kwargs.get("page_number")
 
         data = []
-        Poll.objects.filter(
-            end_date__lt=aware_datetime(datetime.datetime.now())
-        ).update(is_ended=True)
 
         poll_data = get_polls_by_logged_in_user(user)
         for item in poll_data:
@@ -206,9 +190,6 @@ class GetAllApprovedPollsByUser(APIView):
                 and not PollVote.objects.filter(voter=user, poll_id=item["id"]).exists()
             ):
                 item = retrieve_poll_with_choices(item["id"])
-            item["total_votes"] = PollChoices.objects.filter(
-                poll_id=item["id"]
-            ).aggregate(total_votes=Sum("votes"))["total_votes"]
             data.append(item)
 
         data = paginate_data(data, page_number, 10)
@@ -223,15 +204,13 @@ class GetAllApprovedPollsByUser(APIView):
 class GetAllApprovedPolls(APIView):
     def get(self, request, *args, **kwargs):
         page_number = self.kwargs.get("page_number")
-        Poll.objects.filter(
-            end_date__lt=aware_datetime(datetime.datetime.now()), is_ended=False
-        ).update(is_ended=True)
 
         polls = Poll.objects.filter(is_approved=True, is_declined=False).values(
             "id",
             "question",
             "file_location",
             "snapshot_location",
+            "snapshot_variants",
             "start_date",
             "end_date",
             "is_approved",
@@ -243,14 +222,18 @@ class GetAllApprovedPolls(APIView):
             "author__profile_image",
             "approved_on",
             "created_on",
+            "results",
         )
 
-        for poll in polls:
-            poll["total_votes"] = PollChoices.objects.filter(
-                poll_id=poll["id"]
-            ).aggregate(total_votes=Sum("votes"))["total_votes"]
+        data = paginate_request_data(request, polls, page_number, 10)
+        for poll in data["data"]:
+            poll["is_ended"] = has_poll_ended(poll)
+            results = poll.pop("results")
+            poll["total_votes"] = results["total_votes"]
             if poll["is_ended"]:
-                poll["stats"] = retrieve_poll_with_choices(poll["id"], poll_type="All")
+                poll["stats"] = retrieve_poll_with_choices(
+                    poll["id"], poll_type="All", results=results
+                )
 
             else:
                 poll["choices"] = list(
@@ -258,7 +241,7 @@ class GetAllApprovedPolls(APIView):
                         "id", "choice"
                     )
                 )
-        data = paginate_data(polls, page_number, 10)
+
         return JsonResponse(
             data,
             safe=False,
@@ -278,9 +261,6 @@ class GetMyPolls(APIView):
         if not check_permission(user, "Polls", [1, 2]):
             raise action_authorization_exception("Unauthorized to view poll results")
 
-        Poll.objects.filter(
-            end_date__lt=aware_datetime(datetime.datetime.now())
-        ).update(is_ended=True)
         query = Q(author=user)
         if data_type == 1:
             query &= Q(is_approved=True)
@@ -291,11 +271,6 @@ class GetMyPolls(APIView):
 
         polls = get_polls_by_author(query)
 
-        for item in polls:
-            item["total_votes"] = PollChoices.objects.filter(
-                poll_id=item["id"]
-            ).aggregate(total_votes=Sum("votes"))["total_votes"]
-
         data = paginate_data(polls, page_number, 10)
         return JsonResponse(data, safe=False)
 
@@ -321,18 +296,15 @@ class UpdatePoll(APIView):
 
             if files:
                 files = data.pop("files", None)
-                delete_blob(container_name, poll.file_key)
-                delete_blob(container_name, poll.snapshot_key)
+                schedule_blob_deletions(container_name, get_poll_blob_keys(poll))
                 poll.file_key = None
                 poll.file_location = None
                 poll.snapshot_key = None
                 poll.snapshot_location = None
+                poll.snapshot_variants = None
                 poll.save()
                 for file in files:
-                    res_data = upload_poll_file_or_pdf_to_azure(file, user, poll)
-
-                    if type(res_data) is tuple:
-                        upload_cover_image(request, res_data, poll=poll)
+                    upload_poll_file_or_pdf_to_azure(file, user, poll)
 
             data = json.dumps(data)
             data = json.loads(data)
@@ -342,15 +314,16 @@ class UpdatePoll(APIView):
                 PollChoices.objects.filter(poll_id=poll_id).delete()
                 for choice in new_choices:
                     PollChoices.objects.create(poll_id=poll_id, choice=choice)
+                refresh_poll_results(poll_id)
                 data.pop("choices", None)
 
             if "is_document_deleted" in data and data["is_document_deleted"]:
-                delete_blob(container_name, poll.file_key)
-                delete_blob(container_name, poll.snapshot_key)
+                schedule_blob_deletions(container_name, get_poll_blob_keys(poll))
                 poll.file_key = None
                 poll.file_location = None
                 poll.snapshot_location = None
                 poll.snapshot_key = None
+                poll.snapshot_variants = None
                 poll.save()
                 data.pop("is_document_deleted", None)
 
@@ -392,11 +365,11 @@ class DeletePoll(APIView):
         try:
             poll = Poll.objects.get(id=poll_id)
             container_name = f"{poll.author.first_name}-{poll.author.last_name}".lower()
-            delete_blob(container_name, poll.file_key)
-            delete_blob(container_name, poll.snapshot_key)
-            PollChoices.objects.filter(poll_id=poll_id).delete()
-            PollVote.objects.filter(poll_id=poll_id).delete()
-            poll.delete()
+            with transaction.atomic():
+                schedule_blob_deletions(container_name, get_poll_blob_keys(poll))
+                PollChoices.objects.filter(poll_id=poll_id).delete()
+                PollVote.objects.filter(poll_id=poll_id).delete()
+                poll.delete()
 
             return JsonResponse(
                 {"status": "success", "detail": "Poll deleted successfully"},
@@ -434,6 +407,7 @@ class SearchPolls(APIView):
             "question",
             "file_location",
             "snapshot_location",
+            "snapshot_variants",
             "end_date",
             "is_approved",
             "is_declined",
@@ -447,7 +421,9 @@ class SearchPolls(APIView):
             "created_on",
         )
 
-        data = paginate_data(polls, page_number, 10)
+        data = paginate_request_data(request, polls, page_number, 10)
+        for poll in data["data"]:
+            poll["is_ended"] = has_poll_ended(poll)
 
         return JsonResponse(
             data,
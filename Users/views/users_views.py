@@ -2,7 +2,7 @@ import json
 import os
 from datetime import datetime
 
-from django.db.models import Count, Q, Sum
+from django.db.models import Count, Q
 from django.db.models.functions import TruncMonth
 from django.http import JsonResponse
 from rest_framework.permissions import IsAuthenticated
@@ -14,6 +14,7 @@ from Blog.models.blog_model import BlogComment, BlogPost
 from DocumentVault.models import Document
 from Events.models.events_model import Events
 from Forum.forum_helper import (
+    attach_forum_listing_details,
     send_forum_join_request_approval_to_user,
     send_forum_join_request_decline_to_user,
 )
@@ -24,7 +25,6 @@ from Forum.models import (
     ChatRoom,
     ForumRequest,
     ForumPoll,
-    ForumPollChoices,
 )
 from Polls.models.poll_models import Poll, PollVote
 from Polls.poll_helper import (
@@ -32,13 +32,12 @@ from Polls.poll_helper import (
     author_retrieve_forum_poll_with_choices,
 )
 from Utilities.models.documents_model import UserDocuments
-from helpers.azure_file_handling import delete_blob, upload_profile_image
+from helpers.azure_file_handling import delete_image_blob, upload_profile_image
 from helpers.functions import (
-    convert_quill_text_to_normal_text,
     delete_file,
     local_file_upload,
     paginate_data,
-    truncate_text,
+    paginate_request_data,
     aware_datetime,
 )
 from helpers.status_codes import (
@@ -67,6 +66,7 @@ class ProfileView(APIView):
                 "first_name",
                 "last_name",
                 "profile_image",
+                "profile_image_variants",
                 "bio",
                 "links",
                 "organization",
@@ -144,12 +144,12 @@ class GetUserBlogPosts(APIView):
             .values(
                 "id",
                 "title",
-                "content",
                 "description",
+                "preview_text",
                 "total_likes",
                 "total_shares",
                 "cover_image",
-                "censored_content",
+                "cover_image_variants",
                 "is_abusive",
                 "is_approved",
                 "is_published",
@@ -165,15 +165,13 @@ class GetUserBlogPosts(APIView):
             .order_by("-created_on")
         )
 
-        for blog_post in blog_posts:
-            converted_text = convert_quill_text_to_normal_text(blog_post["content"])
-            blog_post["preview_text"] = truncate_text(converted_text, 200)
+        data = paginate_request_data(request, blog_posts, page_number, 10)
+        for blog_post in data["data"]:
             total_comments = BlogComment.objects.filter(
                 blog_id=blog_post["id"]
             ).values()
             blog_post["total_comments"] = total_comments.count()
 
-        data = paginate_data(blog_posts, page_number, 10)
         return JsonResponse(
             data,
             safe=False,
@@ -265,8 +263,8 @@ class SearchMyBlogPosts(APIView):
             .values(
                 "id",
                 "title",
-                "content",
                 "description",
+                "preview_text",
                 "is_approved",
                 "total_likes",
                 "total_shares",
@@ -274,8 +272,8 @@ class SearchMyBlogPosts(APIView):
                 "approved_and_published_by__first_name",
                 "approved_and_published_by__last_name",
                 "cover_image",
+                "cover_image_variants",
                 "links",
-                "censored_content",
                 "is_abusive",
                 "reference",
                 "author_id",
@@ -287,7 +285,8 @@ class SearchMyBlogPosts(APIView):
             .order_by("-created_on")
         )
 
-        for blog_post in blog_posts:
+        data = paginate_request_data(request, blog_posts, page_number, 10)
+        for blog_post in data["data"]:
             total_comments = (
                 BlogComment.objects.filter(blog_id=blog_post["id"])
                 .values()
@@ -295,7 +294,6 @@ class SearchMyBlogPosts(APIView):
             )
             blog_post["total_comments"] = total_comments.count()
 
-        data = paginate_data(blog_posts, page_number, 10)
         return JsonResponse(
             data,
             safe=False,
@@ -317,7 +315,7 @@ class UpdateUserProfile(APIView):
 
         if profile_image:
             try:
-                delete_blob(container, user.profile_image_key)
+                delete_image_blob(container, user.profile_image_key)
             except UserDocuments.DoesNotExist:
                 pass
             url = upload_profile_image(profile_image, user)
@@ -406,34 +404,9 @@ class GetMyForums(APIView):
                 "is_declined",
                 "created_on",
             )
-            for forum in forums:
-                forum["virtual_meetings"] = list(
-                    VirtualMeeting.objects.filter(forum_id=forum["id"]).values(
-                        "id",
-                        "meeting_agenda",
-                        "meeting_url",
-                        "scheduled_start_time",
-                        "scheduled_end_time",
-                        "organizer__first_name",
-                        "organizer__last_name",
-                        "total_attendees",
-                    )
-                )
-                forum["files"] = list(
-                    ForumFile.objects.filter(forum_id=forum["id"]).values(
-                        "id", "description", "file_type", "file_url", "created_on"
-                    )
-                )
-                forum["chat_rooms"] = list(
-                    ChatRoom.objects.filter(forum_id=forum["id"]).values(
-                        "id",
-                        "room_name",
-                        "total_members",
-                        "total_messages",
-                    )
-                )
+            data = paginate_request_data(request, forums, page_number, 10)
+            attach_forum_listing_details(data["data"])
 
-            data = paginate_data(forums, page_number, 10)
             return JsonResponse(
                 data,
                 safe=False,
@@ -591,6 +564,7 @@ class ManageMyForum(APIView):
                         "approved_by__last_name",
                         "approved_on",
                         "header_image",
+                        "header_image_variants",
                         "total_likes",
                         "total_members",
                         "total_shares",
@@ -680,17 +654,11 @@ class GetMyForumPolls(APIView):
         page_number = self.kwargs.get("page_number")
 
         data = []
-        ForumPoll.objects.filter(
-            forum_id=forum_id, author=user, end_date__lt=aware_datetime(datetime.now())
-        ).update(is_ended=True)
 
         forum_polls = ForumPoll.objects.filter(forum_id=forum_id, author=user).values()
 
         for forum in forum_polls:
             item = author_retrieve_forum_poll_with_choices(forum["id"])
-            item["total_votes"] = ForumPollChoices.objects.filter(
-                forum_poll_id=item["id"]
-            ).aggregate(total_votes=Sum("votes"))["total_votes"]
             data.append(item)
 
         data = paginate_data(data, page_number, 10)
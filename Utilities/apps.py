@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class UtilitiesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "Utilities"
+
+    def ready(self):
+        # Short links are stored as absolute urls, a relative one cannot be fixed
+        if not settings.SHORT_LINK_BASE_URL:
+            raise ImproperlyConfigured("SHORT_LINK_BASE_URL must be set")
@@ -0,0 +1,237 @@
+from django.db.models import CharField, Value
+
+from Blog.models.blog_model import BlogComment, BlogPost
+from Polls.models.poll_models import Poll, PollVote
+from Polls.poll_helper import calculate_choice_results, has_poll_ended
+from Utilities.models.documents_model import BlogDocuments
+
+FEED_BLOG_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "preview_text",
+    "is_approved",
+    "total_likes",
+    "total_shares",
+    "is_published",
+    "approved_and_published_by__first_name",
+    "approved_and_published_by__last_name",
+    "cover_image",
+    "cover_image_variants",
+    "links",
+    "is_abusive",
+    "reference",
+    "author_id",
+    "author__first_name",
+    "author__last_name",
+    "author__profile_image",
+    "author__is_verified",
+    "author__organization",
+    "created_on",
+)
+
+FEED_POLL_FIELDS = (
+    "id",
+    "file_location",
+    "question",
+    "start_date",
+    "end_date",
+    "is_approved",
+    "is_ended",
+    "author_id",
+    "author__first_name",
+    "author__last_name",
+    "author__profile_image",
+    "author__is_verified",
+    "created_on",
+)
+
+POLL_AUTHOR_FIELDS = (
+    "author__first_name",
+    "author__last_name",
+    "author__is_verified",
+    "author__profile_image",
+)
+
+
+def get_feed_entries(user):
+    # Merge the ids of blog posts and polls into one date ordered queryset
+    # so that sorting and pagination happen in the database
+    blog_posts = (
+        BlogPost.objects.filter(is_approved=True, is_published=True)
+        .order_by()
+        .values("id", "created_on")
+        .annotate(item_type=Value("blog", output_field=CharField()))
+    )
+
+    poll_query = Poll.objects.filter(is_approved=True)
+    if user.is_authenticated:
+        poll_query = poll_query.filter(is_declined=False)
+
+    polls = (
+        poll_query.order_by()
+        .values("id", "created_on")
+        .annotate(item_type=Value("poll", output_field=CharField()))
+    )
+
+    return blog_posts.union(polls, all=True).order_by("-created_on", "-id")
+
+
+def get_feed_blog_posts(blog_ids, user):
+    # Retrieve the blog posts on the page and their related data
+    blog_posts = {
+        blog_post["id"]: blog_post
+        for blog_post in BlogPost.objects.filter(id__in=blog_ids).values(
+            *FEED_BLOG_FIELDS
+        )
+    }
+
+    for blog_post in blog_posts.values():
+        blog_post["comments"] = []
+        blog_post["documents"] = []
+
+    comments = (
+        BlogComment.objects.filter(blog_id__in=blog_ids)
+        .values(
+            "id",
+            "blog_id",
+            "commentor__first_name",
+            "commentor__last_name",
+            "commentor__profile_image",
+            "comment",
+            "created_on",
+        )
+        .order_by("-created_on")
+    )
+    for comment in comments:
+        blog_id = comment.pop("blog_id")
+        if blog_id in blog_posts:
+            blog_posts[blog_id]["comments"].append(comment)
+
+    documents = (
+        BlogDocuments.objects.filter(blog_id__in=blog_ids)
+        .values()
+        .order_by("-created_on")
+    )
+    for document in documents:
+        if document["blog_id"] in blog_posts:
+            blog_posts[document["blog_id"]]["documents"].append(document)
+
+    if user.is_authenticated:
+        liked_blog_ids = set(
+            BlogPost.likers.through.objects.filter(
+                blogpost_id__in=blog_ids, user_id=user.user_key
+            ).values_list("blogpost_id", flat=True)
+        )
+
+    for blog_post in blog_posts.values():
+        blog_post["total_comments"] = len(blog_post["comments"])
+        if user.is_authenticated:
+            blog_post["has_liked"] = blog_post["id"] in liked_blog_ids
+
+    return blog_posts
+
+
+def get_feed_polls(poll_ids, user):
+    # Retrieve the polls on the page with their stored results
+    if user.is_authenticated:
+        return get_feed_polls_for_user(poll_ids, user)
+
+    polls = {}
+    for poll in Poll.objects.filter(id__in=poll_ids).values(
+        *FEED_POLL_FIELDS,
+        "snapshot_location",
+        "snapshot_variants",
+        "approved_on",
+        "results",
+    ):
+        poll["is_ended"] = has_poll_ended(poll)
+        results = poll.pop("results")
+        if poll["is_ended"]:
+            poll = get_poll_results(poll, results["choices"])
+        else:
+            poll.pop("snapshot_location")
+            poll.pop("snapshot_variants")
+            poll.pop("approved_on")
+            poll["choices"] = [
+                {"id": choice["id"], "choice": choice["choice"]}
+                for choice in results["choices"]
+            ]
+        poll["total_votes"] = results["total_votes"]
+        polls[poll["id"]] = poll
+
+    return polls
+
+
+def get_feed_polls_for_user(poll_ids, user):
+    poll_fields = [
+        field.attname
+        for field in Poll._meta.concrete_fields
+        if field.attname != "results"
+    ]
+    poll_votes = {
+        vote["poll_id"]: vote
+        for vote in PollVote.objects.filter(voter=user, poll_id__in=poll_ids).values(
+            "poll_id", "poll_choice_id", "comments"
+        )
+    }
+
+    polls = {}
+    for poll in Poll.objects.filter(id__in=poll_ids).values(
+        *poll_fields, *POLL_AUTHOR_FIELDS, "results"
+    ):
+        poll["is_ended"] = has_poll_ended(poll)
+        choices = poll.pop("results")["choices"]
+        poll_vote = poll_votes.get(poll["id"])
+        if poll_vote:
+            poll = get_poll_results(poll, choices)
+            poll["voter_choice"] = poll_vote["poll_choice_id"]
+            poll["voter_comments"] = poll_vote["comments"]
+        else:
+            for field in POLL_AUTHOR_FIELDS:
+                poll.pop(field)
+            poll["choices"] = [
+                {"id": choice["id"], "choice": choice["choice"]} for choice in choices
+            ]
+        polls[poll["id"]] = poll
+
+    return polls
+
+
+def get_poll_results(poll, choices):
+    # Mirror the representation returned by retrieve_poll_with_choices
+    return {
+        "id": poll["id"],
+        "file_location": poll["file_location"],
+        "snapshot_location": poll["snapshot_location"],
+        "snapshot_variants": poll["snapshot_variants"],
+        "question": poll["question"],
+        "start_date": poll["start_date"],
+        "end_date": poll["end_date"],
+        "is_ended": poll["is_ended"],
+        "author_id": poll["author_id"],
+        "author__first_name": poll["author__first_name"],
+        "author__last_name": poll["author__last_name"],
+        "author__is_verified": poll["author__is_verified"],
+        "author__profile_image": poll["author__profile_image"],
+        "approved_on": poll["approved_on"],
+        "created_on": poll["created_on"],
+        "choices": calculate_choice_results(choices),
+    }
+
+
+def build_feed_page(entries, user):
+    blog_ids = [entry["id"] for entry in entries if entry["item_type"] == "blog"]
+    poll_ids = [entry["id"] for entry in entries if entry["item_type"] == "poll"]
+
+    items = {
+        "blog": get_feed_blog_posts(blog_ids, user) if blog_ids else {},
+        "poll": get_feed_polls(poll_ids, user) if poll_ids else {},
+    }
+
+    # Keep the order of the merged entries, skipping rows deleted in between
+    return [
+        items[entry["item_type"]][entry["id"]]
+        for entry in entries
+        if entry["id"] in items[entry["item_type"]]
+    ]
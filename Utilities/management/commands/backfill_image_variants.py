@@ -0,0 +1,124 @@
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand
+
+from Auth.models import User
+from Blog.models.blog_model import BlogPost
+from Forum.models import Forum
+from Polls.models.poll_models import Poll
+from helpers.azure_file_handling import (
+    get_container_client,
+    upload_executor,
+    upload_image_variants,
+)
+from helpers.image_variants import render_image_variants_in_pool
+
+# Model, owner of the container, blob key column and variants column
+IMAGE_FIELDS = (
+    (BlogPost, "author", "image_key", "cover_image_variants"),
+    (Poll, "author", "snapshot_key", "snapshot_variants"),
+    (Forum, "author", "header_key", "header_image_variants"),
+    (User, None, "profile_image_key", "profile_image_variants"),
+)
+
+
+def download_blob(container_name, blob_name):
+    # Write the blob to a temporary file for the render processes
+    container_client = get_container_client(container_name)
+    suffix = os.path.splitext(blob_name)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as image_file:
+        container_client.get_blob_client(blob_name).download_blob().readinto(image_file)
+
+    return image_file.name
+
+
+class Command(BaseCommand):
+    help = "Generate the responsive image variants of existing images"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20,
+            help="Number of images downloaded and rendered together",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        for model, owner_field, key_field, variants_field in IMAGE_FIELDS:
+            rows = (
+                model.objects.filter(**{f"{variants_field}__isnull": True})
+                .exclude(**{f"{key_field}__isnull": True})
+                .exclude(**{key_field: ""})
+                .order_by("pk")
+            )
+            if owner_field:
+                rows = rows.select_related(owner_field)
+
+            total_rows = 0
+            last_pk = None
+            while True:
+                batch_rows = rows if last_pk is None else rows.filter(pk__gt=last_pk)
+                batch = list(batch_rows[:batch_size])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+
+                total_rows += self.backfill_batch(
+                    batch, owner_field, key_field, variants_field
+                )
+
+            self.stdout.write(
+                f"Generated variants for {total_rows} {model.__name__} images"
+            )
+
+    def backfill_batch(self, batch, owner_field, key_field, variants_field):
+        containers = []
+        for row in batch:
+            owner = getattr(row, owner_field) if owner_field else row
+            containers.append(f"{owner.first_name}-{owner.last_name}".lower())
+        blob_names = [getattr(row, key_field) for row in batch]
+
+        # Download in parallel, then render across the worker processes
+        download_results = list(
+            upload_executor.map(self.try_download_blob, containers, blob_names)
+        )
+        image_paths = [image_path for image_path in download_results if image_path]
+        try:
+            rendered = iter(render_image_variants_in_pool(image_paths))
+            total_rows = 0
+            for row, container_name, blob_name, image_path in zip(
+                batch, containers, blob_names, download_results
+            ):
+                if image_path is None:
+                    # Leave the row for the next run
+                    continue
+                variants = next(rendered)
+                if variants is None:
+                    # Not an image, store an empty mapping so it is not retried
+                    variant_urls = {}
+                else:
+                    variant_urls = upload_image_variants(
+                        get_container_client(container_name),
+                        container_name,
+                        blob_name,
+                        variants,
+                    )
+                    total_rows += 1
+                type(row).objects.filter(pk=row.pk).update(
+                    **{variants_field: variant_urls}
+                )
+        finally:
+            for image_path in image_paths:
+                os.remove(image_path)
+
+        return total_rows
+
+    def try_download_blob(self, container_name, blob_name):
+        try:
+            return download_blob(container_name, blob_name)
+        except Exception as e:
+            self.stderr.write(f"Could not download {blob_name}: {e}")
+            return None
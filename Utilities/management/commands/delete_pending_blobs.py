@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from helpers.azure_file_handling import BLOB_BATCH_DELETE_SIZE, delete_pending_blobs
+
+
+class Command(BaseCommand):
+    help = "Delete the blobs recorded for deletion from Azure storage in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep running and check for deletions every given number of seconds",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BLOB_BATCH_DELETE_SIZE,
+            help="Number of blobs locked and deleted per transaction",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        batch_size = min(options["batch_size"], BLOB_BATCH_DELETE_SIZE)
+
+        while True:
+            total_handled = 0
+            # Drain every due deletion before going idle
+            while True:
+                handled_count = delete_pending_blobs(batch_size)
+                total_handled += handled_count
+                if handled_count < batch_size:
+                    break
+
+            if total_handled:
+                self.stdout.write(f"Handled {total_handled} pending blob deletions")
+
+            if not interval:
+                break
+            time.sleep(interval)
@@ -0,0 +1,90 @@
+import requests
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from Auth.models import User
+from Blog.models.blog_model import BlogPost
+from DocumentVault.models import Document
+from Forum.models import Forum, ForumFile, SharedFile
+from Polls.models.poll_models import Poll
+from Utilities.models import BlogDocuments, ShortLink
+from helpers.short_links import build_short_url, get_or_create_short_link
+
+TINYURL_PREFIXES = ("https://tinyurl.com/", "http://tinyurl.com/")
+
+# Columns that store the url returned by shorten_url
+SHORTENED_URL_FIELDS = (
+    (BlogPost, "cover_image"),
+    (BlogDocuments, "document_location"),
+    (Poll, "file_location"),
+    (Poll, "snapshot_location"),
+    (Forum, "header_image"),
+    (ForumFile, "file_url"),
+    (SharedFile, "file_url"),
+    (Document, "file_url"),
+    (User, "profile_image"),
+)
+
+
+class Command(BaseCommand):
+    help = "Replace stored TinyURL links with local short links"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--timeout",
+            type=int,
+            default=10,
+            help="Seconds to wait for TinyURL to answer each lookup",
+        )
+
+    def handle(self, *args, **options):
+        timeout = options["timeout"]
+        short_urls = {}
+
+        for model, field in SHORTENED_URL_FIELDS:
+            tinyurl_filter = Q()
+            for prefix in TINYURL_PREFIXES:
+                tinyurl_filter |= Q(**{f"{field}__startswith": prefix})
+            legacy_urls = (
+                model.objects.filter(tinyurl_filter)
+                .values_list(field, flat=True)
+                .distinct()
+            )
+
+            total_rows = 0
+            for legacy_url in legacy_urls:
+                if legacy_url not in short_urls:
+                    short_urls[legacy_url] = self.map_legacy_url(legacy_url, timeout)
+                if short_urls[legacy_url] is None:
+                    continue
+                total_rows += model.objects.filter(**{field: legacy_url}).update(
+                    **{field: short_urls[legacy_url]}
+                )
+
+            if total_rows:
+                self.stdout.write(
+                    f"Updated {total_rows} {model.__name__}.{field} values"
+                )
+
+    def map_legacy_url(self, legacy_url, timeout):
+        short_link = ShortLink.objects.filter(legacy_url=legacy_url).first()
+        if short_link is None:
+            try:
+                response = requests.head(
+                    legacy_url, allow_redirects=False, timeout=timeout
+                )
+            except requests.RequestException as e:
+                self.stderr.write(f"Could not resolve {legacy_url}: {e}")
+                return None
+
+            target_url = response.headers.get("Location")
+            if not response.is_redirect or not target_url:
+                self.stderr.write(f"{legacy_url} did not redirect, skipping")
+                return None
+
+            short_link = get_or_create_short_link(target_url)
+            if short_link.legacy_url is None:
+                short_link.legacy_url = legacy_url
+                short_link.save(update_fields=["legacy_url"])
+
+        return build_short_url(short_link.code)
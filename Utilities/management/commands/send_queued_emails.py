@@ -0,0 +1,54 @@
+import smtplib
+import time
+
+from django.core.management.base import BaseCommand
+
+from helpers.email_sender import close_smtp_connection, send_queued_emails
+
+
+class Command(BaseCommand):
+    help = "Deliver the emails queued in the outbox over a shared SMTP session"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep running and check the outbox every given number of seconds",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of emails locked and sent per transaction",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        batch_size = options["batch_size"]
+
+        server = None
+        while True:
+            total_sent = 0
+            try:
+                # Drain every due email before going idle
+                while True:
+                    server, sent_count = send_queued_emails(server, batch_size)
+                    total_sent += sent_count
+                    if not sent_count:
+                        break
+            except (smtplib.SMTPException, OSError) as e:
+                self.stderr.write(f"Could not connect to the SMTP server: {e}")
+                server = None
+
+            if total_sent:
+                self.stdout.write(f"Sent {total_sent} emails")
+
+            # Do not hold the session open while idle
+            if server is not None:
+                close_smtp_connection(server)
+                server = None
+
+            if not interval:
+                break
+            time.sleep(interval)
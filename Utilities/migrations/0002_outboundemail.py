@@ -0,0 +1,56 @@
+# Generated by Django 4.2.1 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Utilities", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboundEmail",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("recipient", models.CharField(max_length=255)),
+                ("subject", models.CharField(max_length=255)),
+                ("message", models.TextField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("sent", "Sent"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True, null=True)),
+                ("next_attempt_on", models.DateTimeField(auto_now_add=True)),
+                ("sent_on", models.DateTimeField(blank=True, null=True)),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "Outbound_Emails",
+                "ordering": ("created_on",),
+                "indexes": [
+                    models.Index(
+                        fields=["status", "next_attempt_on"],
+                        name="outbound_email_queue_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.1 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Utilities", "0002_outboundemail"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShortLink",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("target_url", models.CharField(max_length=1024, unique=True)),
+                (
+                    "legacy_url",
+                    models.CharField(
+                        blank=True, max_length=255, null=True, unique=True
+                    ),
+                ),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "Short_Links",
+                "ordering": ("created_on",),
+            },
+        ),
+    ]
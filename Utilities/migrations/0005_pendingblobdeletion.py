@@ -0,0 +1,41 @@
+# Generated by Django 4.2.1 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Utilities", "0004_storedblob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PendingBlobDeletion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("container_name", models.CharField(max_length=255)),
+                ("blob_name", models.CharField(max_length=255)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True, null=True)),
+                ("next_attempt_on", models.DateTimeField(auto_now_add=True)),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "Pending_Blob_Deletions",
+                "ordering": ("created_on",),
+                "indexes": [
+                    models.Index(
+                        fields=["next_attempt_on"], name="pending_blob_deletion_idx"
+                    )
+                ],
+            },
+        ),
+    ]
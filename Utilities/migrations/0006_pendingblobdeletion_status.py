@@ -0,0 +1,39 @@
+# Generated by Django 4.2.1 on 2026-10-18 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Utilities", "0005_pendingblobdeletion"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="pendingblobdeletion",
+            name="pending_blob_deletion_idx",
+        ),
+        migrations.AddField(
+            model_name="pendingblobdeletion",
+            name="status",
+            field=models.CharField(
+                choices=[("pending", "Pending"), ("failed", "Failed")],
+                default="pending",
+                max_length=10,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pendingblobdeletion",
+            index=models.Index(
+                fields=["status", "next_attempt_on"],
+                name="pending_blob_deletion_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pendingblobdeletion",
+            index=models.Index(
+                fields=["container_name", "blob_name"],
+                name="pending_blob_deletion_key_idx",
+            ),
+        ),
+    ]
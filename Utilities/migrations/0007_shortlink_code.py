@@ -0,0 +1,117 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:10
+
+import secrets
+import string
+
+from django.db import migrations, models
+
+CODE_ALPHABET = string.digits + string.ascii_letters
+CODE_LENGTH = 10
+BASE62_ALPHABET = string.digits + string.ascii_letters
+
+# Columns that store the url returned by shorten_url
+SHORTENED_URL_FIELDS = (
+    ("Blog", "BlogPost", "cover_image"),
+    ("Utilities", "BlogDocuments", "document_location"),
+    ("Polls", "Poll", "file_location"),
+    ("Polls", "Poll", "snapshot_location"),
+    ("Forum", "Forum", "header_image"),
+    ("Forum", "ForumFile", "file_url"),
+    ("Forum", "SharedFile", "file_url"),
+    ("DocumentVault", "Document", "file_url"),
+    ("Auth", "User", "profile_image"),
+)
+
+
+def encode_base62(number):
+    # The sequential codes links were served under until now
+    chars = []
+    while True:
+        number, remainder = divmod(number, 62)
+        chars.append(BASE62_ALPHABET[remainder])
+        if not number:
+            return "".join(reversed(chars))
+
+
+def replace_code(url, codes):
+    # Return the url with its old code replaced, or None when it has none
+    if not isinstance(url, str):
+        return None
+    prefix, separator, code = url.rpartition("/s/")
+    if not separator or code not in codes:
+        return None
+    return f"{prefix}{separator}{codes[code]}"
+
+
+def generate_codes(short_links):
+    codes = {}
+    taken = set()
+    for short_link in short_links:
+        code = None
+        while code is None or code in taken:
+            code = "".join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+        taken.add(code)
+        short_link.code = code
+        codes[encode_base62(short_link.id)] = code
+    return codes
+
+
+def rewrite_stored_urls(apps, codes):
+    for app_label, model_name, field in SHORTENED_URL_FIELDS:
+        model = apps.get_model(app_label, model_name)
+        rows = []
+        for row in model.objects.filter(**{f"{field}__contains": "/s/"}).only(
+            "pk", field
+        ):
+            new_url = replace_code(getattr(row, field), codes)
+            if new_url is not None:
+                setattr(row, field, new_url)
+                rows.append(row)
+        model.objects.bulk_update(rows, [field], batch_size=1000)
+
+    # Chat messages keep the urls of their attachments in a json list
+    ChatRoomMessages = apps.get_model("Forum", "ChatRoomMessages")
+    messages = ChatRoomMessages.objects.filter(is_media=True).values_list(
+        "id", "created_on", "media_files"
+    )
+    for message_id, created_on, media_files in messages.iterator():
+        new_media_files = [replace_code(url, codes) or url for url in media_files or []]
+        if new_media_files != media_files:
+            ChatRoomMessages.objects.filter(
+                id=message_id, created_on=created_on
+            ).update(media_files=new_media_files)
+
+
+def assign_random_codes(apps, schema_editor):
+    # Existing links get random codes and the stored urls are rewritten, so
+    # none of them stays reachable under its sequential code
+    ShortLink = apps.get_model("Utilities", "ShortLink")
+    short_links = list(ShortLink.objects.only("id"))
+    codes = generate_codes(short_links)
+    ShortLink.objects.bulk_update(short_links, ["code"], batch_size=1000)
+    rewrite_stored_urls(apps, codes)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("Utilities", "0006_pendingblobdeletion_status"),
+        ("Auth", "0004_user_profile_image_variants"),
+        ("Blog", "0004_blogpost_cover_image_variants"),
+        ("DocumentVault", "0001_initial"),
+        ("Forum", "0037_forumpollchoices_forum_poll_choice_updated_idx"),
+        ("Polls", "0014_pollchoices_poll_choice_updated_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shortlink",
+            name="code",
+            field=models.CharField(max_length=16, null=True),
+        ),
+        migrations.RunPython(assign_random_codes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="shortlink",
+            name="code",
+            field=models.CharField(max_length=16, unique=True),
+        ),
+    ]
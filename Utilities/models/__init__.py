@@ -1 +1,5 @@
 from .documents_model import *
+from .outbound_email_model import *
+from .short_link_model import *
+from .stored_blob_model import *
+from .pending_blob_deletion_model import *
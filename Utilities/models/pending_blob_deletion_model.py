@@ -0,0 +1,32 @@
+from django.db import models
+
+
+class PendingBlobDeletion(models.Model):
+    PENDING = "pending"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (FAILED, "Failed"),
+    )
+
+    container_name = models.CharField(max_length=255)
+    blob_name = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(null=True, blank=True)
+    next_attempt_on = models.DateTimeField(auto_now_add=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("created_on",)
+        db_table = "Pending_Blob_Deletions"
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_on"],
+                name="pending_blob_deletion_idx",
+            ),
+            models.Index(
+                fields=["container_name", "blob_name"],
+                name="pending_blob_deletion_key_idx",
+            ),
+        ]
@@ -0,0 +1,13 @@
+from django.db import models
+
+
+class ShortLink(models.Model):
+    # Random, so the links of private files cannot be guessed from each other
+    code = models.CharField(max_length=16, unique=True)
+    target_url = models.CharField(max_length=1024, unique=True)
+    legacy_url = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("created_on",)
+        db_table = "Short_Links"
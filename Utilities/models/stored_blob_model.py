@@ -0,0 +1,13 @@
+from django.db import models
+
+
+class StoredBlob(models.Model):
+    sha256 = models.CharField(max_length=64, unique=True)
+    blob_key = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField(default=0)
+    reference_count = models.PositiveIntegerField(default=0)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("created_on",)
+        db_table = "Stored_Blobs"
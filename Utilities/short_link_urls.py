@@ -0,0 +1,12 @@
+from django.urls import path
+
+from .views.short_link_views import ResolveShortLink
+
+urlpatterns = [
+    # Redirect a short link to the stored file
+    path(
+        "<str:code>",
+        ResolveShortLink.as_view(),
+        name="Resolve Short Link",
+    ),
+]
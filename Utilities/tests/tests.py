@@ -0,0 +1,411 @@
+import ftplib
+from types import SimpleNamespace
+from unittest import mock
+
+from better_profanity import profanity
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, connections
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from Admin.models import CensorWord
+from Auth.models import User
+from Blog.models.blog_model import BlogPost
+from Forum.models import ChatRoom
+from Polls.models.poll_models import Poll
+from Utilities.models import OutboundEmail, PendingBlobDeletion, ShortLink, StoredBlob
+from Utilities.models.documents_model import BlogDocuments
+from helpers.azure_file_handling import (
+    MAX_BLOB_DELETION_ATTEMPTS,
+    SHARED_BLOB_CONTAINER,
+    create_chat_shared_file,
+    delete_pending_blobs,
+    get_poll_blob_keys,
+    schedule_blob_deletions,
+    stored_files,
+    upload_user_blob,
+)
+from helpers.email_sender import claim_queued_emails, send_queued_emails
+from helpers.ftp_client import FTPPool
+from helpers.profanity_filter import bump_censor_words_version, censor_text
+from helpers.short_links import (
+    SHORT_LINK_CODE_LENGTH,
+    resolve_short_link,
+    shorten_url,
+    shorten_urls,
+)
+
+
+def make_container_client(container_name, status_code=202):
+    container_client = mock.Mock(container_name=container_name)
+    container_client.delete_blobs.side_effect = lambda *names, **kwargs: [
+        SimpleNamespace(status_code=status_code, reason="Server Error") for _ in names
+    ]
+    return container_client
+
+
+class BlobDeletionTests(TestCase):
+    def test_upload_of_released_key_cancels_its_deletion(self):
+        schedule_blob_deletions("jane-doe", ["Profile_Image/avatar.jpg"])
+        container_client = make_container_client("jane-doe")
+
+        upload_user_blob(
+            container_client,
+            "Profile_Image/avatar.jpg",
+            SimpleUploadedFile("avatar.jpg", b"new image"),
+        )
+
+        self.assertFalse(PendingBlobDeletion.objects.exists())
+        # The old blob still exists, so the upload has to replace it
+        blob_client = container_client.get_blob_client.return_value
+        self.assertNotIn("match_condition", blob_client.commit_block_list.call_args[1])
+
+    def test_upload_of_new_key_does_not_overwrite(self):
+        container_client = make_container_client("jane-doe")
+
+        upload_user_blob(
+            container_client,
+            "Profile_Image/avatar.jpg",
+            SimpleUploadedFile("avatar.jpg", b"new image"),
+        )
+
+        blob_client = container_client.get_blob_client.return_value
+        self.assertIn("match_condition", blob_client.commit_block_list.call_args[1])
+
+    def test_deleted_blobs_clear_their_tombstones(self):
+        schedule_blob_deletions("jane-doe", ["a.pdf", "b.pdf"])
+        container_client = make_container_client("jane-doe")
+
+        with mock.patch(
+            "helpers.azure_file_handling.blob_service_client"
+        ) as blob_service_client:
+            blob_service_client.get_container_client.return_value = container_client
+            self.assertEqual(delete_pending_blobs(), 2)
+
+        container_client.delete_blobs.assert_called_once_with(
+            "a.pdf", "b.pdf", raise_on_any_failure=False
+        )
+        self.assertFalse(PendingBlobDeletion.objects.exists())
+
+    def test_failing_deletion_stops_after_max_attempts(self):
+        PendingBlobDeletion.objects.create(
+            container_name="jane-doe",
+            blob_name="a.pdf",
+            attempts=MAX_BLOB_DELETION_ATTEMPTS - 1,
+        )
+        container_client = make_container_client("jane-doe", status_code=500)
+
+        with mock.patch(
+            "helpers.azure_file_handling.blob_service_client"
+        ) as blob_service_client:
+            blob_service_client.get_container_client.return_value = container_client
+            delete_pending_blobs()
+            tombstone = PendingBlobDeletion.objects.get()
+            self.assertEqual(tombstone.status, PendingBlobDeletion.FAILED)
+
+            # A failed tombstone is not picked up again
+            self.assertEqual(delete_pending_blobs(), 0)
+
+    def test_shared_blob_referenced_again_is_kept(self):
+        StoredBlob.objects.create(
+            sha256="a" * 64, blob_key="aa/shared.pdf", reference_count=1
+        )
+        schedule_blob_deletions("jane-doe", ["aa/shared.pdf"])
+        StoredBlob.objects.update(reference_count=1)
+        container_client = make_container_client(SHARED_BLOB_CONTAINER)
+
+        with mock.patch(
+            "helpers.azure_file_handling.blob_service_client"
+        ) as blob_service_client:
+            blob_service_client.get_container_client.return_value = container_client
+            delete_pending_blobs()
+
+        container_client.delete_blobs.assert_not_called()
+        self.assertTrue(StoredBlob.objects.exists())
+        self.assertFalse(PendingBlobDeletion.objects.exists())
+
+
+@mock.patch("helpers.azure_file_handling.blob_service_client")
+class StoredFileTests(TestCase):
+    def test_references_roll_back_with_the_caller(self, blob_service_client):
+        with stored_files([SimpleUploadedFile("a.pdf", b"content")]):
+            pass
+
+        with self.assertRaises(ValueError):
+            with stored_files([SimpleUploadedFile("b.pdf", b"content")]):
+                raise ValueError
+
+        self.assertEqual(StoredBlob.objects.get().reference_count, 1)
+        # The content was stored before, so nothing is released
+        self.assertFalse(PendingBlobDeletion.objects.exists())
+
+    def test_content_is_uploaded_outside_the_transaction(self, blob_service_client):
+        # The blocks are staged from the upload threads, so the test thread's
+        # connection is checked
+        test_connection = connections["default"]
+        atomic_depth = len(test_connection.atomic_blocks)
+        container_client = blob_service_client.get_container_client.return_value
+        stage_block = container_client.get_blob_client.return_value.stage_block
+        stage_block.side_effect = lambda *args, **kwargs: self.assertEqual(
+            len(test_connection.atomic_blocks), atomic_depth
+        )
+
+        with stored_files([SimpleUploadedFile("a.pdf", b"content")]) as (
+            blob_names,
+            _,
+        ):
+            self.assertGreater(len(connection.atomic_blocks), atomic_depth)
+
+        stage_block.assert_called_once()
+        self.assertEqual(StoredBlob.objects.get().blob_key, blob_names[0])
+
+    def test_failed_transaction_releases_uploaded_content(self, blob_service_client):
+        with self.assertRaises(ValueError):
+            with stored_files([SimpleUploadedFile("a.pdf", b"content")]) as (
+                blob_names,
+                _,
+            ):
+                raise ValueError
+
+        self.assertFalse(StoredBlob.objects.exists())
+        self.assertEqual(
+            list(
+                PendingBlobDeletion.objects.values_list("container_name", "blob_name")
+            ),
+            [(SHARED_BLOB_CONTAINER, blob_names[0])],
+        )
+
+    def test_deleting_a_chat_room_releases_its_attachments(self, blob_service_client):
+        user = User.objects.create_user("jane@example.com", "password")
+        chat_room = ChatRoom.objects.create(
+            room_name="Room", description="", creator=user
+        )
+        create_chat_shared_file(
+            [SimpleUploadedFile("a.pdf", b"content")], chat_room, user
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.delete(f"/chats/delete-chat-room/{chat_room.id}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(StoredBlob.objects.get().reference_count, 0)
+        self.assertEqual(
+            PendingBlobDeletion.objects.get().container_name, SHARED_BLOB_CONTAINER
+        )
+
+
+class ImageVariantDeletionTests(TestCase):
+    def test_image_poll_releases_the_file_once_with_its_variants(self):
+        poll = Poll(file_key="Poll/cat.png", snapshot_key="Poll/cat.png")
+
+        self.assertEqual(
+            get_poll_blob_keys(poll),
+            [
+                "Poll/cat.png",
+                "Poll/cat_thumbnail.jpg",
+                "Poll/cat_thumbnail.webp",
+                "Poll/cat_card.jpg",
+                "Poll/cat_card.webp",
+                "Poll/cat_full.jpg",
+                "Poll/cat_full.webp",
+            ],
+        )
+
+    def test_pdf_poll_releases_the_document_and_its_thumbnail(self):
+        poll = Poll(file_key="Poll/doc.pdf", snapshot_key="Poll/poll_thumbnail.jpg")
+
+        blob_keys = get_poll_blob_keys(poll)
+
+        self.assertEqual(len(blob_keys), 8)
+        self.assertIn("Poll/doc.pdf", blob_keys)
+        self.assertIn("Poll/poll_thumbnail_full.webp", blob_keys)
+
+
+@mock.patch("helpers.azure_file_handling.spool_upload", return_value="/tmp/upload")
+@mock.patch("helpers.azure_file_handling.blob_service_client")
+@mock.patch("requests.sessions.Session.request")
+class UploadWithoutHttpTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user("author@example.com", "password")
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def test_blog_pdf_cover_is_rendered_without_calling_the_api(self, request, *mocks):
+        upload = SimpleUploadedFile("cover.pdf", b"%PDF-1.4", "application/pdf")
+
+        with mock.patch(
+            "Blog.views.blog_view.check_permission", return_value=True
+        ), self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                "/blog/create-blog/",
+                {"title": "Title", "content": "[]", "cover_image": upload},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        request.assert_not_called()
+        # The thumbnail is rendered in the background once the post is committed
+        self.assertEqual(len(callbacks), 1)
+        self.assertTrue(
+            BlogDocuments.objects.filter(blog=BlogPost.objects.get()).exists()
+        )
+
+    def test_poll_snapshot_is_stored_without_calling_the_api(self, request, *mocks):
+        upload = SimpleUploadedFile("snapshot.png", b"image", "image/png")
+
+        with mock.patch(
+            "Polls.views.polls_view.check_permission", return_value=True
+        ), self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                "/polls/create-poll/",
+                {
+                    "question": "Question?",
+                    "choices": "['Yes', 'No']",
+                    "start_date": "2026-10-18",
+                    "end_date": "2026-10-25",
+                    "files": upload,
+                },
+            )
+
+        self.assertEqual(response.status_code, 200)
+        request.assert_not_called()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(
+            Poll.objects.get().snapshot_key, "Poll_Documents/Question/snapshot.png"
+        )
+
+
+class OutboundEmailTests(TestCase):
+    def setUp(self):
+        self.email = OutboundEmail.objects.create(
+            recipient="user@example.com", subject="Subject", message="Message"
+        )
+
+    def test_emails_are_sent_outside_the_claiming_transaction(self):
+        atomic_depth = len(connection.atomic_blocks)
+        server = mock.Mock()
+        server.send_message.side_effect = lambda message: self.assertEqual(
+            len(connection.atomic_blocks), atomic_depth
+        )
+
+        server, sent_count = send_queued_emails(server)
+
+        self.assertEqual(sent_count, 1)
+        server.send_message.assert_called_once()
+        self.email.refresh_from_db()
+        self.assertEqual(self.email.status, OutboundEmail.SENT)
+
+    def test_claimed_emails_are_skipped_by_other_workers(self):
+        self.assertEqual(claim_queued_emails(10), [self.email])
+        self.assertEqual(claim_queued_emails(10), [])
+
+    def test_failed_connection_puts_the_batch_back(self):
+        next_attempt_on = self.email.next_attempt_on
+
+        with mock.patch(
+            "helpers.email_sender.open_smtp_connection", side_effect=OSError
+        ), self.assertRaises(OSError):
+            send_queued_emails()
+
+        self.email.refresh_from_db()
+        self.assertEqual(self.email.next_attempt_on, next_attempt_on)
+        self.assertEqual(self.email.attempts, 0)
+
+
+class ShortLinkTests(TestCase):
+    def setUp(self):
+        resolve_short_link.cache_clear()
+
+    def test_codes_are_random(self):
+        urls = [f"https://files.example.com/file{index}.pdf" for index in range(3)]
+
+        codes = [short_url.rpartition("/s/")[2] for short_url in shorten_urls(urls)]
+
+        self.assertEqual(len(set(codes)), 3)
+        for code in codes:
+            self.assertEqual(len(code), SHORT_LINK_CODE_LENGTH)
+        self.assertFalse(ShortLink.objects.filter(code__in=["1", "2", "3"]).exists())
+
+    def test_same_target_keeps_its_link(self):
+        url = "https://files.example.com/file.pdf"
+
+        self.assertEqual(shorten_url(url), shorten_url(url))
+        self.assertEqual(shorten_urls([url]), [shorten_url(url)])
+        self.assertEqual(ShortLink.objects.count(), 1)
+
+    def test_taken_code_is_drawn_again(self):
+        ShortLink.objects.create(code="taken", target_url="https://example.com/a")
+
+        with mock.patch(
+            "helpers.short_links.generate_short_link_code",
+            side_effect=["taken", "free"],
+        ):
+            short_url = shorten_url("https://example.com/b")
+
+        self.assertTrue(short_url.endswith("/s/free"))
+
+    def test_short_link_redirects_to_its_target(self):
+        url = "https://files.example.com/file.pdf"
+        code = shorten_url(url).rpartition("/s/")[2]
+
+        response = APIClient().get(f"/s/{code}")
+
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response["Location"], url)
+
+
+class ProfanityFilterTests(TestCase):
+    def setUp(self):
+        bump_censor_words_version()
+
+    def test_texts_are_censored_like_better_profanity(self):
+        texts = {
+            "hello_world shit-head": "hello_world ****",
+            "son of a bitch": "son of a ****",
+            "hand-job": "****",
+            "what the fuck!": "what the ****!",
+            # better_profanity never joins a one letter word that ends the text
+            "f u c k": "f u c k",
+            "f u c k you": "**** you",
+            "s.h.i.t": "s.h.i.t",
+        }
+        profanity.load_censor_words()
+
+        for text, censored in texts.items():
+            with self.subTest(text=text):
+                self.assertEqual(profanity.censor(text), censored)
+                self.assertEqual(censor_text(text), (censored, censored != text))
+
+    def test_custom_words_are_censored(self):
+        CensorWord.objects.create(word="gosh-darn")
+        bump_censor_words_version()
+
+        self.assertEqual(censor_text("oh gosh-darn it"), ("oh **** it", True))
+        self.assertEqual(censor_text("oh gosh darn it"), ("oh gosh darn it", False))
+
+
+class FTPDirectoryTests(TestCase):
+    def setUp(self):
+        self.pool = FTPPool(1)
+        self.ftp = mock.Mock()
+        self.ftp.pwd.return_value = "/"
+
+    def test_existing_directories_are_remembered(self):
+        self.ftp.mkd.side_effect = ftplib.error_perm("550 File exists")
+
+        self.pool.ensure_directory(self.ftp, "Uploads/Files")
+
+        self.assertEqual(self.pool.directories, {"Uploads", "Uploads/Files"})
+        self.ftp.cwd.assert_has_calls(
+            [mock.call("Uploads"), mock.call("/"), mock.call("Uploads/Files")]
+        )
+        self.assertEqual(self.ftp.cwd.call_args, mock.call("/"))
+
+    def test_directories_that_could_not_be_created_are_not_remembered(self):
+        self.ftp.mkd.side_effect = ftplib.error_perm("550 Permission denied")
+        self.ftp.cwd.side_effect = ftplib.error_perm("550 No such directory")
+
+        with self.assertRaises(ftplib.error_perm):
+            self.pool.ensure_directory(self.ftp, "Uploads")
+
+        self.assertEqual(self.pool.directories, set())
@@ -0,0 +1,18 @@
+from django.http import HttpResponsePermanentRedirect
+from rest_framework.views import APIView
+
+from Utilities.models import ShortLink
+from helpers.short_links import resolve_short_link
+from helpers.status_codes import non_existing_data_exception
+
+
+class ResolveShortLink(APIView):
+    authentication_classes = ()
+
+    def get(self, request, *args, **kwargs):
+        try:
+            target_url = resolve_short_link(self.kwargs["code"])
+        except ShortLink.DoesNotExist:
+            raise non_existing_data_exception("Link")
+
+        return HttpResponsePermanentRedirect(target_url)
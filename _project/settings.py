@@ -104,6 +104,17 @@ CHANNEL_LAYERS = {
     },
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{os.getenv('REDIS_IP')}:{os.getenv('REDIS_PORT')}",
+    },
+}
+
+# Absolute origin of the /s/<code> short links stored in the database,
+# checked when the Utilities app loads
+SHORT_LINK_BASE_URL = os.getenv("SHORT_LINK_BASE_URL")
+
 ASGI_APPLICATION = "chat_channels.routing.application"
 
 MIDDLEWARE = [
@@ -149,7 +160,8 @@ AUTH_USER_MODEL = "Auth.User"
 WSGI_APPLICATION = "_project.wsgi.application"
 
 DATA_UPLOAD_MAX_MEMORY_SIZE = 2 * 1024 * 1024 * 1024  # 2GB
-FILE_UPLOAD_MAX_MEMORY_SIZE = DATA_UPLOAD_MAX_MEMORY_SIZE
+# Larger files are spooled to a temporary file and streamed to Azure in blocks
+FILE_UPLOAD_MAX_MEMORY_SIZE = 4 * 1024 * 1024  # 4MB
 
 
 SIMPLE_JWT = {
@@ -38,6 +38,7 @@ urlpatterns = [
     path("forum/", include("Forum.forum_urls")),
     path("chats/", include("Forum.chat_urls")),
     path("document-vault/", include("DocumentVault.urls")),
+    path("s/", include("Utilities.short_link_urls")),
 ]
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
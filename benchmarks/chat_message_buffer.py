@@ -0,0 +1,51 @@
+"""
+Chat messages written per second, one insert per message against the batches
+of the socket message buffer.
+
+    python -m benchmarks.chat_message_buffer --messages 5000 --rooms 10
+"""
+from benchmarks.common import benchmark_database, parse_args, setup_django, timed
+
+
+def make_messages(chat_rooms, sender, count):
+    return [
+        {
+            "chat_room_id": chat_rooms[index % len(chat_rooms)].id,
+            "sender_id": str(sender.user_key),
+            "message": f"Message {index}",
+            "media_files": [],
+        }
+        for index in range(count)
+    ]
+
+
+def run(messages, rooms):
+    from Auth.models import User
+    from Forum.forum_helper import create_chat_room_message
+    from Forum.models import ChatRoom
+    from chat_channels.message_buffer import FLUSH_BATCH_SIZE, ChatMessageBuffer
+
+    sender = User.objects.create_user("benchmark@example.com", "password")
+    chat_rooms = [
+        ChatRoom.objects.create(room_name=f"Room {index}", description="")
+        for index in range(rooms)
+    ]
+    data = make_messages(chat_rooms, sender, messages)
+
+    with timed("One insert per message", messages, "messages"):
+        for message in data:
+            create_chat_room_message(message)
+
+    buffer = ChatMessageBuffer()
+    with timed(f"Buffered, {FLUSH_BATCH_SIZE} per flush", messages, "messages"):
+        for message in data:
+            if buffer.append(message):
+                buffer.write_messages(buffer.take_messages())
+        buffer.write_messages(buffer.take_messages())
+
+
+if __name__ == "__main__":
+    args = parse_args(__doc__, messages=5000, rooms=10)
+    setup_django()
+    with benchmark_database():
+        run(args.messages, args.rooms)
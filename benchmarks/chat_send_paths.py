@@ -0,0 +1,102 @@
+"""
+Chat messages sent per second by concurrent members, over the HTTP endpoint
+and over the websocket.
+
+    python -m benchmarks.chat_send_paths --messages 2000 --clients 8
+"""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import benchmark_database, parse_args, setup_django, timed
+
+
+def create_members(clients):
+    from Auth.models import User
+    from Forum.models import ChatRoom, UserChatRoom
+
+    chat_room = ChatRoom.objects.create(
+        room_name="Benchmark", description="", total_members=clients
+    )
+    members = []
+    for index in range(clients):
+        member = User.objects.create_user(f"member{index}@example.com", "password")
+        UserChatRoom.objects.create(chat_room=chat_room, member=member)
+        members.append(member)
+
+    return chat_room, members
+
+
+def send_over_http(chat_room, member, count):
+    from django.db import connection
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    client = Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(member)}")
+    try:
+        for index in range(count):
+            response = client.post(
+                f"/chats/send-message/{chat_room.id}/", {"message": f"Message {index}"}
+            )
+            assert response.status_code == 200, response.content
+    finally:
+        connection.close()
+
+
+async def send_over_socket(chat_room, member, count):
+    from channels.testing import WebsocketCommunicator
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from chat_channels.routing import websocket_urlpatterns
+
+    communicator = WebsocketCommunicator(
+        websocket_urlpatterns,
+        f"/ws/chat-messages/{chat_room.id}/?token={AccessToken.for_user(member)}",
+    )
+    connected, _ = await communicator.connect()
+    assert connected
+    for index in range(count):
+        await communicator.send_to(json.dumps({"message": f"Message {index}"}))
+    # Handled after every message sent before it, and flushes the buffer
+    await communicator.disconnect(timeout=60)
+
+
+async def send_over_sockets(chat_room, members, per_client):
+    from asgiref.sync import sync_to_async
+    from django.db import connections
+
+    await asyncio.gather(
+        *[send_over_socket(chat_room, member, per_client) for member in members]
+    )
+    # The consumers' database calls share one thread, close its connection
+    await sync_to_async(connections.close_all)()
+
+
+def run(messages, clients):
+    from Forum.models import ChatRoomMessages
+
+    chat_room, members = create_members(clients)
+    per_client = messages // clients
+    total = per_client * clients
+
+    with timed(f"HTTP, {clients} clients", total, "messages"):
+        with ThreadPoolExecutor(clients) as executor:
+            for future in [
+                executor.submit(send_over_http, chat_room, member, per_client)
+                for member in members
+            ]:
+                future.result()
+
+    with timed(f"Websocket, {clients} clients", total, "messages"):
+        asyncio.run(send_over_sockets(chat_room, members, per_client))
+
+    # Every message was written, the socket ones by the buffer on disconnect
+    written = ChatRoomMessages.objects.filter(chat_room=chat_room).count()
+    assert written == total * 2, written
+
+
+if __name__ == "__main__":
+    args = parse_args(__doc__, messages=2000, clients=8)
+    setup_django()
+    with benchmark_database():
+        run(args.messages, args.clients)
@@ -0,0 +1,42 @@
+import argparse
+import os
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "_project.settings")
+    django.setup()
+
+
+@contextmanager
+def benchmark_database():
+    # A throwaway copy of the schema, like the test runner uses
+    from django.db import connection
+
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+@contextmanager
+def timed(label, count, unit):
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    print(f"{label}: {count} {unit} in {elapsed:.2f}s, {count / elapsed:,.0f} {unit}/s")
+
+
+def parse_args(description, **defaults):
+    # Every default becomes an --option of the same type
+    parser = argparse.ArgumentParser(description=description)
+    for name, default in defaults.items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=type(default), default=default
+        )
+    return parser.parse_args()
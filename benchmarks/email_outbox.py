@@ -0,0 +1,70 @@
+"""
+Emails delivered per second by concurrent outbox workers, against an SMTP
+session that takes the given number of milliseconds per message.
+
+    python -m benchmarks.email_outbox --emails 2000 --workers 4 --latency 5
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import benchmark_database, parse_args, setup_django, timed
+
+
+class SlowSMTPSession:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def send_message(self, message):
+        time.sleep(self.latency)
+
+    def quit(self):
+        pass
+
+
+def drain_outbox(latency, batch_size):
+    from django.db import connection
+
+    from helpers.email_sender import send_queued_emails
+
+    server = SlowSMTPSession(latency)
+    total_sent = 0
+    try:
+        while True:
+            server, sent_count = send_queued_emails(server, batch_size)
+            total_sent += sent_count
+            if not sent_count:
+                return total_sent
+    finally:
+        connection.close()
+
+
+def run(emails, workers, latency, batch_size):
+    from Utilities.models import OutboundEmail
+
+    for worker_count in sorted({1, workers}):
+        OutboundEmail.objects.all().delete()
+        OutboundEmail.objects.bulk_create(
+            OutboundEmail(
+                recipient=f"user{index}@example.com", subject="Subject", message=""
+            )
+            for index in range(emails)
+        )
+
+        with timed(f"{worker_count} workers", emails, "emails"):
+            with ThreadPoolExecutor(worker_count) as executor:
+                futures = [
+                    executor.submit(drain_outbox, latency / 1000, batch_size)
+                    for _ in range(worker_count)
+                ]
+                total_sent = sum(future.result() for future in futures)
+
+        # Every email was sent exactly once
+        assert total_sent == emails, total_sent
+        assert OutboundEmail.objects.filter(status=OutboundEmail.SENT).count() == emails
+
+
+if __name__ == "__main__":
+    args = parse_args(__doc__, emails=2000, workers=4, latency=5, batch_size=100)
+    setup_django()
+    with benchmark_database():
+        run(args.emails, args.workers, args.latency, args.batch_size)
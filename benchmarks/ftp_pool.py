@@ -0,0 +1,103 @@
+"""
+Files uploaded per second over a new FTP session per upload, the way uploads
+used to connect, and over the pooled sessions of helpers.ftp_client. Runs
+against a local pyftpdlib server.
+
+    python -m benchmarks.ftp_pool --uploads 200 --threads 4
+"""
+import ftplib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from os import path
+
+from benchmarks.common import parse_args, timed
+
+FTP_USERNAME = "benchmark"
+FTP_PASSWORD = "password"
+
+
+def start_ftp_server(root):
+    from pyftpdlib.authorizers import DummyAuthorizer
+    from pyftpdlib.handlers import FTPHandler
+    from pyftpdlib.log import config_logging
+    from pyftpdlib.servers import ThreadedFTPServer
+
+    # The server logs every command otherwise
+    config_logging(level="WARNING")
+    authorizer = DummyAuthorizer()
+    authorizer.add_user(FTP_USERNAME, FTP_PASSWORD, root, perm="elradfmw")
+    handler = type("BenchmarkFTPHandler", (FTPHandler,), {"authorizer": authorizer})
+    server = ThreadedFTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+def upload_over_new_session(file_path, subdirectory):
+    # Connect, log in and walk the directories on every upload
+    ftp = ftplib.FTP(os.environ["FTP_HOSTNAME"])
+    ftp.login(FTP_USERNAME, FTP_PASSWORD)
+    for name in subdirectory.split("/"):
+        if name not in ftp.nlst():
+            try:
+                ftp.mkd(name)
+            except ftplib.error_perm:
+                # Created by another thread since the listing
+                pass
+        ftp.cwd(name)
+    with open(file_path, "rb") as file:
+        ftp.storbinary("STOR " + path.basename(file_path), file)
+    ftp.quit()
+
+
+def upload_over_pool(file_path, subdirectory):
+    from helpers.ftp_client import upload_files_batch
+
+    upload_files_batch([file_path], subdirectory)
+
+
+def run_uploads(label, upload, file_paths, threads):
+    with timed(f"{label}, {threads} threads", len(file_paths), "uploads"):
+        with ThreadPoolExecutor(threads) as executor:
+            for future in [
+                executor.submit(upload, file_path, f"Benchmark/{label}/Uploads")
+                for file_path in file_paths
+            ]:
+                future.result()
+
+
+def run(uploads, threads, server_root, local_root):
+    server = start_ftp_server(server_root)
+    # ftplib connects to the class port when none is given
+    ftplib.FTP.port = server.address[1]
+    os.environ["FTP_HOSTNAME"] = "127.0.0.1"
+    os.environ["FTP_USERNAME"] = FTP_USERNAME
+    os.environ["FTP_PASSWORD"] = FTP_PASSWORD
+    os.environ["FTP_POOL_SIZE"] = str(threads)
+
+    file_paths = []
+    for index in range(uploads):
+        file_path = path.join(local_root, f"file{index}.txt")
+        with open(file_path, "wb") as file:
+            file.write(os.urandom(1024))
+        file_paths.append(file_path)
+
+    try:
+        run_uploads("New session", upload_over_new_session, file_paths, threads)
+        run_uploads("Pooled", upload_over_pool, file_paths, threads)
+    finally:
+        server.close_all()
+
+    # Every file reached the server both ways
+    for label in ("New session", "Pooled"):
+        uploaded = os.listdir(path.join(server_root, "Benchmark", label, "Uploads"))
+        assert len(uploaded) == uploads, (label, len(uploaded))
+
+
+if __name__ == "__main__":
+    args = parse_args(__doc__, uploads=200, threads=4)
+    with tempfile.TemporaryDirectory() as server_root:
+        with tempfile.TemporaryDirectory() as local_root:
+            run(args.uploads, args.threads, server_root, local_root)
@@ -0,0 +1,56 @@
+"""
+Votes per second while many voters vote on the same poll at once.
+
+    python -m benchmarks.poll_votes --voters 2000 --threads 16
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import benchmark_database, parse_args, setup_django, timed
+
+
+def cast_votes(poll, choices, voters):
+    from django.db import connection
+
+    from Polls.poll_helper import cast_poll_vote
+
+    try:
+        for index, voter in enumerate(voters):
+            cast_poll_vote(poll, choices[index % len(choices)], voter, "")
+    finally:
+        connection.close()
+
+
+def run(voters, threads):
+    from Auth.models import User
+    from Polls.models.poll_models import Poll, PollChoices
+    from Polls.poll_helper import count_poll_results, refresh_poll_results
+
+    poll = Poll.objects.create(question="Benchmark", is_approved=True)
+    choices = [
+        PollChoices.objects.create(poll=poll, choice=f"Choice {index}")
+        for index in range(4)
+    ]
+    refresh_poll_results(poll.id)
+    users = User.objects.bulk_create(
+        User(email=f"voter{index}@example.com") for index in range(voters)
+    )
+
+    with timed(f"{threads} threads voting on one poll", voters, "votes"):
+        with ThreadPoolExecutor(threads) as executor:
+            for future in [
+                executor.submit(cast_votes, poll, choices, users[offset::threads])
+                for offset in range(threads)
+            ]:
+                future.result()
+
+    # Every vote was counted on the choices and in the stored results
+    poll.refresh_from_db()
+    assert poll.results == count_poll_results(poll.id), poll.results
+    assert poll.results["total_votes"] == voters, poll.results
+
+
+if __name__ == "__main__":
+    args = parse_args(__doc__, voters=2000, threads=16)
+    setup_django()
+    with benchmark_database():
+        run(args.voters, args.threads)
@@ -1,35 +1,128 @@
 import json
-from channels.generic.websocket import AsyncWebsocketConsumer
 from datetime import datetime
-from Forum.models import ChatRoom
-from helpers.status_codes import non_existing_data_exception
+from urllib.parse import parse_qs
+
 from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from Forum.models import UserChatRoom
+from chat_channels.membership import cache_membership, get_cached_membership
+from chat_channels.message_buffer import chat_message_buffer
+from chat_channels.sender_functions import get_chat_room_group_name
+
+# Browsers cannot set headers on a websocket, so the token is sent either as
+# ?token=<jwt> or as the subprotocol following this one
+TOKEN_SUBPROTOCOL = "access_token"
 
 
 class ChatRoomConsumer(AsyncWebsocketConsumer):
+    group_name = None
+    is_removed = False
+
     async def connect(self):
-        await self.accept()
         chat_room_id = self.scope["url_route"]["kwargs"]["chat_room_id"]
-        chat_room = await self.get_chat_room(chat_room_id)
-        room_name = self.get_room_name(chat_room)
-        await self.channel_layer.group_add(room_name, self.channel_name)
+        raw_token, subprotocol = self.get_raw_token()
+
+        user_id = self.get_user_id(raw_token)
+        if user_id is None:
+            await self.close()
+            return
+
+        member = await get_cached_membership(chat_room_id, user_id)
+        if member is None:
+            member = await self.get_chat_room_member(chat_room_id, user_id)
+            if member is None:
+                await self.close()
+                return
+            await cache_membership(chat_room_id, user_id, member)
+
+        self.chat_room_id = chat_room_id
+        self.user_id = str(user_id)
+        self.member = member
+        self.group_name = get_chat_room_group_name(chat_room_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept(subprotocol)
 
     async def disconnect(self, close_code):
-        chat_room_id = self.scope["url_route"]["kwargs"]["chat_room_id"]
-        chat_room = await self.get_chat_room(chat_room_id)
-        room_name = self.get_room_name(chat_room)
-        await self.channel_layer.group_discard(room_name, self.channel_name)
+        if self.group_name is not None:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+            # Sockets are closed on shutdown, so the buffer is drained with them
+            await chat_message_buffer.flush()
+
+    async def receive(self, text_data=None, bytes_data=None):
+        # Frames already in flight when the member was removed are ignored
+        if self.is_removed:
+            return
+
+        # Text messages sent over the socket, attachments still go over HTTP
+        try:
+            message = json.loads(text_data or "").get("message")
+        except (AttributeError, ValueError):
+            message = None
+        if not isinstance(message, str) or not message.strip():
+            await self.send(json.dumps({"error": "Invalid message"}))
+            return
+
+        data = {
+            "chat_room_id": self.chat_room_id,
+            "sender__first_name": self.member["member__first_name"],
+            "sender__last_name": self.member["member__last_name"],
+            "message": message,
+            "is_media": False,
+            "media_files": [],
+            "created_on": datetime.now().isoformat(),
+            "sender_id": self.user_id,
+        }
+        # Journaled, then written in batches shortly after, see message_buffer
+        await chat_message_buffer.add(data)
+        await self.channel_layer.group_send(
+            self.group_name, {"type": "send_group_messages", "data": data}
+        )
+
+    async def close_member_sockets(self, event):
+        # Sent by remove_chat_room_members when members leave or are removed
+        if self.user_id in event["user_ids"]:
+            self.is_removed = True
+            await self.close()
 
     async def send_group_messages(self, event):
-        await self.send(json.dumps({"data": event["data"]}))
+        data = event["data"]
+        if "sender_id" in data:
+            data = {**data, "is_sender": data["sender_id"] == self.user_id}
+        await self.send(json.dumps({"data": data}))
 
-    @database_sync_to_async
-    def get_chat_room(self, chat_room_id):
+    def get_raw_token(self):
+        # Returns the token and the subprotocol to echo back on accept
+        subprotocols = self.scope.get("subprotocols", [])
+        if TOKEN_SUBPROTOCOL in subprotocols:
+            index = subprotocols.index(TOKEN_SUBPROTOCOL)
+            if index + 1 < len(subprotocols):
+                return subprotocols[index + 1], TOKEN_SUBPROTOCOL
+
+        query = parse_qs(self.scope.get("query_string", b"").decode())
+        tokens = query.get("token")
+        return (tokens[0] if tokens else None), None
+
+    def get_user_id(self, raw_token):
+        if not raw_token:
+            return None
         try:
-            chat_room = ChatRoom.objects.get(id=chat_room_id)
-            return chat_room
-        except ChatRoom.DoesNotExist:
-            raise non_existing_data_exception("Chat Room")
+            token = AccessToken(raw_token)
+        except TokenError:
+            return None
+        return token.get(api_settings.USER_ID_CLAIM)
 
-    def get_room_name(self, chat_room):
-        return str(chat_room.room_name).lower().replace(" ", "_")
+    @database_sync_to_async
+    def get_chat_room_member(self, chat_room_id, user_id):
+        return (
+            UserChatRoom.objects.filter(
+                chat_room_id=chat_room_id,
+                member_id=user_id,
+                member__is_active=True,
+            )
+            .values("member__first_name", "member__last_name")
+            .first()
+        )
@@ -0,0 +1,52 @@
+from collections import defaultdict
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+
+from chat_channels.sender_functions import get_chat_room_group_name
+
+# Memberships confirmed when a socket connects, so reconnects skip the database.
+# Kept in the shared cache, so leaving a room clears them for every worker.
+MEMBERSHIP_CACHE_TIMEOUT = 60
+
+
+def get_membership_cache_key(chat_room_id, user_id):
+    return f"chat_room_member:{chat_room_id}:{user_id}"
+
+
+async def get_cached_membership(chat_room_id, user_id):
+    return await cache.aget(get_membership_cache_key(chat_room_id, user_id))
+
+
+async def cache_membership(chat_room_id, user_id, member):
+    await cache.aset(
+        get_membership_cache_key(chat_room_id, user_id),
+        member,
+        timeout=MEMBERSHIP_CACHE_TIMEOUT,
+    )
+
+
+def remove_chat_room_members(memberships):
+    # Takes (chat_room_id, user_id) pairs of the memberships that were removed.
+    # Clears them from the cache and closes the sockets they still have open.
+    if not memberships:
+        return
+
+    cache.delete_many(
+        [
+            get_membership_cache_key(chat_room_id, user_id)
+            for chat_room_id, user_id in memberships
+        ]
+    )
+
+    user_ids_by_room = defaultdict(list)
+    for chat_room_id, user_id in memberships:
+        user_ids_by_room[chat_room_id].append(str(user_id))
+
+    channel_layer = get_channel_layer()
+    for chat_room_id, user_ids in user_ids_by_room.items():
+        async_to_sync(channel_layer.group_send)(
+            get_chat_room_group_name(chat_room_id),
+            {"type": "close_member_sockets", "user_ids": user_ids},
+        )
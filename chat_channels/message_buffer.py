@@ -0,0 +1,229 @@
+import asyncio
+import atexit
+import json
+import logging
+import threading
+import time
+import uuid
+
+import redis
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import InterfaceError, OperationalError
+
+from Auth.models import User
+from Forum.forum_helper import build_chat_room_message, create_chat_room_messages
+from Forum.models import ChatRoom
+
+logger = logging.getLogger(__name__)
+
+# Messages are written at most this long after they were fanned out
+FLUSH_INTERVAL = 0.05
+FLUSH_BATCH_SIZE = 500
+
+# Every message is journaled in a Redis stream of its worker before it is
+# fanned out, and removed once written. The journal of a worker whose
+# heartbeat expired is taken over by the next worker that flushes.
+CHAT_JOURNAL_KEY = "chat_message_journal"
+JOURNAL_HEARTBEAT_TIMEOUT = 60
+JOURNAL_HEARTBEAT_INTERVAL = 10
+JOURNAL_RECOVERY_LOCK_TIMEOUT = 300
+
+
+def get_redis_client():
+    return redis.Redis.from_url(settings.CACHES["default"]["LOCATION"])
+
+
+def persist_chat_messages(messages):
+    # Rooms and senders deleted since the messages were sent would fail the
+    # whole batch
+    room_ids = set(
+        ChatRoom.objects.filter(
+            id__in={message.chat_room_id for message in messages}
+        ).values_list("id", flat=True)
+    )
+    sender_ids = {
+        str(user_key)
+        for user_key in User.objects.filter(
+            user_key__in={message.sender_id for message in messages}
+        ).values_list("user_key", flat=True)
+    }
+    create_chat_room_messages(
+        [
+            message
+            for message in messages
+            if message.chat_room_id in room_ids and str(message.sender_id) in sender_ids
+        ]
+    )
+
+
+def drop_chat_message(message, reason):
+    logger.error(
+        "Dropped chat message for room %s from %s: %s",
+        message.chat_room_id,
+        message.sender_id,
+        reason,
+    )
+
+
+class ChatMessageBuffer:
+    # Write-behind buffer for the chat messages received by this worker
+
+    def __init__(self, journal_key=CHAT_JOURNAL_KEY):
+        self.messages = []
+        self.lock = threading.Lock()
+        self.flush_task = None
+        self.batch_full = None
+        self.journal_key = journal_key
+        self.worker_id = uuid.uuid4().hex
+        self.redis_client = None
+        self.heartbeat_on = None
+
+    def get_journal_name(self, worker_id):
+        return f"{self.journal_key}:{worker_id}"
+
+    def get_heartbeat_key(self, worker_id):
+        return f"{self.journal_key}:alive:{worker_id}"
+
+    def get_redis(self):
+        if self.redis_client is None:
+            self.redis_client = get_redis_client()
+        return self.redis_client
+
+    async def add(self, data):
+        # Journaled before the caller fans the message out
+        is_full = await sync_to_async(self.append, thread_sensitive=False)(data)
+        if self.flush_task is None or self.flush_task.done():
+            self.batch_full = asyncio.Event()
+            self.flush_task = asyncio.get_running_loop().create_task(
+                self.flush_periodically()
+            )
+        if is_full:
+            self.batch_full.set()
+
+    def append(self, data):
+        # Returns True once a full batch is waiting
+        if self.heartbeat_on is None:
+            self.keep_journal_alive()
+        message = build_chat_room_message(data)
+        message.journal_id = self.get_redis().xadd(
+            self.get_journal_name(self.worker_id), {"data": json.dumps(data)}
+        )
+        with self.lock:
+            self.messages.append(message)
+            return len(self.messages) >= FLUSH_BATCH_SIZE
+
+    def take_messages(self):
+        with self.lock:
+            messages, self.messages = self.messages, []
+        return messages
+
+    def restore_messages(self, messages):
+        # Put the messages back until a flush manages to write them
+        with self.lock:
+            self.messages[:0] = messages
+
+    def acknowledge(self, messages):
+        # Written or dropped for good, so no longer needed in the journal
+        journal_ids = [message.journal_id for message in messages]
+        if journal_ids:
+            self.get_redis().xdel(self.get_journal_name(self.worker_id), *journal_ids)
+
+    def keep_journal_alive(self):
+        # Refresh this worker's heartbeat and take over the journals of
+        # workers that stopped without writing all of their messages
+        client = self.get_redis()
+        client.sadd(self.journal_key, self.worker_id)
+        client.set(
+            self.get_heartbeat_key(self.worker_id), 1, ex=JOURNAL_HEARTBEAT_TIMEOUT
+        )
+        self.heartbeat_on = time.monotonic()
+
+        for worker_id in client.smembers(self.journal_key):
+            worker_id = worker_id.decode()
+            if worker_id != self.worker_id and not client.exists(
+                self.get_heartbeat_key(worker_id)
+            ):
+                self.recover_journal(worker_id)
+
+    def recover_journal(self, worker_id):
+        client = self.get_redis()
+        journal_name = self.get_journal_name(worker_id)
+        lock_key = f"{journal_name}:recovery"
+        if not client.set(lock_key, 1, nx=True, ex=JOURNAL_RECOVERY_LOCK_TIMEOUT):
+            return
+
+        # Moved into this worker's journal at once, so a crash here loses nothing
+        entries = client.xrange(journal_name)
+        pipeline = client.pipeline(transaction=True)
+        for _, fields in entries:
+            pipeline.xadd(self.get_journal_name(self.worker_id), fields)
+        pipeline.delete(journal_name, lock_key)
+        pipeline.srem(self.journal_key, worker_id)
+        journal_ids = pipeline.execute()[: len(entries)]
+
+        messages = []
+        for journal_id, (_, fields) in zip(journal_ids, entries):
+            message = build_chat_room_message(json.loads(fields[b"data"]))
+            message.journal_id = journal_id
+            messages.append(message)
+        if messages:
+            logger.warning(
+                "Recovered %s chat messages of worker %s", len(messages), worker_id
+            )
+            self.restore_messages(messages)
+
+    async def flush_periodically(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.batch_full.wait(), FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self.batch_full.clear()
+            if time.monotonic() - self.heartbeat_on >= JOURNAL_HEARTBEAT_INTERVAL:
+                await sync_to_async(self.keep_journal_alive, thread_sensitive=False)()
+            await self.flush()
+
+    async def flush(self):
+        messages = self.take_messages()
+        if not messages:
+            return
+        await database_sync_to_async(self.write_messages)(messages)
+
+    def write_messages(self, messages):
+        try:
+            persist_chat_messages(messages)
+        except (InterfaceError, OperationalError):
+            # The database is unavailable, try the batch again on the next flush
+            logger.exception("Could not write %s chat messages", len(messages))
+            self.restore_messages(messages)
+        except Exception:
+            # Some row is invalid, write the others one by one without it
+            self.write_messages_one_by_one(messages)
+        else:
+            self.acknowledge(messages)
+
+    def write_messages_one_by_one(self, messages):
+        for index, message in enumerate(messages):
+            try:
+                persist_chat_messages([message])
+            except (InterfaceError, OperationalError):
+                logger.exception("Could not write %s chat messages", len(messages))
+                self.restore_messages(messages[index:])
+                return
+            except Exception as e:
+                # The row can never be written, so it is not kept
+                drop_chat_message(message, e)
+            self.acknowledge([message])
+
+    def flush_on_exit(self):
+        # The event loop is gone by now, write what is left synchronously.
+        # Whatever fails stays journaled for another worker to take over.
+        messages = self.take_messages()
+        if messages:
+            self.write_messages(messages)
+
+
+chat_message_buffer = ChatMessageBuffer()
+atexit.register(chat_message_buffer.flush_on_exit)
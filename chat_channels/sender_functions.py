@@ -2,6 +2,11 @@ from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
 
+# Group of the sockets connected to a chat room, keyed by the stable room id
+def get_chat_room_group_name(chat_room_id):
+    return f"chat_room_{chat_room_id}"
+
+
 # Send group messages
 def send_group_message(chat_room, data):
     channel_layer = get_channel_layer()
@@ -14,4 +14,8 @@ PORT=8001
 python $PROJECT_DIR/manage.py makemigrations
 python $PROJECT_DIR/manage.py migrate
 python $PROJECT_DIR/manage.py flush --no-input
+
+# Background workers
+sh $PROJECT_DIR/scripts/run-workers.sh
+
 python $PROJECT_DIR/manage.py runserver $HOST:$PORT
\ No newline at end of file
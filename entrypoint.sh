@@ -1,4 +1,5 @@
 #!/bin/sh
+sh $(dirname $0)/scripts/run-workers.sh
 daphne -b 0.0.0.0 -p 8000 _project.asgi:application
 
 exec "$@"
\ No newline at end of file
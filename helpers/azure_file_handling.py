@@ -1,18 +1,40 @@
-import json
+import hashlib
 import os
-import shutil
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import partial
 from os import path
 
-import requests
-from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
-from azure.storage.blob import BlobServiceClient, ContentSettings
-from django.core.files.storage import FileSystemStorage
-from pdf2image import convert_from_path
+from azure.core import MatchConditions
+from azure.core.exceptions import (
+    AzureError,
+    ResourceExistsError,
+)
+from azure.storage.blob import BlobBlock, BlobServiceClient, ContentSettings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
 
+from Auth.models import User
+from Blog.models.blog_model import BlogPost
 from DocumentVault.models import Document
 from Forum.forum_helper import categorize_file
-from Forum.models import SharedFile, ForumFile
+from Forum.models import Forum, SharedFile, ForumFile
+from Polls.models.poll_models import Poll
+from Utilities.models import PendingBlobDeletion, StoredBlob
 from Utilities.models.documents_model import BlogDocuments
+from helpers.image_variants import (
+    IMAGE_VARIANT_FORMATS,
+    MEDIA_WORKERS,
+    get_variant_key,
+    get_variant_keys,
+    render_image_variants_in_pool,
+)
+from helpers.pdf_thumbnails import render_pdf_thumbnail_in_pool, spool_upload
+from helpers.short_links import shorten_url, shorten_urls
 from helpers.status_codes import cannot_perform_action
 
 STORAGE_ACCOUNT = os.environ.get("STORAGE_ACCOUNT")
@@ -25,25 +47,520 @@ account_key = ";AccountKey="
 endpoint = "DefaultEndpointsProtocol=https;AccountName="
 core = ";EndpointSuffix=core.windows.net"
 
-LOCAL_FILE_PATH = os.environ.get("LOCAL_FILE_PATH")
-# Get the connection string from the Azure portal
-connection_string = (
+# Get the connection string from the Azure portal, or point
+# AZURE_STORAGE_CONNECTION_STRING at another endpoint such as Azurite
+connection_string = os.environ.get("AZURE_STORAGE_CONNECTION_STRING") or (
     f"{endpoint}{STORAGE_ACCOUNT}{account_key}{STORAGE_ACCOUNT_KEY}{core}"
 )
 
+# Size of the blocks staged per upload, only one block is held in memory
+UPLOAD_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Container of the content addressed files shared by every user
+SHARED_BLOB_CONTAINER = os.environ.get("SHARED_BLOB_CONTAINER", "shared-files")
+
+# Largest number of blobs Azure accepts in one batch delete
+BLOB_BATCH_DELETE_SIZE = 256
+MAX_BLOB_DELETION_ATTEMPTS = 8
+
+# Containers known to exist, mapped to when they were last confirmed
+CONTAINER_CACHE_TTL = 60 * 60
+container_registry = {}
+
+# Shared by all requests so that concurrent uploads stay bounded
+UPLOAD_WORKERS = int(os.environ.get("UPLOAD_WORKERS", 8))
+upload_executor = ThreadPoolExecutor(
+    max_workers=UPLOAD_WORKERS, thread_name_prefix="azure-upload"
+)
+
+# One thread per media process waits for renders and publishes them
+media_executor = ThreadPoolExecutor(
+    max_workers=MEDIA_WORKERS, thread_name_prefix="media-publish"
+)
+
 # Create a blob service client
 blob_service_client = BlobServiceClient.from_connection_string(connection_string)
 
 
-def shorten_url(url):
-    import pyshorteners
+def get_container_client(container_name, public_access="blob"):
+    # Create the container at most once per TTL instead of checking on every
+    # upload, an existing container is reported as ResourceExistsError
+    container_client = blob_service_client.get_container_client(container_name)
+    confirmed_on = container_registry.get(container_name)
+    if confirmed_on is None or time.monotonic() - confirmed_on > CONTAINER_CACHE_TTL:
+        try:
+            container_client.create_container(public_access=public_access)
+        except ResourceExistsError:
+            pass
+        container_registry[container_name] = time.monotonic()
+
+    return container_client
+
+
+def provision_user_container(user):
+    # Create the user's container up front so uploads skip the metadata call
+    user_name = f"{user.first_name}-{user.last_name}".lower()
+    try:
+        get_container_client(user_name)
+    except AzureError as e:
+        # Uploads create the container on demand if this fails
+        print("Could not provision the user container:", str(e))
+
+
+def stream_upload_blob(
+    container_client, blob_name, file, content_settings=None, overwrite=False
+):
+    # Stage the upload block by block straight from the uploaded file
+    blob_client = container_client.get_blob_client(blob_name)
+    block_list = []
+    for index, chunk in enumerate(file.chunks(UPLOAD_BLOCK_SIZE)):
+        block_id = f"{index:08d}"
+        blob_client.stage_block(block_id=block_id, data=chunk)
+        block_list.append(BlobBlock(block_id=block_id))
+
+    # Like upload_blob, raise ResourceExistsError unless told to overwrite
+    if overwrite:
+        blob_client.commit_block_list(block_list, content_settings=content_settings)
+    else:
+        blob_client.commit_block_list(
+            block_list,
+            content_settings=content_settings,
+            etag="*",
+            match_condition=MatchConditions.IfMissing,
+        )
+
+
+def upload_user_blob(container_client, blob_name, file):
+    # A key released by its owner and uploaded again replaces the old blob,
+    # whose pending deletion is cancelled so the new one survives
+    overwrite = cancel_blob_deletions(container_client.container_name, [blob_name])
+    stream_upload_blob(container_client, blob_name, file, overwrite=overwrite)
+
+
+def upload_derived_blob(container_client, blob_name, data, content_type):
+    # Thumbnails and variants live under fixed keys and replace older renders
+    cancel_blob_deletions(container_client.container_name, [blob_name])
+    container_client.upload_blob(
+        name=blob_name,
+        data=data,
+        overwrite=True,
+        content_settings=ContentSettings(content_type=content_type),
+    )
+
+
+def hash_upload(file):
+    # SHA-256 and size of the upload, read in the same blocks as the upload
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in file.chunks(UPLOAD_BLOCK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+
+    return digest.hexdigest(), size
+
+
+def upload_content(container_client, blob_key, file):
+    content_type = getattr(file, "content_type", None)
+    content_settings = None
+    if content_type:
+        content_settings = ContentSettings(content_type=content_type)
+
+    try:
+        stream_upload_blob(container_client, blob_key, file, content_settings)
+    except ResourceExistsError:
+        # The same bytes were stored by a concurrent upload
+        pass
+
+
+def upload_new_contents(new_files):
+    # Upload (file, size, blob_key) tuples to the shared container in parallel
+    if not new_files:
+        return
+
+    container_client = get_container_client(SHARED_BLOB_CONTAINER)
+    list(
+        upload_executor.map(
+            partial(upload_content, container_client),
+            [blob_key for _, _, blob_key in new_files],
+            [file for file, _, _ in new_files],
+        )
+    )
+
+
+def upload_files(files):
+    # Hash the files and upload the content that is not stored yet, before
+    # any transaction is opened. Returns the digests in order, the
+    # (file, size, blob_key) of each digest and the digests uploaded.
+    hashes = list(upload_executor.map(hash_upload, files))
+    digests = [digest for digest, _ in hashes]
+
+    files_by_digest = {}
+    for file, (digest, size) in zip(files, hashes):
+        if digest not in files_by_digest:
+            extension = os.path.splitext(str(file.name))[1].lower()
+            files_by_digest[digest] = (file, size, f"{digest[:2]}/{digest}{extension}")
+
+    known_digests = set(
+        StoredBlob.objects.filter(sha256__in=files_by_digest).values_list(
+            "sha256", flat=True
+        )
+    )
+    uploaded_digests = set(files_by_digest) - known_digests
+    upload_new_contents([files_by_digest[digest] for digest in uploaded_digests])
+
+    return digests, files_by_digest, uploaded_digests
+
+
+def reference_files(digests, files_by_digest, uploaded_digests):
+    # Count one reference per file in the caller's transaction. Returns the
+    # keys in order, and the digests whose content the deletion worker
+    # removed since it was looked up. Nothing is written when there are any.
+    stored_blobs = {
+        stored_blob.sha256: stored_blob
+        for stored_blob in StoredBlob.objects.select_for_update().filter(
+            sha256__in=files_by_digest
+        )
+    }
+    removed_digests = set(files_by_digest) - uploaded_digests - set(stored_blobs)
+    if removed_digests:
+        return None, removed_digests
+
+    reference_counts = Counter(digests)
+    blob_keys = {}
+    for digest, (_, size, blob_key) in files_by_digest.items():
+        stored_blob = stored_blobs.get(digest)
+        if stored_blob is None:
+            stored_blob, _ = StoredBlob.objects.get_or_create(
+                sha256=digest, defaults={"blob_key": blob_key, "size": size}
+            )
+        StoredBlob.objects.filter(id=stored_blob.id).update(
+            reference_count=F("reference_count") + reference_counts[digest]
+        )
+        if digest in uploaded_digests and stored_blob.blob_key != blob_key:
+            # A concurrent upload stored the bytes under another extension
+            schedule_blob_deletions(SHARED_BLOB_CONTAINER, [blob_key])
+        blob_keys[digest] = stored_blob.blob_key
+
+    return [blob_keys[digest] for digest in digests], removed_digests
+
+
+def release_uploaded_files(files_by_digest, uploaded_digests):
+    # Content uploaded for a transaction that rolled back holds no reference.
+    # The deletion worker keeps it if a concurrent upload referenced it.
+    PendingBlobDeletion.objects.bulk_create(
+        PendingBlobDeletion(
+            container_name=SHARED_BLOB_CONTAINER,
+            blob_name=files_by_digest[digest][2],
+        )
+        for digest in uploaded_digests
+    )
+
+
+@contextmanager
+def stored_files(files):
+    # Store the files by content. Bytes that are already stored only gain a
+    # reference, the others are uploaded once before any row is locked. Then
+    # yields the keys and short urls in order inside a short transaction, in
+    # which the caller writes the rows that hold them.
+    digests, files_by_digest, uploaded_digests = upload_files(files)
+    try:
+        while True:
+            with transaction.atomic():
+                blob_keys, removed_digests = reference_files(
+                    digests, files_by_digest, uploaded_digests
+                )
+                if not removed_digests:
+                    yield blob_keys, shorten_urls(
+                        [
+                            f"{BLOB_BASE_URL}/{SHARED_BLOB_CONTAINER}/{blob_key}"
+                            for blob_key in blob_keys
+                        ]
+                    )
+                    return
+            # Upload the removed content again, outside the transaction
+            upload_new_contents([files_by_digest[digest] for digest in removed_digests])
+            uploaded_digests |= removed_digests
+    except Exception:
+        release_uploaded_files(files_by_digest, uploaded_digests)
+        raise
+
+
+def release_stored_blobs(blob_keys):
+    # Drop one reference per key. Unreferenced rows are kept at zero until
+    # the deletion worker removes the object, so an upload of the same bytes
+    # in between simply takes them back. Returns the content addressed keys.
+    reference_counts = Counter(blob_keys)
+    stored_blobs = list(
+        StoredBlob.objects.select_for_update().filter(blob_key__in=reference_counts)
+    )
+    for stored_blob in stored_blobs:
+        stored_blob.reference_count = max(
+            stored_blob.reference_count - reference_counts[stored_blob.blob_key], 0
+        )
+    StoredBlob.objects.bulk_update(stored_blobs, ["reference_count"])
+
+    return {
+        stored_blob.blob_key: stored_blob.reference_count
+        for stored_blob in stored_blobs
+    }
+
+
+def schedule_blob_deletions(container_name, blob_names):
+    # Record the blobs in the caller's transaction, the delete_pending_blobs
+    # worker removes them from storage in batches
+    blob_names = [blob_name for blob_name in blob_names if blob_name]
+    if not blob_names:
+        return
+
+    with transaction.atomic():
+        stored_blobs = release_stored_blobs(blob_names)
+        tombstones = []
+        for blob_name in blob_names:
+            if blob_name not in stored_blobs:
+                tombstones.append(
+                    PendingBlobDeletion(
+                        container_name=container_name, blob_name=blob_name
+                    )
+                )
+            elif stored_blobs.pop(blob_name) == 0:
+                tombstones.append(
+                    PendingBlobDeletion(
+                        container_name=SHARED_BLOB_CONTAINER, blob_name=blob_name
+                    )
+                )
+        PendingBlobDeletion.objects.bulk_create(tombstones)
+
+
+def schedule_shared_file_deletions(shared_files):
+    # Release the chat attachments of rooms that are being deleted. Keys from
+    # before content addressing live in the uploader's container.
+    file_keys = defaultdict(list)
+    for file_key, first_name, last_name in shared_files.values_list(
+        "file_key", "uploader__first_name", "uploader__last_name"
+    ):
+        file_keys[f"{first_name}-{last_name}".lower()].append(file_key)
+
+    for container_name, container_file_keys in file_keys.items():
+        schedule_blob_deletions(container_name, container_file_keys)
+
+
+def cancel_blob_deletions(container_name, blob_names):
+    # A key that is uploaded again must not be removed by an older deletion.
+    # Returns whether a deletion was pending, the caller may then overwrite.
+    deleted, _ = PendingBlobDeletion.objects.filter(
+        container_name=container_name, blob_name__in=blob_names
+    ).delete()
+    return bool(deleted)
+
+
+def get_blob_deletion_delay(attempts):
+    return timedelta(seconds=min(60 * 2 ** (attempts - 1), 3600))
+
+
+def mark_blob_deletion_failed(tombstone, error, now):
+    tombstone.attempts += 1
+    tombstone.last_error = error
+    if tombstone.attempts >= MAX_BLOB_DELETION_ATTEMPTS:
+        # Kept for inspection, the worker no longer picks it up
+        tombstone.status = PendingBlobDeletion.FAILED
+    else:
+        tombstone.next_attempt_on = now + get_blob_deletion_delay(tombstone.attempts)
+
+
+def split_referenced_shared_blobs(tombstones):
+    # Shared content that was referenced again is kept. Returns the tombstones
+    # to delete, the ones already handled and the unreferenced StoredBlob ids.
+    stored_blobs = {
+        stored_blob.blob_key: stored_blob
+        for stored_blob in StoredBlob.objects.select_for_update().filter(
+            blob_key__in=[tombstone.blob_name for tombstone in tombstones]
+        )
+    }
+    pending, done, unreferenced_ids = [], [], []
+    for tombstone in tombstones:
+        stored_blob = stored_blobs.get(tombstone.blob_name)
+        if stored_blob is not None and stored_blob.reference_count:
+            done.append(tombstone)
+            continue
+        if stored_blob is not None:
+            unreferenced_ids.append(stored_blob.id)
+        pending.append(tombstone)
 
-    # Create an instance of the Shortener class
-    shortener = pyshorteners.Shortener()
+    return pending, done, unreferenced_ids
 
-    # Shorten the URL using the default shortening service (TinyURL)
-    short_url = shortener.tinyurl.short(url)
-    return short_url
+
+def delete_container_blobs(container_name, tombstones):
+    # One batch call for the container, returns an error or None per blob
+    container_client = blob_service_client.get_container_client(container_name)
+    try:
+        responses = container_client.delete_blobs(
+            *[tombstone.blob_name for tombstone in tombstones],
+            raise_on_any_failure=False,
+        )
+        return [
+            None if response.status_code in (202, 404) else response.reason
+            for response in responses
+        ]
+    except AzureError as e:
+        return [str(e)] * len(tombstones)
+
+
+def delete_pending_blobs(batch_size=BLOB_BATCH_DELETE_SIZE):
+    # Delete a batch of recorded blobs with one batch call per container.
+    # Returns the number of tombstones handled.
+    with transaction.atomic():
+        tombstones = list(
+            PendingBlobDeletion.objects.select_for_update(skip_locked=True)
+            .filter(
+                status=PendingBlobDeletion.PENDING,
+                next_attempt_on__lte=timezone.now(),
+            )
+            .order_by("next_attempt_on", "id")[:batch_size]
+        )
+        if not tombstones:
+            return 0
+
+        containers = defaultdict(list)
+        for tombstone in tombstones:
+            containers[tombstone.container_name].append(tombstone)
+
+        done, unreferenced_ids = [], []
+        if SHARED_BLOB_CONTAINER in containers:
+            (
+                containers[SHARED_BLOB_CONTAINER],
+                done,
+                unreferenced_ids,
+            ) = split_referenced_shared_blobs(containers[SHARED_BLOB_CONTAINER])
+
+        failed = []
+        now = timezone.now()
+        for container_name, container_tombstones in containers.items():
+            if not container_tombstones:
+                continue
+            errors = delete_container_blobs(container_name, container_tombstones)
+            for tombstone, error in zip(container_tombstones, errors):
+                if error is None:
+                    done.append(tombstone)
+                else:
+                    mark_blob_deletion_failed(tombstone, error, now)
+                    failed.append(tombstone)
+
+        # Keep the rows of shared content whose object could not be deleted
+        StoredBlob.objects.filter(id__in=unreferenced_ids).exclude(
+            blob_key__in=[tombstone.blob_name for tombstone in failed]
+        ).delete()
+        PendingBlobDeletion.objects.filter(
+            id__in=[tombstone.id for tombstone in done]
+        ).delete()
+        PendingBlobDeletion.objects.bulk_update(
+            failed, ["status", "attempts", "last_error", "next_attempt_on"]
+        )
+
+    return len(tombstones)
+
+
+def upload_image_variants(container_client, container_name, blob_name, variants):
+    # Upload every derivative next to the original, returning their urls
+    variant_urls = {}
+    for variant_name, encoded in variants.items():
+        variant_urls[variant_name] = {}
+        for extension, _, content_type in IMAGE_VARIANT_FORMATS:
+            variant_key = get_variant_key(blob_name, variant_name, extension)
+            upload_derived_blob(
+                container_client, variant_key, encoded[extension], content_type
+            )
+            variant_url = f"{BLOB_BASE_URL}/{container_name}/{variant_key}"
+            variant_urls[variant_name][extension] = variant_url
+
+    return variant_urls
+
+
+def schedule_image_variants(file, container_name, blob_name, queryset, field):
+    # Build the responsive variants once the row is committed, without
+    # holding the request. field names the column that stores their urls.
+    image_path = spool_upload(file, os.path.splitext(blob_name)[1])
+    transaction.on_commit(
+        lambda: media_executor.submit(
+            publish_image_variants,
+            image_path,
+            container_name,
+            blob_name,
+            queryset,
+            field,
+        )
+    )
+
+
+def publish_image_variants(image_path, container_name, blob_name, queryset, field):
+    try:
+        # Deleted in the meantime, its blobs are already scheduled for deletion
+        if not queryset.exists():
+            return
+
+        variants = render_image_variants_in_pool([image_path])[0]
+        if variants is None:
+            return
+
+        container_client = get_container_client(container_name)
+        variant_urls = upload_image_variants(
+            container_client, container_name, blob_name, variants
+        )
+        queryset.update(**{field: variant_urls})
+    except Exception as e:
+        print("An error occurred while creating the image variants:", str(e))
+    finally:
+        if path.exists(image_path):
+            os.remove(image_path)
+        close_old_connections()
+
+
+def schedule_pdf_thumbnail(file, container_name, blob_stem, queryset, fields):
+    # Render the first page once the row is committed, without holding the
+    # request. fields names the url, key and variants columns to patch.
+    pdf_path = spool_upload(file, ".pdf")
+    transaction.on_commit(
+        lambda: media_executor.submit(
+            publish_pdf_thumbnail,
+            pdf_path,
+            container_name,
+            blob_stem,
+            queryset,
+            fields,
+        )
+    )
+
+
+def publish_pdf_thumbnail(pdf_path, container_name, blob_stem, queryset, fields):
+    url_field, key_field, variants_field = fields
+    try:
+        if not queryset.exists():
+            return
+
+        thumbnail, variants = render_pdf_thumbnail_in_pool(pdf_path)
+        if not thumbnail:
+            return
+
+        container_client = get_container_client(container_name)
+        blob_name = f"{blob_stem}.jpg"
+        upload_derived_blob(container_client, blob_name, thumbnail, "image/jpeg")
+
+        shortened_url = shorten_url(f"{BLOB_BASE_URL}/{container_name}/{blob_name}")
+        variant_urls = upload_image_variants(
+            container_client, container_name, blob_name, variants
+        )
+        queryset.update(
+            **{
+                url_field: shortened_url,
+                key_field: blob_name,
+                variants_field: variant_urls,
+            }
+        )
+    except Exception as e:
+        print("An error occurred while creating the PDF thumbnail:", str(e))
+    finally:
+        if path.exists(pdf_path):
+            os.remove(pdf_path)
+        close_old_connections()
 
 
 def upload_image_cover_or_pdf_to_azure(file, blog, user):
@@ -51,16 +568,9 @@ def upload_image_cover_or_pdf_to_azure(file, blog, user):
     new_filename = file_name.replace(" ", "_")
     blog_title = str(blog.title).replace(" ", "_").strip("?")
     user_name = f"{user.first_name}-{user.last_name}".lower()
-    base_directory = f"{LOCAL_FILE_PATH}{user_name}"
-    full_directory = f"{base_directory}/Blog_Documents/{blog_title}"
 
-    container_client = blob_service_client.get_container_client(user_name)
-    if not container_client.exists():
-        container_client.create_container(public_access="blob")
+    container_client = get_container_client(user_name)
 
-    fs = FileSystemStorage(location=full_directory)
-    fs.save(new_filename, file)
-    file_path = f"{full_directory}/{new_filename}"
     blob_name = f"Blog_Documents/{blog_title}/{new_filename}"
 
     image_file_extensions = [
@@ -80,8 +590,7 @@ def upload_image_cover_or_pdf_to_azure(file, blog, user):
     if file_extension.lower() in image_file_extensions:
         try:
             # Upload a file to the container
-            with open(file_path, "rb") as data:
-                container_client.upload_blob(name=blob_name, data=data)
+            upload_user_blob(container_client, blob_name, file)
 
             # Return blob url
             file_url = f"{BLOB_BASE_URL}/{user_name}/{blob_name}"
@@ -90,19 +599,21 @@ def upload_image_cover_or_pdf_to_azure(file, blog, user):
             blog.image_key = blob_name
             blog.save()
 
-            if path.exists(f"media/{user_name}"):
-                shutil.rmtree(f"media/{user_name}")
+            schedule_image_variants(
+                file,
+                user_name,
+                blob_name,
+                BlogPost.objects.filter(id=blog.id),
+                "cover_image_variants",
+            )
             return shortened_url
         except ResourceExistsError:
-            if path.exists(f"media/{user_name}"):
-                shutil.rmtree(f"media/{user_name}")
             pass
 
     elif file_extension.lower() == ".pdf":
         try:
             # Upload a file to the container
-            with open(file_path, "rb") as data:
-                container_client.upload_blob(name=blob_name, data=data)
+            upload_user_blob(container_client, blob_name, file)
 
             # Return blob url
             file_url = f"{BLOB_BASE_URL}/{user_name}/{blob_name}"
@@ -115,71 +626,33 @@ def upload_image_cover_or_pdf_to_azure(file, blog, user):
             }
             BlogDocuments.objects.create(**file_docs)
 
-            thumbnail_path = f"{full_directory}/cover_image.jpg"
-
-            images = convert_from_path(
-                file_path,
-                dpi=300,
-                # poppler_path=r"C:\Users\MSI\Downloads\poppler-0.68.0\bin",
-            )
-            if images:
-                images[0].save(thumbnail_path, format="JPEG", quality=100)
-            blob_name = f"Blog_Documents/{blog_title}/cover_image.jpg"
-            return (
-                thumbnail_path,
-                blob_name,
+            # The cover image is rendered from the first page in the background
+            schedule_pdf_thumbnail(
+                file,
                 user_name,
+                f"Blog_Documents/{blog_title}/cover_image",
+                BlogPost.objects.filter(id=blog.id),
+                ("cover_image", "image_key", "cover_image_variants"),
             )
+            return shortened_url
 
         except ResourceExistsError:
-            if path.exists(f"media/{user_name}"):
-                shutil.rmtree(f"media/{user_name}")
             pass
     else:
         raise cannot_perform_action("Invalid file format")
 
 
-def upload_thumbnail(file_path, blob_name, container_name):
-    container_client = blob_service_client.get_container_client(container_name)
-    if not container_client.exists():
-        container_client.create_container()
-
-    # Upload a file to the container
-    try:
-        with open(file_path, "rb") as data:
-            container_client.upload_blob(
-                name=blob_name,
-                data=data,
-                content_settings=ContentSettings(content_type="image/jpeg"),
-            )
-
-            file_url = f"{BLOB_BASE_URL}/{container_name}/{blob_name}"
-            return file_url, blob_name
-    except ResourceExistsError:
-        if path.exists(f"media/{container_name}"):
-            shutil.rmtree(f"media/{container_name}")
-        pass
-
-
 def upload_poll_document(file, user, poll_question):
     file_name = str(file.name).lower()
     new_filename = file_name.replace(" ", "_")
     question = str(poll_question).replace(" ", "_").strip("?")
     user_name = f"{user.first_name}-{user.last_name}".lower()
-    base_directory = f"{LOCAL_FILE_PATH}{user_name}"
-    full_directory = f"{base_directory}/Poll_Documents/{question}"
 
-    fs = FileSystemStorage(location=full_directory)
-    fs.save(new_filename, file)
-    file_path = f"{full_directory}/{new_filename}"
     blob_name = f"Poll_Documents/{question}/{new_filename}"
-    container_client = blob_service_client.get_container_client(user_name)
-    if not container_client.exists():
-        container_client.create_container(public_access="blob")
+    container_client = get_container_client(user_name)
 
     # Upload a file to the container
-    with open(file_path, "rb") as data:
-        container_client.upload_blob(name=blob_name, data=data)
+    upload_user_blob(container_client, blob_name, file)
 
     file_url = f"{BLOB_BASE_URL}/{user_name}/{blob_name}"
 
@@ -191,16 +664,9 @@ def upload_poll_file_or_pdf_to_azure(file, user, poll):
     new_filename = file_name.replace(" ", "_")
     question = str(poll.question).replace(" ", "_").strip("?")
     user_name = f"{user.first_name}-{user.last_name}".lower()
-    base_directory = f"{LOCAL_FILE_PATH}{user_name}"
-    full_directory = f"{base_directory}/Poll_Documents/{question}"
 
-    container_client = blob_service_client.get_container_client(user_name)
-    if not container_client.exists():
-        container_client.create_container(public_access="blob")
+    container_client = get_container_client(user_name)
 
-    fs = FileSystemStorage(location=full_directory)
-    fs.save(new_filename, file)
-    file_path = f"{full_directory}/{new_filename}"
     blob_name = f"Poll_Documents/{question}/{new_filename}"
 
     image_file_extensions = [
@@ -219,8 +685,7 @@ def upload_poll_file_or_pdf_to_azure(file, user, poll):
     if file_extension.lower() in image_file_extensions:
         try:
             # Upload a file to the container
-            with open(file_path, "rb") as data:
-                container_client.upload_blob(name=blob_name, data=data)
+            upload_user_blob(container_client, blob_name, file)
 
             # Return blob url
             file_url = f"{BLOB_BASE_URL}/{user_name}/{blob_name}"
@@ -231,19 +696,21 @@ def upload_poll_file_or_pdf_to_azure(file, user, poll):
             poll.file_key = blob_name
             poll.save()
 
-            if path.exists(f"media/{user_name}"):
-                shutil.rmtree(f"media/{user_name}")
+            schedule_image_variants(
+                file,
+                user_name,
+                blob_name,
+                Poll.objects.filter(id=poll.id),
+                "snapshot_variants",
+            )
             return file_url
         except ResourceExistsError:
-            if path.exists(f"media/{user_name}"):
-                shutil.rmtree(f"media/{user_name}")
             pass
 
     elif file_extension.lower() == ".pdf":
         try:
             # Upload a file to the container
-            with open(file_path, "rb") as data:
-                container_client.upload_blob(name=blob_name, data=data)
+            upload_user_blob(container_client, blob_name, file)
 
             # Return blob url
             file_url = f"{BLOB_BASE_URL}/{user_name}/{blob_name}"
@@ -251,214 +718,123 @@ def upload_poll_file_or_pdf_to_azure(file, user, poll):
             poll.file_location = shortened_url
             poll.file_key = blob_name
             poll.save()
-            thumbnail_path = f"{full_directory}/poll_thumbnail.jpg"
-            images = convert_from_path(
-                file_path,
-                dpi=300,
-                # poppler_path=r"C:\Users\MSI\Downloads\poppler-0.68.0\bin",
-            )
-            if images:
-                images[0].save(thumbnail_path, format="JPEG", quality=100)
-            blob_name = f"Poll_Documents/{question}/poll_thumbnail.jpg"
-            return (
-                thumbnail_path,
-                blob_name,
+
+            # The snapshot is rendered from the first page in the background
+            schedule_pdf_thumbnail(
+                file,
                 user_name,
+                f"Poll_Documents/{question}/poll_thumbnail",
+                Poll.objects.filter(id=poll.id),
+                ("snapshot_location", "snapshot_key", "snapshot_variants"),
             )
+            return file_url
 
         except ResourceExistsError:
             print("File already exists")
-            if path.exists(f"media/{user_name}"):
-                shutil.rmtree(f"media/{user_name}")
             pass
     else:
         raise cannot_perform_action("Invalid file format")
 
 
-def upload_cover_image(request, res_data, blog=None, poll=None):
-    current_host = request.get_host()
-    data = {
-        "file_path": res_data[0],
-        "blob_name": res_data[1],
-        "container_name": res_data[2],
-    }
-
-    # Set the headers
-    headers = {"Content-Type": "application/json"}
-
-    # Send a POST request to the same server
-    response = requests.post(
-        f"https://{current_host}/blog/upload-thumbnail/",
-        data=json.dumps(data),
-        headers=headers,
-    )
-    response_data = response.json()
-    shortened_url = shorten_url(response_data["resp_data"][0])
-    if response.status_code == 200:
-        if blog:
-            blog.cover_image = shortened_url
-            blog.image_key = response_data["resp_data"][1]
-            blog.save()
-        if poll:
-            poll.snapshot_location = shortened_url
-            poll.snapshot_key = response_data["resp_data"][1]
-            poll.save()
-
-    return True
-
-
 def create_other_blog_documents(files, blog, user):
-    user_name = f"{user.first_name}-{user.last_name}".lower()
-    try:
-        for img in files:
-            file_name = str(img.name).lower()
-            new_filename = file_name.replace(" ", "_")
-            blog_title = str(blog.title).replace(" ", "_").strip("?")
-            base_directory = f"{LOCAL_FILE_PATH}{user_name}"
-            full_directory = f"{base_directory}/Blog_Documents/{blog_title}"
-
-            container_client = blob_service_client.get_container_client(user_name)
-            if not container_client.exists():
-                container_client.create_container(public_access="blob")
+    with stored_files(files) as (blob_names, shortened_urls):
+        BlogDocuments.objects.bulk_create(
+            BlogDocuments(
+                owner_id=user.user_key,
+                blog_id=blog.id,
+                document_location=shortened_url,
+                document_key=blob_name,
+            )
+            for blob_name, shortened_url in zip(blob_names, shortened_urls)
+        )
 
-            fs = FileSystemStorage(location=full_directory)
-            fs.save(new_filename, img)
-            file_path = f"{full_directory}/{new_filename}"
-            blob_name = f"Blog_Documents/{blog_title}/{new_filename}"
 
-            # Upload a file to the container
-            with open(file_path, "rb") as data:
-                container_client.upload_blob(name=blob_name, data=data)
-
-            # Return blob url
-            file_url = f"{BLOB_BASE_URL}/{user_name}/{blob_name}"
-            shortened_url = shorten_url(file_url)
-            new_blog_doc = {
-                "owner_id": user.user_key,
-                "blog_id": blog.id,
-                "document_location": shortened_url,
-                "document_key": blob_name,
-            }
+def delete_blob(container_name, blob_name):
+    if blob_name:
+        schedule_blob_deletions(container_name, [blob_name])
+    else:
+        return False
 
-            BlogDocuments.objects.create(**new_blog_doc)
 
-            if path.exists(f"media/{user_name}"):
-                shutil.rmtree(f"media/{user_name}")
-    except ResourceExistsError:
-        print("File already exists")
-        if path.exists(f"media/{user_name}"):
-            shutil.rmtree(f"media/{user_name}")
-        pass
+def with_image_variants(blob_names):
+    # The image keys followed by the responsive variants stored next to them
+    blob_names = [blob_name for blob_name in blob_names if blob_name]
+    return blob_names + [
+        variant_key
+        for blob_name in blob_names
+        for variant_key in get_variant_keys(blob_name)
+    ]
 
 
-def delete_blob(container_name, blob_name):
+def delete_image_blob(container_name, blob_name):
     if blob_name:
-        # Get a reference to the container
-        container_client = blob_service_client.get_container_client(container_name)
-        try:
-            # Delete the blob
-            blob_client = container_client.get_blob_client(blob_name)
-            blob_client.delete_blob()
-        except ResourceNotFoundError:
-            pass
+        schedule_blob_deletions(container_name, with_image_variants([blob_name]))
     else:
         return False
 
 
+def get_poll_blob_keys(poll):
+    # The snapshot of an image poll is the uploaded file itself
+    blob_keys = with_image_variants([poll.snapshot_key])
+    if poll.file_key and poll.file_key not in blob_keys:
+        blob_keys.append(poll.file_key)
+    return blob_keys
+
+
 def upload_profile_image(file, user):
     file_name = str(file.name).lower()
     new_filename = file_name.replace(" ", "_")
     user_name = f"{user.first_name}-{user.last_name}".lower()
-    base_directory = f"{LOCAL_FILE_PATH}{user_name}"
-    full_directory = f"{base_directory}/Profile_Image"
     file_url = ""
 
     container_name = user_name
 
-    container_client = blob_service_client.get_container_client(container_name)
-    if not container_client.exists():
-        container_client.create_container(public_access="blob")
+    container_client = get_container_client(container_name)
 
-    fs = FileSystemStorage(location=full_directory)
-    fs.save(new_filename, file)
-    file_path = f"{full_directory}/{new_filename}"
     blob_name = f"Profile_Image/{new_filename}"
     try:
         # Upload a file to the container
-        with open(file_path, "rb") as data:
-            container_client.upload_blob(name=blob_name, data=data)
+        upload_user_blob(container_client, blob_name, file)
+        schedule_image_variants(
+            file,
+            container_name,
+            blob_name,
+            User.objects.filter(user_key=user.user_key),
+            "profile_image_variants",
+        )
     except ResourceExistsError:
-        if path.exists(f"media/{user_name}"):
-            shutil.rmtree(f"media/{user_name}")
         pass
 
     # Return blob url
     file_url = f"{BLOB_BASE_URL}/{container_name}/{blob_name}"
     shortened_url = shorten_url(file_url)
 
-    if path.exists(f"media/{user_name}"):
-        shutil.rmtree(f"media/{user_name}")
-
     return shortened_url, blob_name
 
 
 def create_chat_shared_file(files, chat_room, user):
-    import uuid
-
-    # Generate a UUID
-    uuid_value = uuid.uuid4()
-
-    user_name = f"{user.first_name}-{user.last_name}".lower()
-    try:
+    new_filenames = [str(img.name).lower().replace(" ", "_") for img in files]
+    with stored_files(files) as (blob_names, shortened_urls):
         urls = []
-        for img in files:
-            file_name = str(img.name).lower()
-            filename = file_name.replace(" ", "_")
-            new_filename = f"{uuid_value}_{filename}"
-            chat = str(chat_room.room_name).replace(" ", "_").strip("?")
-            base_directory = f"{LOCAL_FILE_PATH}{user_name}"
-            full_directory = f"{base_directory}/Chat_Shared_Files/{chat}"
-
-            container_client = blob_service_client.get_container_client(user_name)
-            if not container_client.exists():
-                container_client.create_container(public_access="blob")
-
-            fs = FileSystemStorage(location=full_directory)
-            fs.save(new_filename, img)
-            file_path = f"{full_directory}/{new_filename}"
-            blob_name = f"Chat_Shared_Files/{chat}/{new_filename}"
-
-            # Upload a file to the container
-            with open(file_path, "rb") as data:
-                container_client.upload_blob(name=blob_name, data=data)
-
-            # Return blob url
-            file_url = f"{BLOB_BASE_URL}/{user_name}/{blob_name}"
-            shortened_url = shorten_url(file_url)
-            img_dict = {
-                "file_type": new_filename[new_filename.rfind(".") :].lower(),
-                "url": shortened_url,
-            }
-            urls.append(img_dict)
-            shared_file = {
-                "file_name": str(img.name).split(".")[0],
-                "file_type": new_filename[new_filename.rfind(".") :].lower(),
-                "file_url": shortened_url,
-                "file_key": blob_name,
-                "uploader_id": user.user_key,
-                "chat_room_id": chat_room.id,
-            }
+        shared_files = []
+        for img, new_filename, blob_name, shortened_url in zip(
+            files, new_filenames, blob_names, shortened_urls
+        ):
+            file_type = new_filename[new_filename.rfind(".") :].lower()
+            urls.append({"file_type": file_type, "url": shortened_url})
+            shared_files.append(
+                SharedFile(
+                    file_name=str(img.name).split(".")[0],
+                    file_type=file_type,
+                    file_url=shortened_url,
+                    file_key=blob_name,
+                    uploader_id=user.user_key,
+                    chat_room_id=chat_room.id,
+                )
+            )
 
-            SharedFile.objects.create(**shared_file)
-
-            if path.exists(f"media/{user_name}"):
-                shutil.rmtree(f"media/{user_name}")
-        return urls
-    except ResourceExistsError:
-        print("File already exists")
-        if path.exists(f"media/{user_name}"):
-            shutil.rmtree(f"media/{user_name}")
-        pass
+        SharedFile.objects.bulk_create(shared_files)
+    return urls
 
 
 def create_forum_header(files, forum, user):
@@ -469,21 +845,13 @@ def create_forum_header(files, forum, user):
             file_name = str(file.name).lower()
             new_filename = file_name.replace(" ", "_")
             topic = str(forum.topic).replace(" ", "_").strip("?")
-            base_directory = f"{LOCAL_FILE_PATH}{user_name}"
-            full_directory = f"{base_directory}/Forum_Files/Header/{topic}"
 
-            container_client = blob_service_client.get_container_client(user_name)
-            if not container_client.exists():
-                container_client.create_container(public_access="blob")
+            container_client = get_container_client(user_name)
 
-            fs = FileSystemStorage(location=full_directory)
-            fs.save(new_filename, file)
-            file_path = f"{full_directory}/{new_filename}"
             blob_name = f"Forum_Files/Header/{topic}/{new_filename}"
 
             # Upload a file to the container
-            with open(file_path, "rb") as data:
-                container_client.upload_blob(name=blob_name, data=data)
+            upload_user_blob(container_client, blob_name, file)
 
             # Return blob url
             file_url = f"{BLOB_BASE_URL}/{user_name}/{blob_name}"
@@ -492,114 +860,61 @@ def create_forum_header(files, forum, user):
             forum_header["file_url"] = shortened_url
             forum_header["file_key"] = blob_name
 
-            if path.exists(f"media/{user_name}"):
-                shutil.rmtree(f"media/{user_name}")
+            schedule_image_variants(
+                file,
+                user_name,
+                blob_name,
+                Forum.objects.filter(id=forum.id),
+                "header_image_variants",
+            )
+
         return forum_header
     except ResourceExistsError:
         print("File already exists")
-        if path.exists(f"media/{user_name}"):
-            shutil.rmtree(f"media/{user_name}")
         pass
 
 
 def create_vault_document(files, user, description):
-    user_name = f"{user.first_name}-{user.last_name}".lower()
-    try:
+    new_filenames = [str(img.name).lower().replace(" ", "_") for img in files]
+    with stored_files(files) as (blob_names, shortened_urls):
         urls = []
-        for img in files:
-            file_name = str(img.name).lower()
-            new_filename = file_name.replace(" ", "_")
-            base_directory = f"{LOCAL_FILE_PATH}{user_name}"
-            full_directory = f"{base_directory}/Documents_Vault"
-
-            container_client = blob_service_client.get_container_client(user_name)
-            if not container_client.exists():
-                container_client.create_container(public_access="blob")
-
-            fs = FileSystemStorage(location=full_directory)
-            fs.save(new_filename, img)
-            file_path = f"{full_directory}/{new_filename}"
-            blob_name = f"Documents_Vault/{new_filename}"
-
-            # Upload a file to the container
-            with open(file_path, "rb") as data:
-                container_client.upload_blob(name=blob_name, data=data)
+        documents = []
+        for img, new_filename, blob_name, shortened_url in zip(
+            files, new_filenames, blob_names, shortened_urls
+        ):
+            file_type = new_filename[new_filename.rfind(".") :].lower()
+            urls.append({"url": shortened_url, "file_type": file_type})
+            documents.append(
+                Document(
+                    file_name=str(img.name).split(".")[0],
+                    description=description if description else "",
+                    file_type=file_type,
+                    file_url=shortened_url,
+                    file_key=blob_name,
+                    owner_id=user.user_key,
+                )
+            )
 
-            # Return blob url
-            file_url = f"{BLOB_BASE_URL}/{user_name}/{blob_name}"
-            shortened_url = shorten_url(file_url)
-            data = {
-                "url": shortened_url,
-                "file_type": new_filename[new_filename.rfind(".") :].lower(),
-            }
-            urls.append(data)
-            forum_file = {
-                "file_name": str(img.name).split(".")[0],
-                "description": description if description else "",
-                "file_type": new_filename[new_filename.rfind(".") :].lower(),
-                "file_url": shortened_url,
-                "file_key": blob_name,
-                "owner_id": user.user_key,
-            }
-
-            Document.objects.create(**forum_file)
-
-            if path.exists(f"media/{user_name}"):
-                shutil.rmtree(f"media/{user_name}")
-        return urls
-    except ResourceExistsError:
-        print("File already exists")
-        if path.exists(f"media/{user_name}"):
-            shutil.rmtree(f"media/{user_name}")
-        pass
+        Document.objects.bulk_create(documents)
+    return urls
 
 
 def create_forum_files(files, forum, user, description):
-    user_name = f"{user.first_name}-{user.last_name}".lower()
-    try:
-        urls = []
-        for img in files:
-            file_name = str(img.name).lower()
-            new_filename = file_name.replace(" ", "_")
-            topic = str(forum.topic).replace(" ", "_").strip("?")
-            base_directory = f"{LOCAL_FILE_PATH}{user_name}"
-            full_directory = f"{base_directory}/Forum_Files/Shared_Files/{topic}"
-
-            container_client = blob_service_client.get_container_client(user_name)
-            if not container_client.exists():
-                container_client.create_container(public_access="blob")
-
-            fs = FileSystemStorage(location=full_directory)
-            fs.save(new_filename, img)
-            file_path = f"{full_directory}/{new_filename}"
-            blob_name = f"Forum_Files/{topic}/{new_filename}"
-
-            # Upload a file to the container
-            with open(file_path, "rb") as data:
-                container_client.upload_blob(name=blob_name, data=data)
-
-            # Return blob url
-            file_url = f"{BLOB_BASE_URL}/{user_name}/{blob_name}"
-            shortened_url = shorten_url(file_url)
-            urls.append(shortened_url)
-            forum_file = {
-                "file_name": str(img.name).split(".")[0],
-                "description": description if description else "",
-                "file_type": new_filename[new_filename.rfind(".") :].lower(),
-                "file_category": categorize_file(new_filename),
-                "file_url": shortened_url,
-                "file_key": blob_name,
-                "uploader_id": user.user_key,
-                "forum_id": forum.id,
-            }
-
-            ForumFile.objects.create(**forum_file)
-
-            if path.exists(f"media/{user_name}"):
-                shutil.rmtree(f"media/{user_name}")
-        return urls
-    except ResourceExistsError:
-        print("File already exists")
-        if path.exists(f"media/{user_name}"):
-            shutil.rmtree(f"media/{user_name}")
-        pass
+    new_filenames = [str(img.name).lower().replace(" ", "_") for img in files]
+    with stored_files(files) as (blob_names, shortened_urls):
+        ForumFile.objects.bulk_create(
+            ForumFile(
+                file_name=str(img.name).split(".")[0],
+                description=description if description else "",
+                file_type=new_filename[new_filename.rfind(".") :].lower(),
+                file_category=categorize_file(new_filename),
+                file_url=shortened_url,
+                file_key=blob_name,
+                uploader_id=user.user_key,
+                forum_id=forum.id,
+            )
+            for img, new_filename, blob_name, shortened_url in zip(
+                files, new_filenames, blob_names, shortened_urls
+            )
+        )
+    return shortened_urls
@@ -1,13 +1,26 @@
 import os
 import smtplib
+from datetime import timedelta
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
+from django.db import transaction
+from django.utils import timezone
+
+from Utilities.models import OutboundEmail
+
 # SMTP server configuration
 SMTP_HOST = os.getenv("SMTP_HOST")
 SMTP_PORT = os.getenv("SMTP_PORT")  # Replace with the appropriate port number
 SMTP_USERNAME = os.getenv("SMTP_USERNAME")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_USE_SSL = os.getenv("SMTP_USE_SSL", "true").lower() != "false"
+
+# Outbox retry policy
+MAX_EMAIL_ATTEMPTS = 5
+RETRY_BASE_DELAY = 60  # seconds, doubled on every failed attempt
+RETRY_MAX_DELAY = 3600
+EMAIL_CLAIM_TIMEOUT = timedelta(minutes=10)  # longest a worker may take on a batch
 
 
 english_welcome_message = """
@@ -83,25 +96,127 @@ swahili_welcome_message = """
 
 
 def send_email(recipient_email, subject, message):
+    # Queue the email in the outbox, the send_queued_emails worker delivers it
+    OutboundEmail.objects.create(
+        recipient=recipient_email, subject=subject, message=message
+    )
+
+    return True
+
+
+def build_email_message(email):
+    # Create a multipart message
+    msg = MIMEMultipart()
+    msg["From"] = SMTP_USERNAME
+    msg["To"] = email.recipient
+    msg["Subject"] = email.subject
+
+    # Add message body
+    msg.attach(MIMEText(email.message, "plain"))
+
+    return msg
+
+
+def open_smtp_connection():
+    # Create one authenticated SMTP session to be reused for many messages
+    if SMTP_USE_SSL:
+        server = smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT)
+    else:
+        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
+
+    if SMTP_USERNAME:
+        server.login(SMTP_USERNAME, SMTP_PASSWORD)
+
+    return server
+
+
+def close_smtp_connection(server):
     try:
-        # Create a multipart message
-        msg = MIMEMultipart()
-        msg["From"] = SMTP_USERNAME
-        msg["To"] = recipient_email
-        msg["Subject"] = subject
+        server.quit()
+    except smtplib.SMTPException:
+        server.close()
 
-        # Add message body
-        msg.attach(MIMEText(message, "plain"))
 
-        # Create SMTP server connection
-        with smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT) as server:
-            # server.starttls()
-            server.login(SMTP_USERNAME, SMTP_PASSWORD)
+def get_retry_delay(attempts):
+    delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+    return timedelta(seconds=delay)
 
-            # Send email
-            server.send_message(msg)
 
-    except Exception as e:
-        print("An error occurred while sending the email:", str(e))
+def mark_email_failed(email, error, now):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= MAX_EMAIL_ATTEMPTS:
+        email.status = OutboundEmail.FAILED
+    else:
+        email.next_attempt_on = now + get_retry_delay(email.attempts)
 
-    return True
+
+def claim_queued_emails(batch_size):
+    # Lock a batch of due emails with skip_locked and push them out of the due
+    # window, so that other workers skip them once the locks are released.
+    # Emails of a worker that stops mid-batch are due again when the claim ends.
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.PENDING, next_attempt_on__lte=timezone.now())
+            .order_by("next_attempt_on", "id")[:batch_size]
+        )
+        OutboundEmail.objects.filter(id__in=[email.id for email in emails]).update(
+            next_attempt_on=timezone.now() + EMAIL_CLAIM_TIMEOUT
+        )
+
+    return emails
+
+
+def deliver_email(server, email):
+    # Send one email, returns the SMTP session or None once it has dropped
+    now = timezone.now()
+    try:
+        server.send_message(build_email_message(email))
+    except smtplib.SMTPServerDisconnected as e:
+        mark_email_failed(email, e, now)
+        return None
+    except smtplib.SMTPException as e:
+        # Rejected by the server, the session is still usable
+        mark_email_failed(email, e, now)
+        return server
+    except OSError as e:
+        server.close()
+        mark_email_failed(email, e, now)
+        return None
+
+    email.status = OutboundEmail.SENT
+    email.attempts += 1
+    email.sent_on = now
+    email.last_error = None
+    return server
+
+
+def send_queued_emails(server=None, batch_size=100):
+    # Deliver a batch of due emails over one SMTP session. The batch is
+    # claimed first, so no transaction is held open while talking to SMTP.
+    # Returns the SMTP session to reuse and the number of emails sent.
+    emails = claim_queued_emails(batch_size)
+    if not emails:
+        return server, 0
+
+    try:
+        # A failed connection puts the batch back untouched for the next run
+        if server is None:
+            server = open_smtp_connection()
+
+        for email in emails:
+            if server is None:
+                try:
+                    server = open_smtp_connection()
+                except (smtplib.SMTPException, OSError):
+                    break
+            server = deliver_email(server, email)
+    finally:
+        # Emails not attempted still hold their values from before the claim
+        OutboundEmail.objects.bulk_update(
+            emails,
+            ["status", "attempts", "last_error", "next_attempt_on", "sent_on"],
+        )
+
+    return server, sum(email.status == OutboundEmail.SENT for email in emails)
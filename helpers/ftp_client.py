@@ -0,0 +1,187 @@
+import ftplib
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from os import path
+
+FTP_HOSTNAME = os.getenv("FTP_HOSTNAME")
+FTP_USERNAME = os.getenv("FTP_USERNAME")
+FTP_PASSWORD = os.getenv("FTP_PASSWORD")
+
+# Logged in sessions kept open per process
+FTP_POOL_SIZE = int(os.getenv("FTP_POOL_SIZE", 4))
+FTP_TIMEOUT = 30
+
+# Idle sessions are pinged well before the server drops them
+FTP_KEEPALIVE_INTERVAL = int(os.getenv("FTP_KEEPALIVE_INTERVAL", 60))
+
+
+def directory_exists(ftp, directory):
+    # Enter the directory and go back, leaving the session where it was
+    current_directory = ftp.pwd()
+    try:
+        ftp.cwd(directory)
+    except ftplib.error_perm:
+        return False
+    ftp.cwd(current_directory)
+    return True
+
+
+class PooledFTP:
+    def __init__(self):
+        self.ftp = ftplib.FTP(FTP_HOSTNAME, timeout=FTP_TIMEOUT)
+        self.ftp.login(FTP_USERNAME, FTP_PASSWORD)
+        self.last_used = time.monotonic()
+
+    def is_idle(self):
+        return time.monotonic() - self.last_used >= FTP_KEEPALIVE_INTERVAL
+
+    def keep_alive(self):
+        # Returns False when the server has closed the session
+        try:
+            self.ftp.voidcmd("NOOP")
+        except ftplib.all_errors:
+            return False
+        self.last_used = time.monotonic()
+        return True
+
+    def close(self):
+        try:
+            self.ftp.quit()
+        except ftplib.all_errors:
+            self.ftp.close()
+
+
+class FTPPool:
+    def __init__(self, size):
+        self.size = size
+        self.idle_connections = queue.LifoQueue()
+        self.semaphore = threading.BoundedSemaphore(size)
+        # Directories known to exist on the server, shared by every session
+        self.directories = set()
+        self.directories_lock = threading.Lock()
+        self.keepalive_thread = None
+        self.keepalive_lock = threading.Lock()
+
+    def start_keepalive(self):
+        with self.keepalive_lock:
+            if self.keepalive_thread is None:
+                self.keepalive_thread = threading.Thread(
+                    target=self.keep_idle_connections_alive, daemon=True
+                )
+                self.keepalive_thread.start()
+
+    def keep_idle_connections_alive(self):
+        while True:
+            time.sleep(FTP_KEEPALIVE_INTERVAL)
+            # Only ping the sessions that are idle right now
+            connections = []
+            while True:
+                try:
+                    connections.append(self.idle_connections.get_nowait())
+                except queue.Empty:
+                    break
+            for connection in reversed(connections):
+                if not connection.is_idle() or connection.keep_alive():
+                    self.idle_connections.put(connection)
+                else:
+                    connection.close()
+
+    def checkout(self):
+        self.semaphore.acquire()
+        try:
+            while True:
+                try:
+                    connection = self.idle_connections.get_nowait()
+                except queue.Empty:
+                    break
+                if not connection.is_idle() or connection.keep_alive():
+                    return connection
+                connection.close()
+            self.start_keepalive()
+            return PooledFTP()
+        except BaseException:
+            self.semaphore.release()
+            raise
+
+    def release(self, connection, discard=False):
+        if discard:
+            connection.close()
+        else:
+            connection.last_used = time.monotonic()
+            self.idle_connections.put(connection)
+        self.semaphore.release()
+
+    @contextmanager
+    def connection(self):
+        connection = self.checkout()
+        try:
+            yield connection.ftp
+        except (EOFError, OSError, ftplib.error_temp, ftplib.error_proto):
+            # The session is in an unknown state
+            self.release(connection, discard=True)
+            raise
+        except BaseException:
+            self.release(connection)
+            raise
+        else:
+            self.release(connection)
+
+    def ensure_directory(self, ftp, directory):
+        # Create each missing parent once per process instead of listing it
+        parent = ""
+        for name in directory.strip("/").split("/"):
+            parent = f"{parent}/{name}" if parent else name
+            with self.directories_lock:
+                if parent in self.directories:
+                    continue
+            try:
+                ftp.mkd(parent)
+            except ftplib.error_perm as e:
+                # 550 is returned when the directory already exists, but also
+                # when it cannot be created
+                if not str(e).startswith("550") or not directory_exists(ftp, parent):
+                    raise
+            with self.directories_lock:
+                self.directories.add(parent)
+
+
+ftp_pool = FTPPool(FTP_POOL_SIZE)
+
+
+def upload_files_batch(file_paths, subdirectory):
+    # Upload the local files into one directory over a single session
+    remote_paths = []
+    with ftp_pool.connection() as ftp:
+        ftp_pool.ensure_directory(ftp, subdirectory)
+        for file_path in file_paths:
+            remote_path = f"{subdirectory}/{path.basename(file_path)}"
+            with open(file_path, "rb") as file:
+                ftp.storbinary("STOR " + remote_path, file)
+            remote_paths.append("/" + remote_path)
+
+    return remote_paths
+
+
+def delete_files_batch(remote_paths):
+    # Delete the remote files over a single session, returns the deleted paths
+    deleted_paths = []
+    with ftp_pool.connection() as ftp:
+        for remote_path in remote_paths:
+            try:
+                ftp.delete(remote_path)
+            except ftplib.error_perm:
+                continue
+            deleted_paths.append(remote_path)
+
+    return deleted_paths
+
+
+def retrieve_file_to(remote_path, local_file_path):
+    with ftp_pool.connection() as ftp:
+        with open(local_file_path, "wb") as file:
+            ftp.retrbinary("RETR " + remote_path, file.write)
+
+    return local_file_path
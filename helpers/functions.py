@@ -1,19 +1,20 @@
+import base64
 import ftplib
+import json
 import os
 import random
 import re
 import string
 
-from better_profanity import profanity
 from bs4 import BeautifulSoup
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Q
 from django.utils.timezone import make_aware
 
 from django.conf import settings
 
-FTP_HOSTNAME = os.getenv("FTP_HOSTNAME")
-FTP_USERNAME = os.getenv("FTP_USERNAME")
-FTP_PASSWORD = os.getenv("FTP_PASSWORD")
+from helpers.ftp_client import delete_files_batch, retrieve_file_to, upload_files_batch
+from helpers.status_codes import invalid_data
 
 
 # Function to return paginated data
@@ -51,6 +52,68 @@ def paginate_data(data, page_number, items_per_page):
     return response_data
 
 
+# Encode the position of a row into an opaque cursor
+def encode_cursor(created_on, key):
+    position = json.dumps([created_on.isoformat(), str(key)])
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+# Decode a cursor back into the position of a row
+def decode_cursor(cursor):
+    try:
+        created_on, key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError):
+        raise invalid_data("Invalid cursor")
+    return created_on, key
+
+
+# Function to return keyset paginated data ordered by newest first
+def paginate_data_by_cursor(data, cursor, items_per_page, include_total=False):
+    key_field = data.model._meta.pk.name
+    ordered_data = data.order_by("-created_on", f"-{key_field}")
+
+    if cursor:
+        # Only fetch rows positioned after the last row of the previous page
+        created_on, key = decode_cursor(cursor)
+        ordered_data = ordered_data.filter(
+            Q(created_on__lt=created_on)
+            | Q(created_on=created_on, **{f"{key_field}__lt": key})
+        )
+
+    # Fetch one extra row to know whether there is a next page
+    new_data = list(ordered_data[: items_per_page + 1])
+    next_cursor = None
+    if len(new_data) > items_per_page:
+        new_data = new_data[:items_per_page]
+        last_item = new_data[-1]
+        next_cursor = encode_cursor(last_item["created_on"], last_item[key_field])
+
+    response_data = {
+        "status": "success",
+        "detail": "Data fetched successfully",
+        "next_cursor": next_cursor,
+        "data": new_data,
+    }
+    if include_total:
+        response_data["total_data"] = data.count()
+
+    return response_data
+
+
+# Function to return paginated data in the mode requested by the client
+def paginate_request_data(request, data, page_number, items_per_page):
+    # Clients opt in to keyset pagination by sending a cursor (empty for page 1)
+    if "cursor" in request.GET:
+        return paginate_data_by_cursor(
+            data,
+            request.GET.get("cursor"),
+            items_per_page,
+            include_total=request.GET.get("include_total") == "true",
+        )
+
+    return paginate_data(data, page_number, items_per_page)
+
+
 # Function to return aware datetime
 def aware_datetime(datetime):
     return make_aware(datetime)
@@ -64,65 +127,25 @@ def generate_random_string(length):
 
 
 def delete_file(file_name, subdirectory=None):
+    if subdirectory:
+        file_path = subdirectory + "/" + file_name
+    else:
+        file_path = file_name
+
     try:
-        # Connect to the FTP server
-        ftp = ftplib.FTP(FTP_HOSTNAME)
-        ftp.login(FTP_USERNAME, FTP_PASSWORD)
-
-        if subdirectory:
-            file_path = subdirectory + "/" + file_name
-        else:
-            file_path = file_name
-
-        try:
-            # Delete the file
-            ftp.delete(file_path)
-            # Close the FTP connection
-            ftp.quit()
+        if delete_files_batch([file_path]):
             print("File deleted successfully.")
             return True
-        except ftplib.all_errors:
-            print("File does not exist")
-            return False
-
+        print("File does not exist")
+        return False
     except ftplib.all_errors as e:
         print("FTP error:", str(e))
 
 
-def create_directory_recursively(ftp, path):
-    dirs = path.split("/")
-    for dir in dirs:
-        if dir not in ftp.nlst():
-            ftp.mkd(dir)
-        ftp.cwd(dir)
-
-
 def upload_files(file_path, subdirectory):
     try:
-        # Connect to the FTP server
-        ftp = ftplib.FTP(FTP_HOSTNAME)
-        ftp.login(FTP_USERNAME, FTP_PASSWORD)
-
-        # Create parent directories recursively if they don't exist
-        create_directory_recursively(ftp, subdirectory)
-
-        file_name = os.path.basename(file_path)
-
-        try:
-            ftp.delete(file_name)
-        except ftplib.all_errors:
-            pass
-
-        # Open the local file in binary mode for uploading
-        with open(file_path, "rb") as file:
-            # Upload the file to the remote directory
-            ftp.storbinary("STOR " + file_name, file)
-
-        # Close the FTP connection
-        ftp.quit()
-
+        (remote_filepath,) = upload_files_batch([file_path], subdirectory)
         print("File uploaded successfully.")
-        remote_filepath = "/" + subdirectory + "/" + file_name
         return remote_filepath
     except ftplib.all_errors as e:
         print("FTP error:", str(e))
@@ -130,25 +153,12 @@ def upload_files(file_path, subdirectory):
 
 
 def retrieve_file(remote_filepath, local_directory):
-    try:
-        # Connect to the FTP server
-        ftp = ftplib.FTP(FTP_HOSTNAME)
-        ftp.login(FTP_USERNAME, FTP_PASSWORD)
-
-        # Extract the file name from the remote file path
-        file_name = os.path.basename(remote_filepath)
-
-        # Set the local file path where the retrieved file will be saved
-        local_file_path = os.path.join(local_directory, file_name)
-
-        # Open the local file in binary mode for writing
-        with open(local_file_path, "wb") as file:
-            # Retrieve the file from the remote directory
-            ftp.retrbinary("RETR " + remote_filepath, file.write)
-
-        # Close the FTP connection
-        ftp.quit()
+    # Set the local file path where the retrieved file will be saved
+    file_name = os.path.basename(remote_filepath)
+    local_file_path = os.path.join(local_directory, file_name)
 
+    try:
+        retrieve_file_to(remote_filepath, local_file_path)
         print("File retrieved successfully.")
         return local_file_path
     except ftplib.all_errors as e:
@@ -198,12 +208,3 @@ def truncate_text(text, max_length):
         return text
     else:
         return text[:max_length].rsplit(" ", 1)[0] + "..."
-
-
-# Check Abusive words
-def check_abusive_words(content):
-    converted_text = convert_quill_text_to_normal_text(content)
-    profanity.load_censor_words()
-    censored_text = profanity.censor(converted_text)
-    is_abusive = profanity.contains_profanity(converted_text)
-    return censored_text, is_abusive
@@ -0,0 +1,95 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+MEDIA_WORKERS = int(os.environ.get("MEDIA_WORKERS", 2))
+IMAGE_QUALITY = 85
+
+# Name and maximum width of every derivative, smaller images are not upscaled
+IMAGE_VARIANT_WIDTHS = (
+    ("thumbnail", 320),
+    ("card", 720),
+    ("full", 1600),
+)
+
+# File extension, Pillow format and content type of every encoding
+IMAGE_VARIANT_FORMATS = (
+    ("jpg", "JPEG", "image/jpeg"),
+    ("webp", "WEBP", "image/webp"),
+)
+
+# Created on first use so that importing this module never starts processes
+pool_lock = threading.Lock()
+media_pool = None
+
+
+def get_media_pool():
+    global media_pool
+
+    if media_pool is None:
+        with pool_lock:
+            if media_pool is None:
+                # Spawned workers do not inherit the threads of the web server
+                media_pool = ProcessPoolExecutor(
+                    max_workers=MEDIA_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+
+    return media_pool
+
+
+def get_variant_key(blob_name, variant_name, extension):
+    # Derivatives live next to the original blob
+    return f"{os.path.splitext(blob_name)[0]}_{variant_name}.{extension}"
+
+
+def get_variant_keys(blob_name):
+    # Keys of every derivative of the blob, whether or not it was generated
+    return [
+        get_variant_key(blob_name, variant_name, extension)
+        for variant_name, _ in IMAGE_VARIANT_WIDTHS
+        for extension, _, _ in IMAGE_VARIANT_FORMATS
+    ]
+
+
+def encode_image(image, image_format):
+    output = BytesIO()
+    image.save(output, format=image_format, quality=IMAGE_QUALITY)
+    return output.getvalue()
+
+
+def encode_image_variants(image):
+    # Return the encoded bytes of every width and format of the image
+    image = ImageOps.exif_transpose(image).convert("RGB")
+
+    variants = {}
+    for variant_name, width in IMAGE_VARIANT_WIDTHS:
+        resized = image
+        if image.width > width:
+            height = round(image.height * width / image.width)
+            resized = image.resize((width, height), Image.LANCZOS)
+
+        variants[variant_name] = {
+            extension: encode_image(resized, image_format)
+            for extension, image_format, _ in IMAGE_VARIANT_FORMATS
+        }
+
+    return variants
+
+
+def render_image_variants(image_path):
+    # Unreadable images give None so that one bad file does not fail a batch
+    try:
+        with Image.open(image_path) as image:
+            return encode_image_variants(image)
+    except (OSError, Image.DecompressionBombError):
+        return None
+
+
+def render_image_variants_in_pool(image_paths):
+    # Render a batch of images across the worker processes, keeping the order
+    return list(get_media_pool().map(render_image_variants, image_paths))
@@ -0,0 +1,37 @@
+import os
+import tempfile
+
+import fitz
+from PIL import Image
+
+from helpers.image_variants import encode_image, encode_image_variants, get_media_pool
+
+THUMBNAIL_WIDTH = int(os.environ.get("THUMBNAIL_WIDTH", 1200))
+
+
+def spool_upload(file, suffix=""):
+    # Copy the upload to a file that outlives the request, chunk by chunk
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as spooled_file:
+        for chunk in file.chunks():
+            spooled_file.write(chunk)
+
+    return spooled_file.name
+
+
+def render_pdf_thumbnail(pdf_path, width=THUMBNAIL_WIDTH):
+    # Rasterize only the first page, scaled to the target width. Returns the
+    # page as JPEG along with its responsive variants, which include WebP.
+    with fitz.open(pdf_path) as document:
+        if not document.page_count:
+            return None, {}
+        page = document[0]
+        zoom = width / page.rect.width
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+
+    return encode_image(image, "JPEG"), encode_image_variants(image)
+
+
+def render_pdf_thumbnail_in_pool(pdf_path, width=THUMBNAIL_WIDTH):
+    # Block the calling thread, not the web worker, until a process renders it
+    return get_media_pool().submit(render_pdf_thumbnail, pdf_path, width).result()
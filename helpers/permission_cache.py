@@ -0,0 +1,47 @@
+import threading
+import uuid
+
+from django.core.cache import cache
+
+from Auth.models.permissions_model import Permission
+
+PERMISSION_VERSION_KEY = "permission_matrix_version"
+
+# Role and module to access level matrix, reloaded when the shared version moves
+matrix_lock = threading.Lock()
+permission_matrix = {}
+permission_matrix_version = None
+
+
+def get_permission_version():
+    version = cache.get(PERMISSION_VERSION_KEY)
+    if version is None:
+        cache.add(PERMISSION_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(PERMISSION_VERSION_KEY)
+
+    return version
+
+
+def bump_permission_version():
+    # Every worker reloads its matrix on the next permission check
+    cache.set(PERMISSION_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def get_permission_matrix():
+    global permission_matrix, permission_matrix_version
+
+    version = get_permission_version()
+    if version != permission_matrix_version:
+        with matrix_lock:
+            if version != permission_matrix_version:
+                permission_matrix = {
+                    (role_id, module_name): access_level
+                    for role_id, module_name, access_level in (
+                        Permission.objects.values_list(
+                            "role_id", "module__name", "access_level"
+                        )
+                    )
+                }
+                permission_matrix_version = version
+
+    return permission_matrix
@@ -0,0 +1,191 @@
+import threading
+import uuid
+
+from better_profanity.constants import ALLOWED_CHARACTERS
+from better_profanity.utils import get_complete_path_of_file, read_wordlist
+from django.core.cache import cache
+
+from Admin.models import CensorWord
+
+CENSOR_WORDS_VERSION_KEY = "censor_words_version"
+CENSOR_REPLACEMENT = "****"
+WORD_END = None
+
+# Leetspeak characters and the letters they can stand for, as in better_profanity
+CHARS_MAPPING = {
+    "a": ("a", "@", "*", "4"),
+    "i": ("i", "*", "l", "1"),
+    "o": ("o", "*", "0", "@"),
+    "u": ("u", "*", "v"),
+    "v": ("v", "*", "u"),
+    "l": ("l", "1"),
+    "e": ("e", "*", "3"),
+    "s": ("s", "$", "5"),
+    "t": ("t", "7"),
+}
+
+CHAR_CANDIDATES = {}
+for letter, variants in CHARS_MAPPING.items():
+    for variant in variants:
+        CHAR_CANDIDATES.setdefault(variant, {variant}).add(letter)
+
+# Compiled word trie and its phrase length, rebuilt when the shared version
+# moves
+trie_lock = threading.Lock()
+censor_trie = None
+censor_trie_version = None
+default_words = None
+
+
+def get_censor_words_version():
+    version = cache.get(CENSOR_WORDS_VERSION_KEY)
+    if version is None:
+        cache.add(CENSOR_WORDS_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(CENSOR_WORDS_VERSION_KEY)
+
+    return version
+
+
+def bump_censor_words_version():
+    # Every worker recompiles its word trie on the next check
+    cache.set(CENSOR_WORDS_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def build_censor_trie(words):
+    # Words of a phrase are joined by an edge keyed by their separator, which
+    # never holds a word character. Also returns how many following words
+    # better_profanity joins to a word, one per separator of the longest entry.
+    trie = {}
+    max_next_words = 1
+    for word in words:
+        word = word.lower()
+        tokens = split_words(word)
+        max_next_words = max(
+            max_next_words, len(word) - sum(end - start for start, end in tokens)
+        )
+        # Entries that start or end with a separator can never be matched
+        if not tokens or tokens[0][0] != 0 or tokens[-1][1] != len(word):
+            continue
+        node = trie
+        previous_end = None
+        for start, end in tokens:
+            if previous_end is not None:
+                node = node.setdefault(word[previous_end:start], {})
+            for char in word[start:end]:
+                node = node.setdefault(char, {})
+            previous_end = end
+        node[WORD_END] = True
+
+    return trie, max_next_words
+
+
+def get_censor_trie():
+    global censor_trie, censor_trie_version, default_words
+
+    version = get_censor_words_version()
+    if version != censor_trie_version:
+        with trie_lock:
+            if version != censor_trie_version:
+                if default_words is None:
+                    wordlist_path = get_complete_path_of_file("profanity_wordlist.txt")
+                    default_words = list(read_wordlist(wordlist_path))
+                custom_words = CensorWord.objects.values_list("word", flat=True)
+                censor_trie = build_censor_trie([*default_words, *custom_words])
+                censor_trie_version = version
+
+    return censor_trie
+
+
+def split_words(text):
+    # Return the start and end of every run of word characters
+    words = []
+    start = None
+    for index, char in enumerate(text):
+        if char in ALLOWED_CHARACTERS:
+            if start is None:
+                start = index
+        elif start is not None:
+            words.append((start, index))
+            start = None
+    if start is not None:
+        words.append((start, len(text)))
+
+    return words
+
+
+def match_word(nodes, word):
+    # Follow every spelling of the word through the trie
+    for char in word.lower():
+        candidates = CHAR_CANDIDATES.get(char, (char,))
+        nodes = [
+            node[candidate]
+            for node in nodes
+            for candidate in candidates
+            if candidate in node
+        ]
+        if not nodes:
+            break
+
+    return nodes
+
+
+def find_match_end(trie, max_next_words, text, words, first_index):
+    # Return the index of the last word of the match at first_index. Like
+    # better_profanity, the fewest following words joined to the word win,
+    # either all directly or all over their separators, before the word alone.
+    start, end = words[first_index]
+    word_nodes = match_word([trie], text[start:end])
+    joined_nodes = separated_nodes = word_nodes
+    last_index = min(first_index + max_next_words, len(words) - 1)
+    for index in range(first_index + 1, last_index + 1):
+        previous_end = end
+        start, end = words[index]
+        if start == len(text) - 1:
+            # better_profanity never joins a one letter word that ends the text
+            break
+        separator = text[previous_end:start].lower()
+        joined_nodes = match_word(joined_nodes, text[start:end])
+        separated_nodes = match_word(
+            [node[separator] for node in separated_nodes if separator in node],
+            text[start:end],
+        )
+        if not joined_nodes and not separated_nodes:
+            break
+        if any(WORD_END in node for node in joined_nodes + separated_nodes):
+            return index
+
+    if any(WORD_END in node for node in word_nodes):
+        return first_index
+
+    return None
+
+
+def censor_text(text):
+    # Censor the text and report whether it had profanity in a single pass
+    trie, max_next_words = get_censor_trie()
+    words = split_words(text)
+    if words and words[0][0] >= len(text) - 1:
+        # better_profanity leaves a text made of one trailing letter alone
+        return text, False
+
+    censored_parts = []
+    position = 0
+    index = 0
+    while index < len(words):
+        match_end = find_match_end(trie, max_next_words, text, words, index)
+        if match_end is None:
+            index += 1
+            continue
+        word_start = words[index][0]
+        censored_parts.append(text[position:word_start])
+        censored_parts.append(CENSOR_REPLACEMENT)
+        position = words[match_end][1]
+        index = match_end + 1
+
+    if not censored_parts:
+        return text, False
+
+    # Reported like contains_profanity, which compares the censored text
+    censored_parts.append(text[position:])
+    censored_text = "".join(censored_parts)
+    return censored_text, censored_text != text
@@ -0,0 +1,80 @@
+import secrets
+import string
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from Utilities.models import ShortLink
+
+SHORT_LINK_CACHE_TIMEOUT = 60 * 60 * 24
+SHORT_LINK_CODE_ALPHABET = string.digits + string.ascii_letters
+SHORT_LINK_CODE_LENGTH = 10
+# Attempts at drawing a code that is not taken yet
+MAX_SHORT_LINK_CODE_ATTEMPTS = 5
+
+
+def generate_short_link_code():
+    return "".join(
+        secrets.choice(SHORT_LINK_CODE_ALPHABET) for _ in range(SHORT_LINK_CODE_LENGTH)
+    )
+
+
+def build_short_url(code):
+    return f"{settings.SHORT_LINK_BASE_URL}/s/{code}"
+
+
+def get_or_create_short_link(url):
+    # The same target always maps to the same short link. A new link draws
+    # random codes until one is free.
+    for _ in range(MAX_SHORT_LINK_CODE_ATTEMPTS):
+        short_link = ShortLink.objects.filter(target_url=url).first()
+        if short_link is not None:
+            return short_link
+        try:
+            with transaction.atomic():
+                return ShortLink.objects.create(
+                    code=generate_short_link_code(), target_url=url
+                )
+        except IntegrityError:
+            # Either the code was taken or the target was shortened meanwhile
+            continue
+
+    raise IntegrityError(f"Could not find a free short link code for {url}")
+
+
+def shorten_url(url):
+    return build_short_url(get_or_create_short_link(url).code)
+
+
+def shorten_urls(urls):
+    # Shorten many urls with one insert and one select, keeping their order
+    ShortLink.objects.bulk_create(
+        [ShortLink(code=generate_short_link_code(), target_url=url) for url in urls],
+        ignore_conflicts=True,
+    )
+    codes = dict(
+        ShortLink.objects.filter(target_url__in=urls).values_list("target_url", "code")
+    )
+    # Rows skipped because their code was taken are created one by one
+    for url in urls:
+        if url not in codes:
+            codes[url] = get_or_create_short_link(url).code
+
+    return [build_short_url(codes[url]) for url in urls]
+
+
+@lru_cache(maxsize=4096)
+def resolve_short_link(code):
+    # Short links never change, so hot links are served from process memory.
+    # Missing links raise ShortLink.DoesNotExist, which lru_cache never stores.
+    cache_key = f"short_link_{code}"
+    target_url = cache.get(cache_key)
+    if target_url is None:
+        target_url = ShortLink.objects.values_list("target_url", flat=True).get(
+            code=code
+        )
+        cache.set(cache_key, target_url, timeout=SHORT_LINK_CACHE_TIMEOUT)
+
+    return target_url
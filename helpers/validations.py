@@ -1,8 +1,8 @@
 import random
 import re
 
-from Auth.models.permissions_model import Module, Permission
 from Auth.models.user_model import User
+from helpers.permission_cache import get_permission_matrix
 from helpers.status_codes import EmptyParameters
 
 
@@ -67,9 +67,8 @@ def unique_list(list_of_items):
 
 # Check user module permission
 def check_permission(user, module_name, access_level):
-    module = Module.objects.get(name=module_name)
-    permission = Permission.objects.get(role_id=user.role_id, module=module)
-    return permission.access_level in access_level
+    permission_matrix = get_permission_matrix()
+    return permission_matrix.get((user.role_id, module_name)) in access_level
 
 
 # Check Super Admin permissions
@@ -0,0 +1,21 @@
+#!/bin/sh
+
+# Start the background workers next to the web process. docker-compose
+# runs each of them as its own service instead.
+
+# Go to root folder
+cd $(dirname $0)/..
+
+# Run a management command, starting it again whenever it exits
+run_worker() {
+  while true; do
+    python manage.py "$@"
+    echo "Worker $1 exited, restarting in 5 seconds..."
+    sleep 5
+  done
+}
+
+run_worker close_ended_polls --interval 60 &
+run_worker send_queued_emails --interval 5 &
+run_worker delete_pending_blobs --interval 10 &
+run_worker manage_chat_partitions --interval 86400 &